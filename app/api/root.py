@@ -1,15 +1,11 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
-from app.utils.helpers import get_csv_data
 from app.utils.app_logger import AppLogger
 from app.models.logger import LoggerModel
-import os
 import time
 
 router = APIRouter(tags=["Home"])
 
-dados_csv = get_csv_data(os.path.join(os.path.dirname(__file__), "../data/books.csv"))  # noqa: E501
-
 
 @router.get("/")
 async def get_home(request: Request):
@@ -1,13 +1,19 @@
 from fastapi import APIRouter, HTTPException, Query, Request, Depends
 from app.api.v1.auth import get_current_user
-from app.utils.helpers import get_unique_items
-from app.api.root import dados_csv
+from app.utils.http_cache import catalog_etag
+from app.utils.projection import book_fields
+from app.utils.pagination import paginate_request
+from app.services.catalog import get_catalog
 from app.models.schemas.books import (
     BookDetailResponse,
     BooksSearchResponse,
-    BooksListResponse
+    BooksListResponse,
+    BooksBatchRequest,
+    BooksBatchResponse
 )
+from app.config import Config
 from app.utils.app_logger import AppLogger
+from app.utils.response_cache import JSONBytesResponse, encode_response
 from app.models.logger import LoggerModel
 import time
 
@@ -15,7 +21,18 @@ router = APIRouter(tags=["Books"])
 
 
 @router.get("/api/v1/books", response_model=BooksListResponse)
-async def get_books(request: Request, user=Depends(get_current_user)):
+async def get_books(
+    request: Request,
+    limit: int = Query(
+        default=Config.PAGE_SIZE_DEFAULT, ge=1, le=Config.PAGE_SIZE_MAX,
+        description="Quantidade máxima de itens por página"
+    ),
+    cursor: str | None = Query(
+        default=None, description="Cursor retornado em pagination.next_cursor"
+    ),
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag)
+):
     """### 📚 Listar Livros
     Este endpoint retorna uma lista de todos os livros disponíveis na coleção.
     Esta lista é ordenada alfabeticamente e contém apenas os títulos dos livros.
@@ -23,12 +40,14 @@ async def get_books(request: Request, user=Depends(get_current_user)):
     #### Como usar:
     -   Faça uma requisição GET para `/api/v1/books`.
     -   A resposta será uma lista de títulos de livros ordenados alfabeticamente.
+    -   A lista é paginada: use `limit` (padrão 50, máximo 500) e, para a próxima página, envie
+    o valor de `pagination.next_cursor` no parâmetro `cursor`.
     -   É necessário enviar o token JWT no header Authorization: Bearer <token>.
     """  # noqa: E501
     start_time = time.time()
     try:
-        books = get_unique_items(dados_csv, "title")
-        books = sorted(books, key=lambda x: x.lower())
+        catalog = get_catalog()
+        books = catalog.sorted_titles
         if len(books) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
@@ -46,6 +65,21 @@ async def get_books(request: Request, user=Depends(get_current_user)):
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
+        start, end, pagination = paginate_request(
+            request, "books", start_time, len(books), cursor, limit,
+            catalog.version, {}
+        )
+        cache_key = ("books", start, end)
+        body = catalog.response_cache.get(cache_key)
+        if body is None:
+            body = catalog.response_cache.set(cache_key, encode_response({
+                "success": True,
+                "message": "Livros retornadas com sucesso.",
+                "data": {
+                    "books": books[start:end]
+                },
+                "pagination": pagination
+            }, BooksListResponse))
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("books"),
@@ -58,13 +92,9 @@ async def get_books(request: Request, user=Depends(get_current_user)):
                 latency=latency
             )
         )
-        return {
-            "success": True,
-            "message": "Livros retornadas com sucesso.",
-            "data": {
-                "books": books
-            }
-        }
+        return JSONBytesResponse(body)
+    except HTTPException as http_error:
+        raise http_error
     except Exception as error:
         latency = time.time() - start_time
         AppLogger().set_log_message(
@@ -84,7 +114,11 @@ async def get_books(request: Request, user=Depends(get_current_user)):
         )
 
 
-@router.get("/api/v1/books/search", response_model=BooksSearchResponse)
+@router.get(
+    "/api/v1/books/search",
+    response_model=BooksSearchResponse,
+    response_model_exclude_unset=True
+)
 async def get_search_books(
     title_param: str | None = Query(
         default=None, alias="title",
@@ -93,8 +127,17 @@ async def get_search_books(
     category_param: str | None = Query(
         default=None, alias="category", description="Categoria do livro"
     ),
+    limit: int = Query(
+        default=Config.PAGE_SIZE_DEFAULT, ge=1, le=Config.PAGE_SIZE_MAX,
+        description="Quantidade máxima de itens por página"
+    ),
+    cursor: str | None = Query(
+        default=None, description="Cursor retornado em pagination.next_cursor"
+    ),
     request: Request = None,
-    user=Depends(get_current_user)
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag),
+    fields=Depends(book_fields)
 ):
     """
     ### 🔍 Pesquisar Livros por Título e/ou Categoria
@@ -119,14 +162,18 @@ async def get_search_books(
 
     **Observações Importantes:**
     -   A busca por **título** é **case-insensitive** (não diferencia maiúsculas de minúsculas).
+    -   Se nenhum título contiver o texto informado, a busca tenta corrigir erros de digitação: havendo um título próximo o bastante, os resultados são dele e o campo `did_you_mean` indica o título usado; caso contrário, o erro 404 traz sugestões.
     -   A busca por **categoria** também é **case-insensitive**, pois o valor fornecido é convertido para minúsculas antes da comparação.
     -   Se nenhum critério (`title` ou `category`) for fornecido, a API retornará um erro 400.
     -   Se nenhum livro for encontrado com os critérios fornecidos, um erro 404 será retornado.
     -   Se o query parameter for inválido, a API retornará um erro 400 com uma mensagem detalhando os parâmetros permitidos.
+    -   O resultado é paginado: use `limit` (padrão 50, máximo 500) e envie `pagination.next_cursor` no parâmetro `cursor` para obter a próxima página.
+    -   Um cursor só vale para a mesma consulta e a mesma versão do catálogo; após uma atualização do catálogo, refaça a consulta sem cursor.
+    -   Use `fields` para retornar apenas algumas colunas (ex.: `fields=book_id,title,price_including_tax`); colunas omitidas não aparecem na resposta.
     -   É necessário enviar o token JWT no header Authorization: Bearer <token>.
     """  # noqa: E501
     start_time = time.time()
-    allowed_params = {"title", "category"}
+    allowed_params = {"title", "category", "limit", "cursor", "fields"}
     query_params = set(request.query_params.keys())
     extras = query_params - allowed_params
     if extras:
@@ -146,7 +193,7 @@ async def get_search_books(
             status_code=400,
             detail=(
                 f"Parâmetros não permitidos: '{', '.join(extras)}'. "
-                "Somente são aceitos: title, category."
+                "Somente são aceitos: title, category, limit, cursor, fields."
             )
         )
     if not title_param and not category_param:
@@ -166,42 +213,47 @@ async def get_search_books(
             status_code=400,
             detail="Pelo menos um parâmetro de busca deve ser fornecido (title ou category)."  # noqa: E501
         )
-    if category_param:
-        categorias_validas = get_unique_items(dados_csv, "category")
-        if category_param not in categorias_validas:
-            latency = time.time() - start_time
-            AppLogger().set_log_message(
-                AppLogger().create_logger("books"),
-                LoggerModel(
-                    status_code=400,
-                    endpoint="/api/v1/books/search",
-                    message=f"Categoria '{category_param}' não é permitida.",
-                    type="warning",
-                    method=request.method,
-                    latency=latency
-                )
-            )
-            raise HTTPException(
+    catalog = get_catalog()
+    if category_param and category_param not in catalog.categories:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("books"),
+            LoggerModel(
                 status_code=400,
-                detail=(
-                    f"Categoria '{category_param}' não é permitida. "
-                    f"Categorias válidas: {categorias_validas}"
-                )
+                endpoint="/api/v1/books/search",
+                message=f"Categoria '{category_param}' não é permitida.",
+                type="warning",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Categoria '{category_param}' não é permitida. "
+                f"Categorias válidas: {catalog.categories.sorted_names}"
             )
-    df_filter = dados_csv
+        )
+    did_you_mean = None
+    sugestoes = ""
     if title_param:
-        df_filter = df_filter[
-            df_filter["title"].str.contains(
-                title_param,
-                case=False,
-                na=False
+        posicoes = catalog.title_index.search(title_param)
+        if len(posicoes) == 0:
+            # Nenhum título contém o texto: tenta corrigir erros de digitação
+            did_you_mean, candidatos = catalog.title_resolver.resolve(
+                title_param, Config.FUZZY_SUGGESTIONS
             )
-        ]
-    if category_param:
-        df_filter = df_filter[
-            df_filter["category"].str.lower() == category_param.lower()
-        ]
-    if df_filter.empty:
+            if did_you_mean is not None:
+                posicoes = catalog.title_index.search(did_you_mean)
+            elif candidatos:
+                sugestoes = " Você quis dizer: {}?".format(
+                    ", ".join(f'"{titulo}"' for titulo in candidatos)
+                )
+        if category_param:
+            posicoes = catalog.categories.filter(posicoes, category_param)
+    else:
+        posicoes = catalog.categories.positions(category_param)
+    if len(posicoes) == 0:
         latency = time.time() - start_time
         if title_param and category_param:
             AppLogger().set_log_message(
@@ -219,6 +271,7 @@ async def get_search_books(
                 status_code=404,
                 detail=(
                     "Livro não encontrado ou não pertence à categoria informada."  # noqa: E501
+                    + sugestoes
                 )
             )
         elif title_param:
@@ -235,7 +288,7 @@ async def get_search_books(
             )
             raise HTTPException(
                 status_code=404,
-                detail="Livro não encontrado."
+                detail="Livro não encontrado." + sugestoes
             )
         else:
             AppLogger().set_log_message(
@@ -253,6 +306,10 @@ async def get_search_books(
                 status_code=404,
                 detail="Nenhum livro encontrado para a categoria informada."
             )
+    start, end, pagination = paginate_request(
+        request, "books", start_time, len(posicoes), cursor, limit,
+        catalog.version, {"title": title_param, "category": category_param}
+    )
     latency = time.time() - start_time
     AppLogger().set_log_message(
         AppLogger().create_logger("books"),
@@ -265,15 +322,30 @@ async def get_search_books(
             latency=latency
         )
     )
-    return {
+    resposta = {
         "success": True,
         "message": "Resultado encontrado com sucesso.",
-        "data": df_filter.to_dict(orient="records"),
+        "data": catalog.rows(posicoes[start:end], fields),
+        "pagination": pagination,
     }
+    if did_you_mean is not None:
+        resposta["did_you_mean"] = did_you_mean
+    return resposta
 
 
 @router.get("/api/v1/books/top-rated")
-async def get_top_rated_books(request: Request, user=Depends(get_current_user)):  # noqa: E501
+async def get_top_rated_books(
+    request: Request,
+    limit: int = Query(
+        default=Config.PAGE_SIZE_DEFAULT, ge=1, le=Config.PAGE_SIZE_MAX,
+        description="Quantidade máxima de itens por página"
+    ),
+    cursor: str | None = Query(
+        default=None, description="Cursor retornado em pagination.next_cursor"
+    ),
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag)
+):
     """### 🌟 Livros Mais Bem Avaliados
     Este endpoint retorna os livros mais bem avaliados, ou seja, aqueles que possuem a maior
     nota de avaliação (review_rating) igual a 5.
@@ -281,11 +353,14 @@ async def get_top_rated_books(request: Request, user=Depends(get_current_user)):
     #### Como usar:
     - Faça uma requisição GET para `/api/v1/books/top-rated`.
     - A resposta incluirá um dicionário com os títulos dos livros e suas respectivas avaliações
+    - A resposta é paginada: use `limit` (padrão 50, máximo 500) e envie `pagination.next_cursor`
+    no parâmetro `cursor` para obter a próxima página.
     - É necessário enviar o token JWT no header Authorization: Bearer <token>.
     """  # noqa: E501
     start_time = time.time()
     try:
-        if len(dados_csv) == 0:
+        catalog = get_catalog()
+        if len(catalog) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
                 AppLogger().create_logger("books"),
@@ -302,9 +377,28 @@ async def get_top_rated_books(request: Request, user=Depends(get_current_user)):
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
-        top_books = dados_csv[['title', 'review_rating']].query(
-            "review_rating == 5")
-        top_books = top_books.set_index('title')['review_rating'].to_dict()
+        posicoes = catalog.sorted_index('review_rating').range(5, 5)
+        start, end, pagination = paginate_request(
+            request, "books", start_time, len(posicoes), cursor, limit,
+            catalog.version, {}
+        )
+        cache_key = ("top-rated", start, end)
+        body = catalog.response_cache.get(cache_key)
+        if body is None:
+            top_books = {
+                book['title']: book['review_rating']
+                for book in catalog.rows(
+                    posicoes[start:end], ['title', 'review_rating']
+                )
+            }
+            body = catalog.response_cache.set(cache_key, encode_response({
+                "success": True,
+                "Messamessagege": "Valores retornados com sucesso",
+                "data": {
+                    "Top rated books": top_books
+                },
+                "pagination": pagination
+            }))
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("books"),
@@ -317,13 +411,9 @@ async def get_top_rated_books(request: Request, user=Depends(get_current_user)):
                 latency=latency
             )
         )
-        return {
-                "success": True,
-                "Messamessagege": "Valores retornados com sucesso",
-                "data": {
-                    "Top rated books": top_books
-                }
-        }
+        return JSONBytesResponse(body)
+    except HTTPException as http_error:
+        raise http_error
     except Exception as error:
         latency = time.time() - start_time
         AppLogger().set_log_message(
@@ -343,8 +433,58 @@ async def get_top_rated_books(request: Request, user=Depends(get_current_user)):
         )
 
 
-@router.get("/api/v1/books/{book_id}", response_model=BookDetailResponse)
-async def get_book_id(request: Request, book_id: int, user=Depends(get_current_user)):  # noqa: E501
+@router.post(
+    "/api/v1/books/batch",
+    response_model=BooksBatchResponse,
+    response_model_exclude_unset=True
+)
+async def post_books_batch(request: Request, body: BooksBatchRequest, user=Depends(get_current_user), fields=Depends(book_fields)):  # noqa: E501
+    """### 📚 Detalhes de Vários Livros por ID
+    Este endpoint retorna os detalhes de vários livros de uma só vez, a partir de uma lista de IDs.
+
+    #### Como usar:
+    -   Faça uma requisição POST para `/api/v1/books/batch` com o corpo `{"book_ids": [1000, 999, 1]}`.
+    -   Os livros são retornados na mesma ordem dos IDs enviados.
+    -   IDs inexistentes não geram erro: são listados em `not_found`.
+    -   São aceitos até 1000 IDs por requisição.
+    -   Use o parâmetro de query `fields` para retornar apenas algumas colunas (ex.: `/api/v1/books/batch?fields=book_id,title`).
+    -   É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    """  # noqa: E501
+    start_time = time.time()
+    catalog = get_catalog()
+    positions = catalog.pk_index.get_many(body.book_ids)
+    found = positions >= 0
+    not_found = [
+        book_id for book_id, ok in zip(body.book_ids, found.tolist()) if not ok
+    ]
+    latency = time.time() - start_time
+    AppLogger().set_log_message(
+        AppLogger().create_logger("books"),
+        LoggerModel(
+            status_code=200,
+            endpoint="/api/v1/books/batch",
+            message=f"Livros encontrados: {int(found.sum())}. Não encontrados: {len(not_found)}.",  # noqa: E501
+            type="info",
+            method=request.method,
+            latency=latency
+        )
+    )
+    return {
+        "success": True,
+        "message": "Livros encontrados com sucesso.",
+        "data": {
+            "books": catalog.rows(positions[found], fields),
+            "not_found": not_found
+        }
+    }
+
+
+@router.get(
+    "/api/v1/books/{book_id}",
+    response_model=BookDetailResponse,
+    response_model_exclude_unset=True
+)
+async def get_book_id(request: Request, book_id: int, user=Depends(get_current_user), etag=Depends(catalog_etag), fields=Depends(book_fields)):  # noqa: E501
     """### 📖 Detalhes do Livro por ID
     Este endpoint retorna os detalhes de um livro específico com base no seu ID.
 
@@ -352,11 +492,14 @@ async def get_book_id(request: Request, book_id: int, user=Depends(get_current_u
     -   Faça uma requisição GET para `/api/v1/books/{book_id}`, substituindo `{book_id}` pelo ID do livro desejado.
     -   A resposta incluirá um dicionário com os detalhes do livro, incluindo título, descrição, categoria, preço e outros atributos.
     -   Se o ID do livro não for encontrado, um erro 404 será retornado.
+    -   Use `fields` para retornar apenas algumas colunas (ex.: `/api/v1/books/10?fields=title,price_including_tax`).
     -   É necessário enviar o token JWT no header Authorization: Bearer <token>.
     """  # noqa: E501
     start_time = time.time()
-    if 0 < book_id <= len(dados_csv):
-        resultado = dados_csv[dados_csv["book_id"] == book_id]
+    catalog = get_catalog()
+    position = catalog.pk_index.get(book_id)
+    if position is not None:
+        resultado = catalog.rows([position], fields)
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("books"),
@@ -373,7 +516,7 @@ async def get_book_id(request: Request, book_id: int, user=Depends(get_current_u
             "success": True,
             "message": "Livro encontrado com sucesso.",
             "data": {
-                "book": resultado.to_dict(orient="records")[0]
+                "book": resultado[0]
             }
         }
     else:
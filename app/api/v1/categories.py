@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from app.api.v1.auth import get_current_user
-from app.utils.helpers import get_unique_items
-from app.api.root import dados_csv
+from app.utils.http_cache import catalog_etag
+from app.services.catalog import get_catalog
 from app.models.schemas.categories import (
     CategoriesResponse
 )
 from app.utils.app_logger import AppLogger
+from app.utils.response_cache import JSONBytesResponse, encode_response
 from app.models.logger import LoggerModel
 import time
 
@@ -13,11 +14,12 @@ router = APIRouter(tags=["Categories"])
 
 
 @router.get("/api/v1/categories", response_model=CategoriesResponse)
-async def get_categories(request: Request, user=Depends(get_current_user)):
+async def get_categories(request: Request, user=Depends(get_current_user), etag=Depends(catalog_etag)):  # noqa: E501
     """
     ### 📂 Listar Categorias
     Este endpoint retorna uma lista de todas as categorias disponíveis na coleção de livros.
     As categorias são ordenadas alfabeticamente e não contêm duplicatas.
+    A resposta é serializada uma única vez por versão do catálogo e reaproveitada.
     #### Como usar:
     - Faça uma requisição GET para `/api/v1/categories`.
     - A resposta incluirá uma lista de categorias únicas, ordenadas alfabeticamente.
@@ -25,8 +27,8 @@ async def get_categories(request: Request, user=Depends(get_current_user)):
     """  # noqa: E501
     start_time = time.time()
     try:
-        df_filter = get_unique_items(dados_csv, "category")
-        df_filter = sorted(df_filter, key=lambda x: x.lower())
+        catalog = get_catalog()
+        df_filter = catalog.categories.sorted_names
         if len(df_filter) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
@@ -44,6 +46,16 @@ async def get_categories(request: Request, user=Depends(get_current_user)):
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
+        body = catalog.response_cache.get("categories")
+        if body is None:
+            body = catalog.response_cache.set("categories", encode_response({
+                "success": True,
+                "message": "Categorias retornadas com sucesso.",
+                "data": {
+                    "total": len(df_filter),
+                    "categories": df_filter
+                }
+            }, CategoriesResponse))
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("categories"),
@@ -56,14 +68,9 @@ async def get_categories(request: Request, user=Depends(get_current_user)):
                 latency=latency
             )
         )
-        return {
-            "success": True,
-            "message": "Categorias retornadas com sucesso.",
-            "data": {
-                "total": len(df_filter),
-                "categories": df_filter
-            }
-        }
+        return JSONBytesResponse(body)
+    except HTTPException as http_error:
+        raise http_error
     except Exception as error:
         latency = time.time() - start_time
         AppLogger().set_log_message(
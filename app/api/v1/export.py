@@ -0,0 +1,182 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from app.api.v1.auth import get_current_user
+from app.utils.http_cache import catalog_etag
+from app.config import Config
+from app.services.catalog import CatalogSnapshot, get_catalog
+from app.utils.app_logger import AppLogger
+from app.utils.response_cache import dumps
+from app.models.logger import LoggerModel
+from typing import Literal, Optional
+import csv
+import io
+import numpy as np
+import time
+
+router = APIRouter(tags=["Books"])
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8"
+}
+
+
+def _filter_positions(
+        catalog: CatalogSnapshot,
+        title: Optional[str],
+        category: Optional[str],
+        min_price: Optional[float],
+        max_price: Optional[float],
+        price_column: str
+        ) -> np.ndarray | None:
+    """Posições (em ordem crescente) que atendem aos filtros, ou None se não houver filtros."""  # noqa: E501
+    filtros = []
+    if title:
+        filtros.append(catalog.title_index.search(title))
+    if category:
+        filtros.append(catalog.categories.positions(category))
+    if min_price is not None or max_price is not None:
+        filtros.append(
+            np.sort(catalog.sorted_index(price_column).range(
+                min_price, max_price
+            ))
+        )
+    if not filtros:
+        return None
+    filtros.sort(key=len)
+    posicoes = filtros[0]
+    for outras in filtros[1:]:
+        posicoes = np.intersect1d(posicoes, outras, assume_unique=True)
+    return posicoes
+
+
+def _chunks(catalog: CatalogSnapshot, posicoes: np.ndarray | None):
+    """Percorre as posições em blocos de `EXPORT_CHUNK_SIZE` linhas."""
+    chunk_size = Config.EXPORT_CHUNK_SIZE
+    total = len(catalog) if posicoes is None else len(posicoes)
+    for start in range(0, total, chunk_size):
+        end = min(start + chunk_size, total)
+        if posicoes is None:
+            yield catalog.rows(range(start, end))
+        else:
+            yield catalog.rows(posicoes[start:end])
+
+
+def _stream_ndjson(catalog: CatalogSnapshot, posicoes: np.ndarray | None):
+    for rows in _chunks(catalog, posicoes):
+        # `dumps` grava NaN como null (JSON válido em cada linha)
+        yield b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def _stream_csv(catalog: CatalogSnapshot, posicoes: np.ndarray | None):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=catalog.columns, delimiter=";")
+    writer.writeheader()
+    for rows in _chunks(catalog, posicoes):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+@router.get("/api/v1/books/export")
+async def export_books(
+    request: Request,
+    export_format: Literal["ndjson", "csv"] = Query(
+        default="ndjson", alias="format",
+        description="Formato do arquivo exportado"
+    ),
+    title: Optional[str] = Query(
+        default=None, description="Título ou parte do título do livro"
+    ),
+    category: Optional[str] = Query(
+        default=None, description="Categoria do livro"
+    ),
+    min: Optional[float] = None,
+    max: Optional[float] = None,
+    price_column: Literal[
+        "price_including_tax",
+        "price_excluding_tax",
+        "tax"
+    ] = Query(
+        default="price_including_tax",
+        description="Coluna de preço usada no filtro"
+    ),
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag)
+):
+    """### 📦 Exportar Catálogo
+    Este endpoint exporta o catálogo completo, ou um subconjunto filtrado, em streaming.
+    Os livros são enviados em blocos, de modo que o consumo de memória do servidor não
+    cresce com o tamanho do catálogo.
+
+    #### Como usar:
+    - Faça uma requisição GET para `/api/v1/books/export`.
+    - Use `format=ndjson` (padrão, um livro JSON por linha) ou `format=csv` (separado por ponto e vírgula).
+    - Filtros opcionais, combináveis: `title` (parte do título), `category`, `min`, `max` e `price_column`.
+    - Todo o arquivo é gerado a partir da mesma versão do catálogo, mesmo que ele seja
+    atualizado durante a exportação.
+    - É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    """  # noqa: E501
+    start_time = time.time()
+    catalog = get_catalog()
+    if category and category not in catalog.categories:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("export"),
+            LoggerModel(
+                status_code=400,
+                endpoint="/api/v1/books/export",
+                message=f"Categoria '{category}' não é permitida.",
+                type="warning",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(
+            status_code=400,
+            detail=f"Categoria '{category}' não é permitida."
+        )
+    if min is not None and max is not None and min > max:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("export"),
+            LoggerModel(
+                status_code=400,
+                endpoint="/api/v1/books/export",
+                message=f"Faixa de preço inválida: min={min} > max={max}.",
+                type="warning",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(
+            status_code=400,
+            detail="O valor de 'min' não pode ser maior que o de 'max'."
+        )
+    posicoes = _filter_positions(
+        catalog, title, category, min, max, price_column
+    )
+    stream = _stream_csv if export_format == "csv" else _stream_ndjson
+    latency = time.time() - start_time
+    AppLogger().set_log_message(
+        AppLogger().create_logger("export"),
+        LoggerModel(
+            status_code=200,
+            endpoint="/api/v1/books/export",
+            message=f"Exportação iniciada. Formato: {export_format}. Livros: {len(catalog) if posicoes is None else len(posicoes)}",  # noqa: E501
+            type="info",
+            method=request.method,
+            latency=latency
+        )
+    )
+    return StreamingResponse(
+        stream(catalog, posicoes),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="books.{export_format}"',  # noqa: E501
+            "X-Catalog-Version": catalog.version
+        }
+    )
@@ -0,0 +1,161 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from app.api.v1.auth import get_current_user
+from app.utils.http_cache import catalog_etag
+from app.utils.pagination import paginate_request
+from app.utils.projection import book_fields
+from app.services.catalog import get_catalog
+from app.models.schemas.facets import FacetSearchResponse
+from app.config import Config
+from app.utils.app_logger import AppLogger
+from app.models.logger import LoggerModel
+from typing import List, Optional
+import time
+
+router = APIRouter(tags=["Books"])
+
+
+def _invalid_values(request: Request, start_time: float, facet: str, invalid: list, valid: list):  # noqa: E501
+    latency = time.time() - start_time
+    AppLogger().set_log_message(
+        AppLogger().create_logger("facets"),
+        LoggerModel(
+            status_code=400,
+            endpoint="/api/v1/books/facets",
+            message=f"Valores inválidos para '{facet}': {invalid}.",
+            type="warning",
+            method=request.method,
+            latency=latency
+        )
+    )
+    raise HTTPException(
+        status_code=400,
+        detail=(
+            f"Valores inválidos para '{facet}': {invalid}. "
+            f"Valores válidos: {valid}"
+        )
+    )
+
+
+@router.get(
+    "/api/v1/books/facets",
+    response_model=FacetSearchResponse,
+    response_model_exclude_unset=True
+)
+async def get_facets(
+    request: Request,
+    category: Optional[List[str]] = Query(
+        default=None, description="Categorias (repita o parâmetro para mais de uma)"  # noqa: E501
+    ),
+    rating: Optional[List[int]] = Query(
+        default=None, description="Notas de avaliação, de 1 a 5"
+    ),
+    availability: Optional[List[str]] = Query(
+        default=None, description="Disponibilidade mínima, ex.: 5+"
+    ),
+    price: Optional[List[str]] = Query(
+        default=None, description="Faixas de preço, ex.: 20-30"
+    ),
+    limit: int = Query(
+        default=Config.PAGE_SIZE_DEFAULT, ge=1, le=Config.PAGE_SIZE_MAX,
+        description="Quantidade máxima de itens por página"
+    ),
+    cursor: Optional[str] = Query(
+        default=None, description="Cursor retornado em pagination.next_cursor"
+    ),
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag),
+    fields=Depends(book_fields)
+):
+    """### 🧭 Busca Facetada
+    Este endpoint combina filtros por categoria, nota, disponibilidade e faixa de preço e
+    retorna, junto com os livros, a contagem de livros de cada valor de cada faceta.
+
+    #### Como usar:
+    - Faça uma requisição GET para `/api/v1/books/facets`.
+    - Filtros opcionais, combináveis: `category`, `rating` (1 a 5), `availability`
+    (`1+`, `5+`, `10+`, `20+`: quantidade mínima em estoque) e `price` (faixas de
+    `price_including_tax`, como `10-20`, `20-30` ou `50+`).
+    - Repita um parâmetro para selecionar mais de um valor: `?rating=4&rating=5`.
+    Valores da mesma faceta são combinados com OU; facetas diferentes, com E.
+    - A contagem de cada faceta considera os filtros das demais facetas, mas não o
+    da própria, mostrando quantos livros seriam retornados ao trocar o valor.
+    - O resultado é paginado (`limit` e `cursor`), e `fields` seleciona as colunas retornadas.
+    - É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    """  # noqa: E501
+    start_time = time.time()
+    try:
+        catalog = get_catalog()
+        facets = catalog.facets
+        filters = {
+            "rating": [str(value) for value in rating or []],
+            "availability": availability or [],
+            "price": price or []
+        }
+        for facet, values in filters.items():
+            invalid = [v for v in values if v not in facets.bitmaps[facet]]
+            if invalid:
+                _invalid_values(
+                    request, start_time, facet, invalid, facets.labels(facet)
+                )
+        # Categorias sem diferenciar maiúsculas de minúsculas
+        filters["category"] = []
+        for name in category or []:
+            names = [
+                catalog.categories.names[code]
+                for code in catalog.categories.codes_for(name)
+            ]
+            if not names:
+                _invalid_values(
+                    request, start_time, "category", [name],
+                    catalog.categories.sorted_names
+                )
+            filters["category"].extend(
+                n for n in names if n in facets.bitmaps["category"]
+            )
+        posicoes, counts = facets.search(filters)
+        start, end, pagination = paginate_request(
+            request, "facets", start_time, len(posicoes), cursor, limit,
+            catalog.version, {
+                facet: sorted(values) for facet, values in filters.items()
+            }
+        )
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("facets"),
+            LoggerModel(
+                status_code=200,
+                endpoint="/api/v1/books/facets",
+                message="Resultado encontrado com sucesso.",
+                type="info",
+                method=request.method,
+                latency=latency
+            )
+        )
+        return {
+            "success": True,
+            "message": "Resultado encontrado com sucesso.",
+            "data": {
+                "books": catalog.rows(posicoes[start:end], fields),
+                "facets": counts
+            },
+            "pagination": pagination
+        }
+    except HTTPException:
+        raise
+    except Exception as error:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("facets"),
+            LoggerModel(
+                status_code=500,
+                endpoint="/api/v1/books/facets",
+                message=f"Erro interno: {error}",
+                type="error",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno : {error}"
+        )
@@ -0,0 +1,106 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from app.api.v1.auth import get_current_user
+from app.utils.http_cache import catalog_etag
+from app.utils.projection import book_fields
+from app.services.catalog import get_catalog
+from app.models.schemas.books import FullTextResponse
+from app.config import Config
+from app.utils.app_logger import AppLogger
+from app.models.logger import LoggerModel
+import time
+
+router = APIRouter(tags=["Books"])
+
+
+@router.get(
+    "/api/v1/books/fulltext",
+    response_model=FullTextResponse,
+    response_model_exclude_unset=True
+)
+async def get_fulltext(
+    request: Request,
+    q: str = Query(
+        ..., min_length=1, description="Texto buscado no título e na descrição"
+    ),
+    limit: int = Query(
+        default=Config.PAGE_SIZE_DEFAULT, ge=1, le=Config.PAGE_SIZE_MAX,
+        description="Quantidade máxima de livros retornados"
+    ),
+    user=Depends(get_current_user),
+    etag=Depends(catalog_etag),
+    fields=Depends(book_fields)
+):
+    """### 📝 Busca Textual Ranqueada
+    Este endpoint busca palavras no título e na descrição dos livros e retorna os
+    resultados ordenados por relevância (BM25).
+
+    #### Como usar:
+    - Faça uma requisição GET para `/api/v1/books/fulltext?q=dragon magic`.
+    - A busca não diferencia maiúsculas de minúsculas e ignora pontuação; livros que
+    contêm mais termos da consulta, e termos mais raros, recebem score maior.
+    - Use `limit` (padrão 50, máximo 500) para definir quantos livros são retornados
+    e `fields` para selecionar as colunas de cada livro.
+    - Se nenhum livro contiver os termos buscados, um erro 404 será retornado.
+    - É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    """  # noqa: E501
+    start_time = time.time()
+    try:
+        catalog = get_catalog()
+        hits = catalog.fulltext.search(q, limit)
+        if not hits:
+            latency = time.time() - start_time
+            AppLogger().set_log_message(
+                AppLogger().create_logger("fulltext"),
+                LoggerModel(
+                    status_code=404,
+                    endpoint="/api/v1/books/fulltext",
+                    message="Nenhum livro encontrado.",
+                    type="warning",
+                    method=request.method,
+                    latency=latency
+                )
+            )
+            raise HTTPException(
+                status_code=404,
+                detail="Nenhum livro encontrado."
+            )
+        livros = catalog.rows([position for position, _ in hits], fields)
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("fulltext"),
+            LoggerModel(
+                status_code=200,
+                endpoint="/api/v1/books/fulltext",
+                message="Resultado encontrado com sucesso.",
+                type="info",
+                method=request.method,
+                latency=latency
+            )
+        )
+        return {
+            "success": True,
+            "message": "Resultado encontrado com sucesso.",
+            "data": [
+                {"score": round(score, 4), "book": livro}
+                for (_, score), livro in zip(hits, livros)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as error:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("fulltext"),
+            LoggerModel(
+                status_code=500,
+                endpoint="/api/v1/books/fulltext",
+                message=f"Erro interno: {error}",
+                type="error",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno : {error}"
+        )
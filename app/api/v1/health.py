@@ -1,9 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from app.api.v1.auth import get_current_user
-from app.api.root import dados_csv
+from app.services.catalog import get_catalog
 from app.models.schemas.health import (
-    HealthResponse
+    HealthResponse,
+    StartupProfileResponse
 )
+from app.utils.startup_profile import profile
 from app.utils.app_logger import AppLogger
 from app.models.logger import LoggerModel
 import time
@@ -20,10 +22,12 @@ async def health(request: Request, user=Depends(get_current_user)):
     - Faça uma requisição GET para `/api/v1/health`.
     - A resposta incluirá o número total de registros e alguns dados de amostra.
     - É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    - A resposta nunca é armazenada em cache (`Cache-Control: no-store`).
     """  # noqa: E501
     start_time = time.time()
     try:
-        if dados_csv.empty:
+        catalog = get_catalog()
+        if len(catalog) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
                 AppLogger().create_logger("health"),
@@ -56,8 +60,8 @@ async def health(request: Request, user=Depends(get_current_user)):
             "success": True,
             "message": "Health check realizado com sucesso.",
             "data": {
-                "recordCount": len(dados_csv),
-                "sampleData": dados_csv.head(5).to_dict(orient="records")
+                "recordCount": len(catalog),
+                "sampleData": catalog.rows(range(min(5, len(catalog))))
             }
         }
     except Exception as error:
@@ -77,3 +81,36 @@ async def health(request: Request, user=Depends(get_current_user)):
             status_code=500,
             detail=f"Erro interno {error}"
         )
+
+
+@router.get("/api/v1/health/startup", response_model=StartupProfileResponse)
+async def startup_profile(request: Request, user=Depends(get_current_user)):  # noqa: E501
+    """### ⏱️ Perfil de inicialização da API
+    Retorna o tempo de import de cada módulo de rotas e o tempo de carga de cada
+    recurso (catálogo, índices e modelo de recomendação) deste worker.
+
+    #### Como usar:
+    - Faça uma requisição GET para `/api/v1/health/startup`.
+    - Recursos carregados sob demanda só aparecem depois do primeiro uso.
+    - Para o tempo de import de todas as dependências, execute `python -m app.utils.startup_profile`.
+    - É necessário enviar o token JWT no header Authorization: Bearer <token>.
+    """  # noqa: E501
+    start_time = time.time()
+    report = profile.report()
+    latency = time.time() - start_time
+    AppLogger().set_log_message(
+        AppLogger().create_logger("health"),
+        LoggerModel(
+            status_code=200,
+            endpoint="/api/v1/health/startup",
+            message="Perfil de inicialização retornado com sucesso.",
+            type="info",
+            method=request.method,
+            latency=latency
+        )
+    )
+    return {
+        "success": True,
+        "message": "Perfil de inicialização retornado com sucesso.",
+        "data": report
+    }
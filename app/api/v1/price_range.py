@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from app.api.v1.auth import get_current_user
-from typing import Optional
-from app.api.root import dados_csv
-from app.utils import helpers
+from app.utils.http_cache import catalog_etag
+from app.utils.projection import book_fields
+from typing import Literal, Optional
+from app.services.catalog import get_catalog
+from app.config import Config
+from app.utils.pagination import paginate_request
 from app.utils.app_logger import AppLogger
 from app.models.logger import LoggerModel
 import time
@@ -14,7 +17,26 @@ router = APIRouter(tags=["Books"])
 @router.get("/api/v1/books/price-range")
 async def get_min_max_price(request: Request, min: Optional[float] = None,
                             max: Optional[float] = None,
-                            user=Depends(get_current_user)
+                            price_column: Literal[
+                                "price_including_tax",
+                                "price_excluding_tax",
+                                "tax"
+                            ] = Query(
+                                default="price_including_tax",
+                                description="Coluna de preço usada no filtro"
+                            ),
+                            limit: int = Query(
+                                default=Config.PAGE_SIZE_DEFAULT,
+                                ge=1, le=Config.PAGE_SIZE_MAX,
+                                description="Quantidade máxima de itens por página"  # noqa: E501
+                            ),
+                            cursor: Optional[str] = Query(
+                                default=None,
+                                description="Cursor retornado em Pagination.next_cursor"  # noqa: E501
+                            ),
+                            user=Depends(get_current_user),
+                            etag=Depends(catalog_etag),
+                            fields=Depends(book_fields)
                             ):
     """
     ### 📂 Pesquisa por livros em uma faixa de preço
@@ -25,11 +47,20 @@ async def get_min_max_price(request: Request, min: Optional[float] = None,
     - Inserir os argumentos min e max, juntamente com o valor desejado para cada
     parâmetro, como por exemplo: 'price-range?min=22.00&max=28.00', desa forma buscando todos
     os livros que tem um range de preço entre 22.00 e 28.00.
+    - Os dois limites são opcionais: `price-range?min=50` busca todos os livros a partir de 50.00.
+    - Por padrão o filtro usa `price_including_tax`; use `price_column=price_excluding_tax`
+    ou `price_column=tax` para filtrar por outra coluna de preço.
+    - Os livros são retornados em ordem crescente de preço.
+    - O resultado é paginado: use `limit` (padrão 50, máximo 500) e envie `Pagination.next_cursor`
+    no parâmetro `cursor` para obter a próxima página.
+    - Use `fields` para retornar apenas algumas colunas, como por exemplo
+    'price-range?min=22.00&fields=book_id,title,price_including_tax'.
     - É necessário enviar o token JWT no header Authorization: Bearer <token>.
     """  # noqa: E501
     start_time = time.time()
     try:
-        if len(dados_csv) == 0:
+        catalog = get_catalog()
+        if len(catalog) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
                 AppLogger().create_logger("price-range"),
@@ -46,9 +77,30 @@ async def get_min_max_price(request: Request, min: Optional[float] = None,
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
-        resultado_filtragem_precos = helpers.get_price_range(
-            dados_csv, "price_including_tax", min, max
+        if min is not None and max is not None and min > max:
+            latency = time.time() - start_time
+            AppLogger().set_log_message(
+                AppLogger().create_logger("price-range"),
+                LoggerModel(
+                    status_code=400,
+                    endpoint="/api/v1/books/price-range",
+                    message=f"Faixa de preço inválida: min={min} > max={max}.",  # noqa: E501
+                    type="warning",
+                    method=request.method,
+                    latency=latency
+                )
             )
+            raise HTTPException(
+                status_code=400,
+                detail="O valor de 'min' não pode ser maior que o de 'max'."
+            )
+        # Busca binária sobre o índice ordenado da coluna de preço
+        posicoes = catalog.sorted_index(price_column).range(min, max)
+        start, end, pagination = paginate_request(
+            request, "price-range", start_time, len(posicoes), cursor, limit,
+            catalog.version,
+            {"min": min, "max": max, "price_column": price_column}
+        )
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("price-range"),
@@ -65,10 +117,9 @@ async def get_min_max_price(request: Request, min: Optional[float] = None,
                 "Success": True,
                 "Message": "Valores retornados com sucesso",
                 "Data": {
-                    "books": resultado_filtragem_precos.to_dict(
-                        orient="records"
-                        )
-                }
+                    "books": catalog.rows(posicoes[start:end], fields)
+                },
+                "Pagination": pagination
         }
     except HTTPException as http_error:
         raise http_error
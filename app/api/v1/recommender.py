@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.services.service import get_recommendations_from_title
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.config import Config
+from app.utils.projection import book_fields
+from app.services.service import (
+    get_recommendations_batch,
+    get_recommendations_detailed,
+    get_recommendations_from_title,
+    get_model,
+    resolve_title
+)
 from app.api.v1.auth import get_current_user
 from app.models.schemas.recommender import (
     RecomendarRequest,
-    RecomendacoesResponse
+    RecomendacoesResponse,
+    RecomendarLoteRequest,
+    RecomendacoesLoteResponse,
+    RecomendacoesDetalhadasResponse
 )
 
 
@@ -21,7 +33,8 @@ async def recomendar_livros(item: RecomendarRequest,
     fazer a mágica, encontrando obras similares que podem ser sua próxima obsessão.
 
     **Como funciona?**
-    - **Entrada:** Um objeto JSON com o título do seu livro favorito.
+    - **Entrada:** Um objeto JSON com o título do seu livro favorito e, opcionalmente,
+    `k`: a quantidade de recomendações (padrão 10, máximo 100).
     - **Processamento:** Nosso modelo de machine learning analisa o título e busca
     livros com características e temas semelhantes.
     - **Saída:** Uma lista de títulos recomendados, pronta para inspirar sua lista de leitura.
@@ -38,13 +51,21 @@ async def recomendar_livros(item: RecomendarRequest,
                     "A Light in the Attic"]}`
 
     **Status de Erro:**
-    - `404 Not Found`: Título do livro não encontrado em nossa base de dados.
+    - `404 Not Found`: Título do livro não encontrado em nossa base de dados. Títulos
+        com pequenos erros de digitação são corrigidos automaticamente (o título
+        usado volta em `livro_base`); quando não há um título próximo o bastante, a
+        mensagem de erro traz sugestões.
     - `500 Internal Server Error`: Ocorreu um problema inesperado no
         nosso sistema de recomendação.
     """
     try:
-        titulo = item.titulo_livro.strip()
-        recomendacoes = get_recommendations_from_title(title=titulo)
+        # Mesma versão do modelo para resolver o título e recomendar
+        model = get_model()
+        # Títulos com pequenos erros de digitação são corrigidos
+        titulo = resolve_title(item.titulo_livro.strip(), model)
+        recomendacoes = get_recommendations_from_title(
+            title=titulo, k=item.k, model=model
+        )
         return RecomendacoesResponse(
             livro_base=titulo,
             recomendacoes=recomendacoes
@@ -65,3 +86,124 @@ async def recomendar_livros(item: RecomendarRequest,
             status_code=500,
             detail=f"Ocorreu um erro ao gerar as recomendações: {e}"
         )
+
+
+@router.post(
+    "/api/v1/ml/predictions/batch",
+    response_model=RecomendacoesLoteResponse,
+    response_model_exclude_unset=True
+)
+async def recomendar_livros_lote(item: RecomendarLoteRequest,
+                                 user=Depends(get_current_user)
+                                 ):
+    """
+    ### Recomendações em Lote 📚
+    Gera recomendações para vários livros em uma única chamada, a partir de
+    títulos e/ou `book_id`s.
+
+    **Como funciona?**
+    - **Entrada:** `{"titulos": [...], "book_ids": [...], "k": 10}` (até 1000
+    itens em cada lista; `k` opcional, padrão 10).
+    - **Processamento:** todos os livros são resolvidos primeiro (títulos com
+    pequenos erros de digitação são corrigidos) e os vizinhos de todos eles são
+    obtidos em uma única operação vetorizada.
+    - **Saída:** `resultados`, um dicionário indexado pelo título ou `book_id`
+    enviado, com `livro_base` e `recomendacoes`. Um item não encontrado recebe
+    apenas `erro`, sem falhar o lote inteiro.
+
+    **Status de Erro:**
+    - `400 Bad Request`: Nenhum título ou `book_id` informado.
+    - `500 Internal Server Error`: Ocorreu um problema inesperado no
+        nosso sistema de recomendação.
+    """
+    if not item.titulos and not item.book_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe ao menos um título ou book_id."
+        )
+    try:
+        resultados = get_recommendations_batch(
+            titles=[titulo.strip() for titulo in item.titulos],
+            book_ids=item.book_ids,
+            k=item.k
+        )
+        return RecomendacoesLoteResponse(resultados=resultados)
+
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao gerar as recomendações: {e}"
+        )
+
+
+@router.get(
+    "/api/v1/ml/recommendations",
+    response_model=RecomendacoesDetalhadasResponse,
+    response_model_exclude_unset=True
+)
+async def recomendar_livros_detalhado(
+    book_id: Optional[int] = Query(
+        default=None, description="ID do livro base"
+    ),
+    title: Optional[str] = Query(
+        default=None, description="Título do livro base (se book_id não for informado)"  # noqa: E501
+    ),
+    k: int = Query(
+        default=Config.RECOMMENDATION_K, ge=1, le=Config.RECOMMENDATION_K_MAX,
+        description="Quantidade de recomendações"
+    ),
+    user=Depends(get_current_user),
+    fields=Depends(book_fields)
+):
+    """
+    ### Recomendações com Detalhes dos Livros 🔎
+    Retorna as recomendações de um livro já com o `book_id`, a similaridade e os
+    dados de catálogo de cada livro recomendado, sem precisar de uma busca por
+    título para cada recomendação.
+
+    **Como funciona?**
+    - **Entrada:** `book_id` ou `title` do livro base (títulos com pequenos erros de
+    digitação são corrigidos), `k` (padrão 10) e, opcionalmente, `fields` com as
+    colunas do catálogo desejadas (ex.: `fields=title,price_including_tax,image_url`).
+    - **Saída:** `livro_base` e a lista `recomendacoes`, em ordem decrescente de
+    similaridade (`score`, de 0 a 1).
+
+    **Status de Erro:**
+    - `400 Bad Request`: Nem `book_id` nem `title` foram informados.
+    - `404 Not Found`: Livro base não encontrado no modelo.
+    - `500 Internal Server Error`: Ocorreu um problema inesperado no
+        nosso sistema de recomendação.
+    """  # noqa: E501
+    if book_id is None and not title:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe o book_id ou o title do livro base."
+        )
+    try:
+        return get_recommendations_detailed(
+            book_id=book_id,
+            title=title.strip() if book_id is None else None,
+            k=k,
+            fields=fields
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=404,
+            detail=str(e)
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao gerar as recomendações: {e}"
+        )
@@ -4,9 +4,9 @@ from app.models.schemas.scraping import (
     ScrapingTriggerResponse,
     ScrapingStatusResponse,
 )
-from app.utils.scraping import BooksToScrape
 from app.models.databases.scraping import ScrapingRequest
 from app.models.databases.base import SessionLocal
+from app.services import catalog
 import logging
 import threading
 import uuid
@@ -16,6 +16,21 @@ router = APIRouter(tags=["Scraping"])
 scraping_lock = threading.Lock()
 
 
+def update_recommendation_model():
+    """Atualiza o modelo de recomendação de forma incremental (apenas os
+    livros novos ou alterados pelo scraping) e publica a nova versão.
+    Falhas são registradas sem invalidar o scraping."""
+    try:
+        # scikit-learn só é importado quando o modelo é atualizado
+        from app.models.ml_recomender.title_model import atualizar_modelo
+        version, stats = atualizar_modelo(incremental=True)
+        logging.info(f"Atualização do modelo de recomendação: {stats}")
+        return version or "inalterada"
+    except Exception as e:
+        logging.error(f"Erro ao atualizar o modelo de recomendação: {e}")
+        return "não atualizada"
+
+
 def run_scraping_job(request_id):
     session = SessionLocal()
     try:
@@ -24,16 +39,23 @@ def run_scraping_job(request_id):
             req.status = "running"
             req.message = "Scraping em andamento."
             session.commit()
+        # requests/bs4/pandas só são importados quando um scraping é executado
+        from app.utils.scraping import BooksToScrape
         scraper = BooksToScrape()
         books = scraper.get_books()
-        scraper.save_books_to_csv(books)
+        scraper.save_books_to_csv(books, filename=catalog.CSV_PATH)
         scraper.save_books_to_json(books)
+        # Publica a nova versão do catálogo sem reiniciar a API
+        snapshot = catalog.reload_catalog()
+        model_version = update_recommendation_model()
         if req:
             req.status = "done"
-            req.message = f"Scraping finalizado com sucesso. Livros coletados: {len(books)}"  # noqa: E501
+            req.message = f"Scraping finalizado com sucesso. Livros coletados: {len(books)}. Versão do catálogo: {snapshot.version}. Versão do modelo: {model_version}"  # noqa: E501
             session.commit()
         logging.info(
-            f"Scraping finalizado com sucesso. Livros coletados: {len(books)}"
+            f"Scraping finalizado com sucesso. Livros coletados: {len(books)}. "  # noqa: E501
+            f"Versão do catálogo: {snapshot.version}. "
+            f"Versão do modelo: {model_version}"
             )
     except Exception as e:
         session.rollback()
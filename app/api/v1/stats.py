@@ -1,11 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from app.api.v1.auth import get_current_user
-from app.api.root import dados_csv
-from app.utils import helpers
+from app.utils.http_cache import catalog_etag
+from app.services.catalog import get_catalog
 from app.models.schemas.stats import (
     StatsOverviewResponse
 )
 from app.utils.app_logger import AppLogger
+from app.utils.response_cache import JSONBytesResponse, encode_response
 from app.models.logger import LoggerModel
 import time
 
@@ -13,7 +14,7 @@ router = APIRouter(tags=["Stats"])
 
 
 @router.get('/api/v1/stats/overview', response_model=StatsOverviewResponse)
-async def get_overview_data(request: Request, user=Depends(get_current_user)):
+async def get_overview_data(request: Request, user=Depends(get_current_user), etag=Depends(catalog_etag)):  # noqa: E501
     """### 📊 Visão Geral dos Dados
     Este endpoint fornece uma visão geral dos dados disponíveis na coleção de livros.
     Ele retorna o total de registros, a média de preços e a distribuição de avaliações.
@@ -25,7 +26,8 @@ async def get_overview_data(request: Request, user=Depends(get_current_user)):
     """  # noqa: E501
     start_time = time.time()
     try:
-        if len(dados_csv) == 0:
+        catalog = get_catalog()
+        if len(catalog) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
                 AppLogger().create_logger("stats"),
@@ -42,6 +44,38 @@ async def get_overview_data(request: Request, user=Depends(get_current_user)):
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
+        cache_key = "stats/overview"
+        body = catalog.response_cache.get(cache_key)
+        if body is None:
+            from app.utils import helpers
+            df_livros = catalog.frame(['price_including_tax', 'review_rating'])
+            body = catalog.response_cache.set(cache_key, encode_response({
+                "success": True,
+                "message": "Overview sobre os dados.",
+                "data": {
+                    "total": len(df_livros),
+                    "average": round(
+                        df_livros['price_including_tax'].mean(), 2
+                    ),
+                    "ratingsDistribution": {
+                        "ratingOne": helpers.get_rating(
+                            df_livros, 'review_rating', 1, 0
+                        ),
+                        "ratingTwo": helpers.get_rating(
+                            df_livros, 'review_rating', 2, 0
+                        ),
+                        "ratingThree": helpers.get_rating(
+                            df_livros, 'review_rating', 3, 0
+                        ),
+                        "ratingFour": helpers.get_rating(
+                            df_livros, 'review_rating', 4, 0
+                        ),
+                        "ratingFive": helpers.get_rating(
+                            df_livros, 'review_rating', 5, 0
+                        ),
+                    }
+                }
+            }, StatsOverviewResponse))
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("stats"),
@@ -54,31 +88,9 @@ async def get_overview_data(request: Request, user=Depends(get_current_user)):
                 latency=latency
             )
         )
-        return {
-            "success": True,
-            "message": "Overview sobre os dados.",
-            "data": {
-                "total": len(dados_csv),
-                "average": round(dados_csv['price_including_tax'].mean(), 2),
-                "ratingsDistribution": {
-                    "ratingOne": helpers.get_rating(
-                        dados_csv, 'review_rating', 1, 0
-                    ),
-                    "ratingTwo": helpers.get_rating(
-                        dados_csv, 'review_rating', 2, 0
-                    ),
-                    "ratingThree": helpers.get_rating(
-                        dados_csv, 'review_rating', 3, 0
-                    ),
-                    "ratingFour": helpers.get_rating(
-                        dados_csv, 'review_rating', 4, 0
-                    ),
-                    "ratingFive": helpers.get_rating(
-                        dados_csv, 'review_rating', 5, 0
-                    ),
-                }
-            }
-        }
+        return JSONBytesResponse(body)
+    except HTTPException as http_error:
+        raise http_error
     except Exception as error:
         latency = time.time() - start_time
         AppLogger().set_log_message(
@@ -99,7 +111,7 @@ async def get_overview_data(request: Request, user=Depends(get_current_user)):
 
 
 @router.get("/api/v1/stats/categories")
-async def get_stats_categories(request: Request, user=Depends(get_current_user)):  # noqa: E501
+async def get_stats_categories(request: Request, user=Depends(get_current_user), etag=Depends(catalog_etag)):  # noqa: E501
     """### 📊 Estatísticas por Categoria
     Este endpoint retorna o número de livros por categoria e a média de preços por categoria.
 
@@ -110,7 +122,8 @@ async def get_stats_categories(request: Request, user=Depends(get_current_user))
     """  # noqa: E501
     start_time = time.time()
     try:
-        if len(dados_csv) == 0:
+        catalog = get_catalog()
+        if len(catalog) == 0:
             latency = time.time() - start_time
             AppLogger().set_log_message(
                 AppLogger().create_logger("stats"),
@@ -127,9 +140,22 @@ async def get_stats_categories(request: Request, user=Depends(get_current_user))
                 status_code=400,
                 detail="Arquivo CSV não está populado."
             )
-        number_books = dados_csv['category'].value_counts().to_dict()
-        average_price = dados_csv.groupby(
-            'category')['price_including_tax'].mean().round(2)
+        cache_key = "stats/categories"
+        body = catalog.response_cache.get(cache_key)
+        if body is None:
+            df_livros = catalog.frame(['category', 'price_including_tax'])
+            number_books = df_livros['category'].value_counts().to_dict()
+            average_price = df_livros.groupby(
+                'category', observed=True
+            )['price_including_tax'].mean().round(2)
+            body = catalog.response_cache.set(cache_key, encode_response({
+                "success": True,
+                "message": "Valores retornados com sucesso",
+                "data": {
+                    "numberBooks": number_books,
+                    "averagePrice": average_price.to_dict()
+                }
+            }))
         latency = time.time() - start_time
         AppLogger().set_log_message(
             AppLogger().create_logger("stats"),
@@ -142,14 +168,9 @@ async def get_stats_categories(request: Request, user=Depends(get_current_user))
                 latency=latency
             )
         )
-        return {
-                "success": True,
-                "message": "Valores retornados com sucesso",
-                "data": {
-                    "numberBooks": number_books,
-                    "averagePrice": average_price
-                }
-        }
+        return JSONBytesResponse(body)
+    except HTTPException as http_error:
+        raise http_error
     except Exception as error:
         latency = time.time() - start_time
         AppLogger().set_log_message(
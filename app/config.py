@@ -6,3 +6,37 @@ class Config:
     VERSION = "1.0.0"
     TITLE = "FIAP - Biblioteca Digital API"
     DESCRIPTION = "API para consulta, pesquisa e análise de livros da Biblioteca Digital FIAP. Permite acesso a informações detalhadas, categorias, estatísticas e health check dos dados."  # noqa: E501
+    BOOKS_BATCH_LIMIT = 1000
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 500
+    EXPORT_CHUNK_SIZE = 500
+    RESPONSE_CACHE_SIZE = 256
+    HTTP_CACHE_MAX_AGE = 60
+    CATALOG_POLL_SECONDS = 2
+    VERSION_GRACE_SECONDS = 300
+    WARM_UP_ON_STARTUP = True
+    FACET_PRICE_EDGES = [10, 20, 30, 40, 50]
+    FACET_AVAILABILITY_THRESHOLDS = [1, 5, 10, 20]
+    FULLTEXT_K1 = 1.2
+    FULLTEXT_B = 0.75
+    FUZZY_CANDIDATES = 20
+    FUZZY_MAX_DISTANCE_RATIO = 0.2
+    FUZZY_MIN_SIMILARITY = 0.3
+    FUZZY_SUGGESTIONS = 5
+    MODEL_NEIGHBORS = 50
+    MODEL_NEIGHBORS_SLACK = 25
+    MODEL_BLOCK_SIZE = 1024
+    MODEL_INCREMENTAL_MAX_RATIO = 0.3
+    MODEL_POLL_SECONDS = 2
+    MODEL_WORKERS = None
+    MODEL_MEMORY_MB = 1024
+    ANN_LISTS = None
+    ANN_ITERATIONS = 10
+    ANN_TRAIN_SAMPLE = 50000
+    ANN_SEED = 42
+    ANN_PROBES = 8
+    ANN_CANDIDATES = 2000
+    ANN_EXACT_MAX_BOOKS = 20000
+    RECOMMENDATION_K = 10
+    RECOMMENDATION_K_MAX = 100
+    RECOMMENDATION_BATCH_LIMIT = 1000
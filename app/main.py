@@ -1,32 +1,82 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config import Config
-from app.api import root
-from app.api.v1 import (
-    books,
-    categories,
-    health,
-    stats,
-    users,
-    auth,
-    scraping,
-    price_range,
-    recommender
-)
+from app.utils.http_cache import CacheHeadersMiddleware
+from app.utils.startup_profile import profile
+
+# Ordem de registro das rotas: rotas fixas de /api/v1/books/* antes de
+# /api/v1/books/{book_id}
+ROUTERS = [
+    "app.api.root",
+    "app.api.v1.recommender",
+    "app.api.v1.categories",
+    "app.api.v1.health",
+    "app.api.v1.stats",
+    "app.api.v1.price_range",
+    "app.api.v1.export",
+    "app.api.v1.facets",
+    "app.api.v1.fulltext",
+    "app.api.v1.books",
+    "app.api.v1.users",
+    "app.api.v1.auth",
+    "app.api.v1.scraping"
+]
+
+
+def warm_up():
+    """Carrega o catálogo, seus índices e o modelo de recomendação.
+
+    Executada no startup (lifespan) quando `Config.WARM_UP_ON_STARTUP` está
+    ativo; caso contrário, cada recurso é carregado na primeira requisição
+    que o utiliza. O tempo de cada carga fica registrado em `profile`. Se
+    nenhuma versão do modelo foi publicada (checkout limpo), o modelo é
+    gerado a partir do catálogo antes de ser carregado.
+    """  # noqa: E501
+    from app.services.catalog import get_catalog
+    from app.services.service import load_model
+    from app.models.ml_recomender.model_store import current_version
+    try:
+        with profile.resource("catalog"):
+            catalog = get_catalog()
+        with profile.resource("catalog_indexes"):
+            catalog.pk_index
+            catalog.categories
+            catalog.sorted_titles
+            catalog.title_index
+            catalog.title_resolver
+            catalog.facets
+            catalog.fulltext
+    except Exception as error:
+        print(f"ERRO: Não foi possível carregar o catálogo: {error}")
+    with profile.resource("recommendation_model"):
+        if current_version() is None:
+            # Checkout limpo: nenhum modelo publicado ainda
+            try:
+                from app.models.ml_recomender.title_model import (
+                    garantir_modelo
+                )
+                garantir_modelo()
+            except Exception as error:
+                print(f"ERRO: Não foi possível gerar o modelo de recomendação: {error}")  # noqa: E501
+        load_model()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if Config.WARM_UP_ON_STARTUP:
+        warm_up()
+    yield
+
 
 app = FastAPI(
     title=Config.TITLE,
     version=Config.VERSION,
     debug=Config.DEBUG,
-    description=Config.DESCRIPTION
+    description=Config.DESCRIPTION,
+    lifespan=lifespan
 )
 
-app.include_router(root.router)
-app.include_router(recommender.router)
-app.include_router(categories.router)
-app.include_router(health.router)
-app.include_router(stats.router)
-app.include_router(price_range.router)
-app.include_router(books.router)
-app.include_router(users.router)
-app.include_router(auth.router)
-app.include_router(scraping.router)
+app.add_middleware(CacheHeadersMiddleware)
+
+for module_name in ROUTERS:
+    app.include_router(profile.import_module(module_name).router)
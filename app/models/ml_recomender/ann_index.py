@@ -0,0 +1,477 @@
+import argparse
+import time
+import numpy as np
+import scipy.sparse as sp
+from app.config import Config
+from app.models.ml_recomender.similarity import top_k_rows
+
+# Bits baixos do termo usados no filtro da reordenação (2^16 posições,
+# tamanho fixo, independente do vocabulário)
+FILTER_BITS = 16
+
+
+class IVFIndex:
+    """Índice aproximado de vizinhos por arquivo invertido (IVF).
+
+    Os livros são agrupados em `lists` grupos por k-means esférico sobre os
+    vetores normalizados (centroides também normalizados, similaridade de
+    cosseno). Uma consulta compara o vetor do livro com os centroides,
+    visita os `probes` grupos mais próximos e reordena seus membros pela
+    similaridade exata. Como vetores de texto tendem a ter cossenos baixos
+    mesmo entre vizinhos, os grupos capturam melhor a vizinhança do que
+    códigos de hiperplanos aleatórios (LSH).
+
+    Os membros de cada grupo ficam contíguos (formato CSR): os livros do
+    grupo `g` são `members[offsets[g]:offsets[g + 1]]`, em ordem crescente.
+    Os centroides também são esparsos (CSR, termos × lists): cada termo
+    guarda apenas os grupos em que aparece, de modo que o índice cresce com
+    os termos dos livros, e não com vocabulário × grupos. A consulta lê só
+    as linhas dos termos do livro e custa O(entradas desses termos nos
+    centroides + candidatos), e não O(N) nem O(vocabulário).
+
+    Attributes:
+    -----------
+        centroids (sp.csr_matrix): Centroides normalizados, transpostos
+            (termos × lists): a linha de cada termo é contígua.
+        offsets (np.ndarray): Início dos membros de cada grupo.
+        members (np.ndarray): Posições dos livros, agrupadas por grupo.
+        feature_matrix: Matriz de features normalizada, para a reordenação.
+    """  # noqa: E501
+
+    def __init__(self, state: dict, feature_matrix):
+        # np.asarray: arrays mapeados (np.memmap) como ndarray simples, sem
+        # o custo de cada operação em uma subclasse
+        self.offsets = np.asarray(state['offsets'])
+        self.members = np.asarray(state['members'])
+        if 'centroids' in state:
+            # Versões anteriores do modelo: centroides densos
+            self.centroids = sp.csr_matrix(np.asarray(state['centroids']))
+        else:
+            self.centroids = sp.csr_matrix(
+                (
+                    np.asarray(state['centroids.data']),
+                    np.asarray(state['centroids.indices']),
+                    np.asarray(state['centroids.indptr'])
+                ),
+                shape=(
+                    len(state['centroids.indptr']) - 1,
+                    len(self.offsets) - 1
+                )
+            )
+        self.feature_matrix = feature_matrix
+        # A reordenação lê os arrays CSR diretamente: indexar a matriz
+        # esparsa custa dezenas de microssegundos por chamada
+        self._indptr = np.asarray(feature_matrix.indptr)
+        self._indices = np.asarray(feature_matrix.indices)
+        self._data = np.asarray(feature_matrix.data)
+
+    @property
+    def lists(self) -> int:
+        return len(self.offsets) - 1
+
+    @staticmethod
+    def default_lists(total: int) -> int:
+        """Quantidade de grupos: ~√N, com ao menos um grupo."""
+        return max(1, int(np.sqrt(total)))
+
+    @classmethod
+    def build(cls, feature_matrix,
+              lists: int | None = Config.ANN_LISTS,
+              iterations: int = Config.ANN_ITERATIONS,
+              sample: int = Config.ANN_TRAIN_SAMPLE,
+              seed: int = Config.ANN_SEED,
+              block_size: int = Config.MODEL_BLOCK_SIZE):
+        """
+        Treina os centroides (k-means esférico sobre uma amostra) e
+        distribui todos os livros nos grupos, em blocos de `block_size`
+        linhas.
+
+        Parameters:
+        ----------
+        feature_matrix : scipy.sparse.csr_matrix
+            Vetores dos livros com norma L2 unitária.
+        lists : int, optional
+            Quantidade de grupos: mais grupos tornam cada consulta mais
+            barata, mas exigem mais `probes` para o mesmo recall. Sem
+            valor, usa `default_lists`.
+        iterations : int
+            Iterações do k-means.
+        sample : int
+            Livros usados no treino dos centroides.
+        seed : int
+            Semente da amostra e dos centroides iniciais.
+        block_size : int
+            Linhas atribuídas por vez.
+        Returns:
+        -------
+        IVFIndex
+            Índice construído.
+        """  # noqa: E501
+        total = feature_matrix.shape[0]
+        lists = cls.default_lists(total) if lists is None else lists
+        lists = max(1, min(lists, total))
+        rng = np.random.default_rng(seed)
+        training = feature_matrix[
+            np.sort(rng.choice(total, min(total, max(sample, lists)), replace=False))  # noqa: E501
+        ]
+        # Centroides esparsos (lists × termos): cada um tem só os termos dos
+        # seus membros
+        centroids = training[
+            rng.choice(training.shape[0], lists, replace=False)
+        ]
+        shape = (lists, training.shape[0])
+        for _ in range(iterations):
+            assignment = cls._assign(training, centroids.T.tocsr(), block_size)  # noqa: E501
+            centroids = cls._one_hot(
+                assignment, np.arange(len(assignment)), shape
+            ) @ training
+            # Grupos vazios recebem um livro aleatório da amostra
+            empty = np.flatnonzero(np.diff(centroids.indptr) == 0)
+            if len(empty):
+                centroids = centroids + cls._one_hot(
+                    empty, rng.choice(training.shape[0], len(empty)), shape
+                ) @ training
+            centroids = cls._normalize(centroids.tocsr())
+        centroids_t = centroids.T.tocsr().astype(np.float32)
+        centroids_t.sort_indices()
+        return cls._from_assignment(
+            centroids_t,
+            cls._assign(feature_matrix, centroids_t, block_size),
+            feature_matrix
+        )
+
+    @classmethod
+    def update(cls, state: dict, feature_matrix, previous: np.ndarray,
+               block_size: int = Config.MODEL_BLOCK_SIZE):
+        """
+        Atualiza um índice após uma atualização incremental do modelo, sem
+        treinar os centroides novamente: os livros que não mudaram mantêm
+        o grupo e apenas os novos ou alterados são atribuídos.
+
+        Parameters:
+        ----------
+        state : dict
+            Arrays do índice anterior (`state`).
+        feature_matrix : scipy.sparse.csr_matrix
+            Nova matriz de features (pode ter termos novos ao final).
+        previous : np.ndarray
+            Para cada linha da nova matriz, a posição do livro no índice
+            anterior, ou -1 para livros novos ou alterados.
+        block_size : int
+            Linhas atribuídas por vez.
+        Returns:
+        -------
+        IVFIndex
+            Índice atualizado.
+        """  # noqa: E501
+        previous_index = cls(state, feature_matrix)
+        offsets = previous_index.offsets
+        members = previous_index.members
+        centroids_t = previous_index.centroids
+        # Termos novos no vocabulário: linhas vazias (peso zero em todos os
+        # centroides)
+        new_terms = feature_matrix.shape[1] - centroids_t.shape[0]
+        if new_terms > 0:
+            centroids_t = sp.csr_matrix(
+                (
+                    centroids_t.data,
+                    centroids_t.indices,
+                    np.append(
+                        centroids_t.indptr,
+                        np.full(new_terms, centroids_t.indptr[-1])
+                    )
+                ),
+                shape=(feature_matrix.shape[1], centroids_t.shape[1])
+            )
+        old_assignment = np.empty(len(members), dtype=np.int64)
+        old_assignment[members] = np.repeat(
+            np.arange(len(offsets) - 1), np.diff(offsets)
+        )
+        assignment = np.empty(feature_matrix.shape[0], dtype=np.int64)
+        kept = previous >= 0
+        assignment[kept] = old_assignment[previous[kept]]
+        dirty = np.flatnonzero(~kept)
+        assignment[dirty] = cls._assign(
+            feature_matrix[dirty], centroids_t, block_size
+        )
+        return cls._from_assignment(centroids_t, assignment, feature_matrix)
+
+    @classmethod
+    def _from_assignment(cls, centroids_t, assignment: np.ndarray,
+                         feature_matrix):
+        lists = centroids_t.shape[1]
+        offsets = np.zeros(lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=lists), out=offsets[1:])
+        state = {
+            'centroids.data': centroids_t.data,
+            'centroids.indices': centroids_t.indices,
+            'centroids.indptr': centroids_t.indptr,
+            'offsets': offsets,
+            'members': np.argsort(assignment, kind='stable').astype(np.int32)
+        }
+        return cls(state, feature_matrix)
+
+    @staticmethod
+    def _one_hot(rows: np.ndarray, columns: np.ndarray, shape: tuple):
+        """Matriz esparsa com 1 em cada (`rows[i]`, `columns[i]`)."""
+        return sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+            shape=shape
+        )
+
+    @staticmethod
+    def _normalize(centroids):
+        norms = np.sqrt(np.asarray(centroids.multiply(centroids).sum(axis=1)).ravel())  # noqa: E501
+        return sp.diags(1 / np.where(norms > 0, norms, 1)) @ centroids
+
+    @staticmethod
+    def _assign(matrix, centroids_t, block_size: int) -> np.ndarray:
+        """Grupo de maior similaridade de cada linha de `matrix`."""
+        assignment = np.empty(matrix.shape[0], dtype=np.int64)
+        for start in range(0, matrix.shape[0], block_size):
+            end = min(start + block_size, matrix.shape[0])
+            assignment[start:end] = (
+                matrix[start:end] @ centroids_t
+            ).toarray().argmax(axis=1)
+        return assignment
+
+    def state(self) -> dict:
+        """Arrays do índice, para serem salvos junto com o modelo."""
+        return {
+            'centroids.data': self.centroids.data,
+            'centroids.indices': self.centroids.indices,
+            'centroids.indptr': self.centroids.indptr,
+            'offsets': self.offsets,
+            'members': self.members
+        }
+
+    def candidates(self, position: int,
+                   probes: int = Config.ANN_PROBES,
+                   max_candidates: int = Config.ANN_CANDIDATES) -> np.ndarray:  # noqa: E501
+        """
+        Posições dos livros dos `probes` grupos mais próximos de `position`
+        (sem o próprio livro), em ordem crescente, limitadas a
+        `max_candidates` (os grupos mais próximos primeiro).
+        """
+        terms, values = self._row(position)
+        # Similaridade com os centroides só pelas linhas dos termos do livro
+        owner, flat = self._entries(self.centroids.indptr, terms)
+        similarity = np.bincount(
+            self.centroids.indices[flat],
+            weights=self.centroids.data[flat] * values[owner],
+            minlength=self.lists
+        )
+        probes = max(1, min(probes, self.lists))
+        nearest = np.argpartition(-similarity, probes - 1)[:probes]
+        nearest = nearest[np.argsort(-similarity[nearest], kind='stable')]
+        found = []
+        remaining = max_candidates + 1
+        for group in nearest.tolist():
+            start = int(self.offsets[group])
+            end = min(int(self.offsets[group + 1]), start + remaining)
+            found.append(self.members[start:end])
+            remaining -= end - start
+            if remaining <= 0:
+                break
+        candidates = np.sort(np.concatenate(found))
+        return candidates[candidates != position][:max_candidates]
+
+    def query(self, position: int, k: int,
+              probes: int = Config.ANN_PROBES,
+              max_candidates: int = Config.ANN_CANDIDATES):
+        """
+        Retorna os `k` livros aproximadamente mais similares a `position`
+        e as similaridades exatas, em ordem decrescente (empates pelo menor
+        índice). Pode retornar menos de `k` livros se houver poucos
+        candidatos.
+        """
+        candidates = self.candidates(position, probes, max_candidates)
+        scores = self._similarities(candidates, *self._row(position))
+        top, top_scores = top_k_rows(scores.reshape(1, -1), k)
+        return candidates[top[0]].astype(np.int32), top_scores[0]
+
+    def _row(self, position: int):
+        start = self._indptr[position]
+        end = self._indptr[position + 1]
+        return self._indices[start:end], self._data[start:end]
+
+    @staticmethod
+    def _entries(indptr: np.ndarray, rows: np.ndarray):
+        """
+        Posições, nos arrays de uma matriz CSR, das entradas das linhas
+        `rows`, e a linha (índice em `rows`) de cada entrada.
+        """
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        flat = np.arange(lengths.sum()) + np.repeat(
+            starts - (np.cumsum(lengths) - lengths), lengths
+        )
+        return owner, flat
+
+    def _similarities(self, candidates: np.ndarray, terms: np.ndarray,
+                      values: np.ndarray) -> np.ndarray:
+        """Produto escalar de cada candidato com o vetor (`terms`, `values`)."""  # noqa: E501
+        if not len(terms):
+            return np.zeros(len(candidates), dtype=np.float32)
+        owner, flat = self._entries(self._indptr, candidates)
+        found = self._indices[flat]
+        # Sem um vetor do tamanho do vocabulário: um filtro pelos bits
+        # baixos do termo descarta quase todas as entradas que não estão na
+        # consulta, e as restantes são confirmadas por busca binária nos
+        # termos ordenados da consulta
+        mask = (1 << FILTER_BITS) - 1
+        hit = np.zeros(1 << FILTER_BITS, dtype=bool)
+        hit[terms & mask] = True
+        keep = np.flatnonzero(hit[found & mask])
+        order = np.argsort(terms)
+        terms = terms[order]
+        slot = np.minimum(
+            np.searchsorted(terms, found[keep]), len(terms) - 1
+        )
+        matched = terms[slot] == found[keep]
+        keep = keep[matched]
+        products = self._data[flat[keep]] * values[order][slot[matched]]
+        return np.bincount(
+            owner[keep], weights=products, minlength=len(candidates)
+        ).astype(np.float32)
+
+    def query_many(self, positions: np.ndarray, k: int,
+                   probes: int = Config.ANN_PROBES,
+                   max_candidates: int = Config.ANN_CANDIDATES):
+        """
+        Versão de `query` para várias posições.
+
+        Returns:
+        -------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Ids (int32, linhas × k), similaridades (float32, linhas × k) e
+            uma máscara das linhas completas; as linhas com menos de `k`
+            candidatos ficam incompletas (zeradas) e devem ser calculadas
+            de forma exata.
+        """  # noqa: E501
+        neighbors = np.zeros((len(positions), k), dtype=np.int32)
+        scores = np.zeros((len(positions), k), dtype=np.float32)
+        complete = np.zeros(len(positions), dtype=bool)
+        for row, position in enumerate(np.asarray(positions).tolist()):
+            ids, values = self.query(position, k, probes, max_candidates)
+            if len(ids) == k:
+                neighbors[row], scores[row] = ids, values
+                complete[row] = True
+        return neighbors, scores, complete
+
+
+def exact_neighbors(feature_matrix, positions: np.ndarray, k: int,
+                    block_size: int = 64):
+    """Vizinhos exatos de `positions` (produto esparso em blocos)."""
+    positions = np.asarray(positions)
+    neighbors = np.zeros((len(positions), k), dtype=np.int32)
+    matrix_t = feature_matrix.T.tocsr()
+    for start in range(0, len(positions), block_size):
+        end = min(start + block_size, len(positions))
+        batch = positions[start:end]
+        block = (feature_matrix[batch] @ matrix_t).toarray()
+        neighbors[start:end], _ = top_k_rows(block, k, exclude=batch)
+    return neighbors
+
+
+def recall_report(index: IVFIndex, k: int = Config.RECOMMENDATION_K,
+                  sample: int = 200, probes_list=(1, 4, 16),
+                  candidates_list=(500, 2000), seed: int = 0) -> list:
+    """
+    Compara o índice com a busca exata para uma amostra de livros.
+
+    Para cada combinação de `probes` e `max_candidates`, mede o recall@k
+    (fração dos `k` vizinhos exatos encontrados), a latência média e p95
+    por consulta e o número médio de candidatos reordenados.
+
+    Returns:
+    -------
+    list
+        Um dicionário por combinação (`probes`, `candidates`, `recall`,
+        `meanMs`, `p95Ms`, `meanCandidates`).
+    """  # noqa: E501
+    total = index.feature_matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(total, min(sample, total), replace=False)
+    exact = exact_neighbors(index.feature_matrix, positions, k)
+    report = []
+    for probes in probes_list:
+        for max_candidates in candidates_list:
+            hits = 0
+            latencies = []
+            sizes = []
+            for position, expected in zip(positions.tolist(), exact):
+                start = time.perf_counter()
+                ids, _ = index.query(position, k, probes, max_candidates)
+                latencies.append(time.perf_counter() - start)
+                hits += len(np.intersect1d(ids, expected))
+                sizes.append(len(index.candidates(position, probes, max_candidates)))  # noqa: E501
+            report.append({
+                "probes": probes,
+                "candidates": max_candidates,
+                "recall": round(hits / (len(positions) * k), 4),
+                "meanMs": round(float(np.mean(latencies)) * 1000, 4),
+                "p95Ms": round(float(np.percentile(latencies, 95)) * 1000, 4),  # noqa: E501
+                "meanCandidates": round(float(np.mean(sizes)), 1)
+            })
+    return report
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.models.ml_recomender.ann_index [--lists 64] [--probes 1 4 16] [--publish]  # noqa: E501
+    from app.models.ml_recomender.model_store import (
+        open_model,
+        save_model_version
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Constrói o índice aproximado (IVF) do modelo publicado "
+                    "e mede o recall em relação à busca exata."
+    )
+    parser.add_argument("--lists", type=int, default=Config.ANN_LISTS)
+    parser.add_argument("--iterations", type=int, default=Config.ANN_ITERATIONS)  # noqa: E501
+    parser.add_argument("--train-sample", type=int, default=Config.ANN_TRAIN_SAMPLE)  # noqa: E501
+    parser.add_argument("--seed", type=int, default=Config.ANN_SEED)
+    parser.add_argument("--k", type=int, default=Config.RECOMMENDATION_K)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[500, 2000])  # noqa: E501
+    parser.add_argument(
+        "--publish",
+        action="store_true",
+        help="publica uma nova versão do modelo com o índice construído"
+    )
+    args = parser.parse_args()
+
+    model = open_model()
+    if model is None:
+        raise SystemExit(
+            "Nenhum modelo publicado; gere-o com "
+            "python -m app.models.ml_recomender.title_model"
+        )
+    feature_matrix = model.feature_matrix
+
+    start = time.perf_counter()
+    index = IVFIndex.build(
+        feature_matrix,
+        args.lists,
+        args.iterations,
+        args.train_sample,
+        args.seed
+    )
+    print(
+        f"Índice: {index.lists} grupos, "
+        f"{feature_matrix.shape[0]} livros ({time.perf_counter() - start:.2f}s)."  # noqa: E501
+    )
+    print(f"Recall@{args.k} (amostra de {args.sample} livros):")
+    for row in recall_report(index, args.k, args.sample, args.probes, args.candidates):  # noqa: E501
+        print(
+            f"  probes={row['probes']:<3} candidatos={row['candidates']:<6} "
+            f"recall={row['recall']:.4f}  média={row['meanMs']:.3f}ms  "
+            f"p95={row['p95Ms']:.3f}ms  candidatos/consulta={row['meanCandidates']}"  # noqa: E501
+        )
+    if args.publish:
+        components = {**model.components(), 'ann': index.state()}
+        stats = {"mode": "ann", "base": model.version}
+        print(f"Modelo publicado: versão {save_model_version(components, stats)}.")  # noqa: E501
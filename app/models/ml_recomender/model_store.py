@@ -0,0 +1,373 @@
+import bisect
+import functools
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+from app.config import Config
+from app.services.indexes import FuzzyTitleIndex, PrimaryKeyIndex
+from app.utils import columnar
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+MODEL_DIR = str(PROJECT_ROOT / "app" / "data" / "model")
+MODEL_FORMAT = 2
+KEEP_VERSIONS = 2
+# Arrays do índice aproximado nas versões com centroides densos, cujo
+# manifesto registra apenas `"ann": true`
+LEGACY_ANN_ARRAYS = ("centroids", "offsets", "members")
+
+
+class TitleTable:
+    """Tabela compacta título -> posição do livro no modelo.
+
+    Guarda apenas as posições dos títulos em ordem alfabética (um int32 por
+    título distinto); os textos ficam na coluna `title` mapeada em memória.
+    A busca é binária e decodifica O(log N) títulos por consulta. Em
+    títulos repetidos vale a primeira posição.
+
+    Attributes:
+    -----------
+        titles (StringColumn): Título de cada posição do modelo.
+        order (np.ndarray): Posições dos títulos distintos, em ordem alfabética.
+    """  # noqa: E501
+
+    def __init__(self, titles, order: np.ndarray):
+        self.titles = titles
+        self.order = order
+
+    @staticmethod
+    def build(titles: list) -> np.ndarray:
+        """Posições dos títulos distintos (primeira ocorrência) em ordem alfabética."""  # noqa: E501
+        first = {}
+        for position, title in enumerate(titles):
+            first.setdefault(title, position)
+        return np.array(
+            [first[title] for title in sorted(first)], dtype=np.int32
+        )
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __getitem__(self, rank: int) -> str:
+        return self.titles[int(self.order[rank])]
+
+    def get(self, title: str) -> int | None:
+        """Retorna a posição do título, ou None se ele não existir."""
+        rank = bisect.bisect_left(self, title)
+        if rank < len(self) and self[rank] == title:
+            return int(self.order[rank])
+        return None
+
+    def __contains__(self, title: str) -> bool:
+        return self.get(title) is not None
+
+
+class ModelSnapshot:
+    """Versão imutável do modelo de recomendação, lida de um diretório.
+
+    Cada componente é um `.npy` aberto com `mmap_mode='r'` apenas no
+    primeiro acesso: a abertura lê só o manifesto, os processos compartilham
+    as páginas dos arquivos e componentes não usados (ex.: o vocabulário,
+    usado apenas na atualização incremental) nunca são lidos. Os índices
+    derivados (títulos aproximados, `book_id`, índice aproximado) também
+    são construídos uma vez por versão, como no `CatalogSnapshot`.
+
+    Attributes:
+    -----------
+        directory (str): Diretório da versão do modelo.
+        manifest (dict): Manifesto com versão, número de livros e arrays.
+        version (str): Identificador da versão do modelo.
+    """  # noqa: E501
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest = columnar.read_manifest(directory)
+        if self.manifest.get("format") != MODEL_FORMAT:
+            raise ValueError(
+                "formato de modelo antigo; gere-o novamente com "
+                "app/models/ml_recomender/title_model.py"
+            )
+        self.version = self.manifest["version"]
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    def _array(self, name: str) -> np.ndarray:
+        return columnar.load_array(os.path.join(self.directory, f"{name}.npy"))  # noqa: E501
+
+    def _column(self, name: str):
+        return columnar.open_column(
+            self.directory, name, self.manifest["columns"][name]
+        )
+
+    @functools.cached_property
+    def book_ids(self) -> np.ndarray:
+        return self._column("book_id")
+
+    @functools.cached_property
+    def titles(self) -> columnar.StringColumn:
+        return self._column("title")
+
+    @functools.cached_property
+    def title_table(self) -> TitleTable:
+        return TitleTable(self.titles, self._array("title_order"))
+
+    @functools.cached_property
+    def neighbors(self) -> np.ndarray:
+        return self._array("neighbors")
+
+    @property
+    def neighbors_k(self) -> int:
+        """
+        Vizinhos exatos garantidos em todas as linhas da tabela; as colunas
+        seguintes são folga para a atualização incremental e podem estar
+        vagas (vizinho -1).
+        """
+        return self.manifest["neighbors"]
+
+    @functools.cached_property
+    def scores(self) -> np.ndarray:
+        return self._array("scores")
+
+    @functools.cached_property
+    def feature_hashes(self) -> np.ndarray:
+        return self._array("feature_hashes")
+
+    @functools.cached_property
+    def feature_matrix(self):
+        """Matriz de features (CSR) montada sobre os arrays mapeados."""
+        import scipy.sparse as sp
+        return sp.csr_matrix(
+            (
+                self._array("features.data"),
+                self._array("features.indices"),
+                self._array("features.indptr")
+            ),
+            shape=tuple(self.manifest["features"]["shape"])
+        )
+
+    @functools.cached_property
+    def vocabulary(self) -> dict:
+        """Termo -> coluna da matriz de features."""
+        terms = self._column("vocabulary").to_list()
+        return {term: column for column, term in enumerate(terms)}
+
+    @functools.cached_property
+    def ann_state(self) -> dict | None:
+        """Arrays do índice aproximado (`IVFIndex`), se houver."""
+        names = self.manifest.get("ann")
+        if not names:
+            return None
+        if not isinstance(names, list):
+            names = LEGACY_ANN_ARRAYS
+        return {name: self._array(f"ann.{name}") for name in names}
+
+    @functools.cached_property
+    def title_resolver(self) -> FuzzyTitleIndex:
+        """Índice de títulos aproximados sobre os títulos do modelo."""
+        return FuzzyTitleIndex(
+            list(dict.fromkeys(self.titles.to_list())),
+            Config.FUZZY_CANDIDATES,
+            Config.FUZZY_MAX_DISTANCE_RATIO,
+            Config.FUZZY_MIN_SIMILARITY
+        )
+
+    @functools.cached_property
+    def book_index(self) -> PrimaryKeyIndex:
+        """Índice `book_id` -> posição do livro no modelo."""
+        return PrimaryKeyIndex(self.book_ids)
+
+    @functools.cached_property
+    def ann_index(self):
+        """
+        Índice aproximado de vizinhos (`IVFIndex`), ou None se o modelo não
+        tem índice ou o catálogo é pequeno o bastante para a busca exata.
+        """
+        if self.ann_state is None or len(self) <= Config.ANN_EXACT_MAX_BOOKS:
+            return None
+        from app.models.ml_recomender.ann_index import IVFIndex
+        return IVFIndex(self.ann_state, self.feature_matrix)
+
+    def components(self) -> dict:
+        """Componentes no formato aceito por `save_model_version`."""
+        vocabulary = self.vocabulary
+        return {
+            'book_ids': np.asarray(self.book_ids),
+            'titles': self.titles.to_list(),
+            'feature_matrix': self.feature_matrix,
+            'neighbors': self.neighbors,
+            'neighbors_k': self.neighbors_k,
+            'scores': self.scores,
+            'vocabulary': vocabulary,
+            'feature_hashes': self.feature_hashes,
+            'ann': self.ann_state
+        }
+
+
+def write_model(directory: str, components: dict) -> dict:
+    """Grava os componentes do modelo como arrays `.npy` no diretório.
+
+    Parameters:
+    ----------
+    directory : str
+        Diretório da versão.
+    components : dict
+        `book_ids`, `titles`, `feature_matrix` (CSR), `neighbors`,
+        `neighbors_k` (vizinhos exatos garantidos por linha), `scores`,
+        `vocabulary` (termo -> coluna), `feature_hashes` e `ann` (arrays do
+        índice aproximado, ou None).
+    Returns:
+    -------
+    dict
+        Entradas do manifesto referentes aos arquivos gravados.
+    """  # noqa: E501
+    def save(name, array):
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+
+    titles = np.array(components['titles'], dtype=object)
+    vocabulary = components['vocabulary']
+    columns = {
+        "book_id": columnar.write_column(
+            directory, "book_id", np.asarray(components['book_ids'])
+        ),
+        "title": columnar.write_column(directory, "title", titles),
+        "vocabulary": columnar.write_column(
+            directory,
+            "vocabulary",
+            np.array(sorted(vocabulary, key=vocabulary.get), dtype=object)
+        )
+    }
+    save("title_order", TitleTable.build(components['titles']))
+    save("neighbors", np.asarray(components['neighbors']))
+    save("scores", np.asarray(components['scores']))
+    save("feature_hashes", np.asarray(components['feature_hashes']))
+    feature_matrix = components['feature_matrix']
+    save("features.data", np.asarray(feature_matrix.data))
+    save("features.indices", np.asarray(feature_matrix.indices))
+    save("features.indptr", np.asarray(feature_matrix.indptr))
+    ann = components.get('ann')
+    if ann is not None:
+        for name, array in ann.items():
+            save(f"ann.{name}", np.asarray(array))
+    return {
+        "format": MODEL_FORMAT,
+        "rows": len(titles),
+        "neighbors": int(components['neighbors_k']),
+        "columns": columns,
+        "features": {"shape": list(feature_matrix.shape)},
+        "ann": list(ann) if ann is not None else False
+    }
+
+
+def save_model_version(components: dict, stats: dict | None = None,
+                       root: str = MODEL_DIR) -> str:
+    """Grava os componentes do modelo em uma nova versão e a publica.
+
+    Mesmo esquema do catálogo colunar: a versão é montada em um diretório
+    temporário, renomeada ao final e só então publicada (CURRENT), sob o
+    lock de arquivo das versões. As versões mais antigas são removidas.
+
+    Parameters:
+    ----------
+    components : dict
+        Componentes do modelo (ver `write_model`).
+    stats : dict, optional
+        Informações da atualização registradas no manifesto.
+    root : str
+        Diretório raiz das versões do modelo.
+    Returns:
+    -------
+    str
+        Identificador da versão publicada.
+    """  # noqa: E501
+    version, tmp_dir = _write_version(components, stats, root)
+    with columnar.version_lock(root):
+        return _publish(root, version, tmp_dir)
+
+
+def publish_if_missing(build, root: str = MODEL_DIR) -> str:
+    """Gera e publica o modelo apenas se nenhuma versão foi publicada.
+
+    A verificação e a geração acontecem sob o lock das versões: com vários
+    workers, apenas o primeiro gera o modelo e os demais aguardam e
+    reaproveitam a versão que ele publicou.
+
+    Parameters:
+    ----------
+    build : callable
+        Função sem argumentos que retorna `(components, stats)`.
+    root : str
+        Diretório raiz das versões do modelo.
+    Returns:
+    -------
+    str
+        Versão publicada (a existente ou a recém-gerada).
+    """  # noqa: E501
+    with columnar.version_lock(root):
+        version = columnar.read_current_version(root)
+        if version is None:
+            components, stats = build()
+            version, tmp_dir = _write_version(components, stats, root)
+            version = _publish(root, version, tmp_dir)
+    return version
+
+
+def _write_version(components: dict, stats: dict | None,
+                   root: str) -> tuple[str, str]:
+    """Grava a versão em um diretório temporário; retorna a versão e o diretório."""  # noqa: E501
+    os.makedirs(root, exist_ok=True)
+    digest = hashlib.sha1(
+        np.ascontiguousarray(components['feature_hashes']).tobytes()
+    ).hexdigest()
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{digest[:10]}"
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    entries = write_model(tmp_dir, components)
+    columnar.write_manifest(tmp_dir, {
+        "version": version,
+        **entries,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "update": stats or {}
+    })
+    return version, tmp_dir
+
+
+def _publish(root: str, version: str, tmp_dir: str) -> str:
+    """Move a versão gravada para o lugar e a publica (chamada sob o lock).
+
+    Um diretório existente nunca é substituído: ele pode ser a versão
+    servida, mapeada em memória por outros workers. Se o identificador já
+    existe (mesmo segundo e mesmo conteúdo), a nova versão recebe um
+    sufixo (`-2`, `-3`, ...), também gravado no manifesto.
+
+    Returns:
+    -------
+    str
+        Identificador da versão publicada.
+    """  # noqa: E501
+    candidate, attempt = version, 1
+    while os.path.exists(os.path.join(root, candidate)):
+        attempt += 1
+        candidate = f"{version}-{attempt}"
+    if candidate != version:
+        manifest = columnar.read_manifest(tmp_dir)
+        columnar.write_manifest(tmp_dir, {**manifest, "version": candidate})
+    os.replace(tmp_dir, os.path.join(root, candidate))
+    columnar.publish_version(root, candidate)
+    columnar.prune_versions(
+        root, KEEP_VERSIONS, Config.VERSION_GRACE_SECONDS
+    )
+    return candidate
+
+
+def open_model(root: str = MODEL_DIR) -> ModelSnapshot | None:
+    """Abre a versão publicada do modelo, ou None se não houver nenhuma."""
+    version = columnar.read_current_version(root)
+    if version is None:
+        return None
+    return ModelSnapshot(os.path.join(root, version))
+
+
+def current_version(root: str = MODEL_DIR) -> str | None:
+    return columnar.read_current_version(root)
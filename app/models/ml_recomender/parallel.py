@@ -0,0 +1,143 @@
+import contextlib
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Bytes por célula (linha do bloco × livro) no cálculo das similaridades:
+# o bloco denso (float32) e os temporários de `top_k_rows` (cópia negada
+# para o `np.partition`, máscaras booleanas e o `cumsum` int32), com folga
+# para o resultado esparso do produto
+BYTES_PER_CELL = 32
+
+_task = None
+
+
+def resolve_workers(workers: int | None) -> int:
+    """Quantidade de processos; None usa todos os núcleos disponíveis."""
+    if workers is None:
+        if hasattr(os, "sched_getaffinity"):
+            workers = len(os.sched_getaffinity(0))
+        else:
+            workers = os.cpu_count()
+    return max(1, int(workers or 1))
+
+
+def rows_per_block(total: int, memory_mb: float, workers: int,
+                   max_rows: int) -> int:
+    """
+    Linhas por bloco para que `workers` blocos simultâneos de `total`
+    colunas caibam em `memory_mb` (limitado a `max_rows`, mínimo de 1).
+
+    O orçamento cobre apenas a memória temporária dos blocos; a matriz de
+    features é compartilhada entre os processos (fork, copy-on-write).
+    """  # noqa: E501
+    budget = int(memory_mb * 1024 * 1024) // max(1, workers)
+    rows = budget // max(1, total * BYTES_PER_CELL)
+    return int(max(1, min(max_rows, rows)))
+
+
+def _init_worker(task):
+    global _task
+    _task = task
+
+
+def _run_block(batch):
+    return _task(batch)
+
+
+def map_blocks(task, positions, block_rows: int, workers: int = 1):
+    """
+    Aplica `task` a `positions` em blocos de `block_rows` posições.
+
+    Com mais de um processo, os blocos são distribuídos em um
+    `ProcessPoolExecutor` iniciado com fork: `task` (e a matriz que ela
+    referencia) é herdada pelos processos sem serialização, e apenas as
+    posições de cada bloco e o seu resultado trafegam entre eles. Sem fork
+    (ex.: Windows), com um único processo ou um único bloco, a execução é
+    serial no próprio processo.
+
+    Parameters:
+    ----------
+    task : callable
+        Função que recebe as posições de um bloco e retorna o seu resultado.
+    positions : np.ndarray
+        Posições a processar.
+    block_rows : int
+        Posições por bloco.
+    workers : int
+        Quantidade de processos.
+    Returns:
+    -------
+    Iterator[tuple[int, int, object]]
+        Início e fim do bloco em `positions` e o resultado de `task`, na
+        ordem dos blocos.
+    """  # noqa: E501
+    blocks = [
+        (start, min(start + block_rows, len(positions)))
+        for start in range(0, len(positions), block_rows)
+    ]
+    if (workers <= 1 or len(blocks) <= 1
+            or "fork" not in multiprocessing.get_all_start_methods()):
+        for start, end in blocks:
+            yield start, end, task(positions[start:end])
+        return
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(blocks)),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(task,)
+    ) as pool:
+        results = pool.map(
+            _run_block, [positions[start:end] for start, end in blocks]
+        )
+        for (start, end), result in zip(blocks, results):
+            yield start, end, result
+
+
+def peak_rss_mb() -> dict:
+    """Pico de memória residente (MB) do processo e do maior processo filho."""  # noqa: E501
+    # ru_maxrss em KB no Linux (em bytes no macOS)
+    unit = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return {
+        "main": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1
+        ),
+        "children": round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1
+        )
+    }
+
+
+class StageTimer:
+    """Tempo de cada etapa da geração do modelo.
+
+    Attributes:
+    -----------
+        stages (dict): Nome da etapa -> segundos gastos, na ordem de execução.
+    """  # noqa: E501
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Mede o tempo de uma etapa (acumulado se ela se repetir)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = (
+                self.stages.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def report(self) -> dict:
+        """Tempos das etapas (s) e pico de memória residente (MB)."""
+        return {
+            "stages": {
+                name: round(seconds, 4)
+                for name, seconds in self.stages.items()
+            },
+            "peak_rss_mb": peak_rss_mb()
+        }
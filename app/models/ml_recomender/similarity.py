@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def top_k_rows(scores: np.ndarray, k: int, exclude=None):
+    """
+    Seleciona os `k` maiores valores de cada linha de `scores`.
+
+    Usa seleção parcial (`np.partition`, O(N) por linha) em vez de ordenar
+    a linha inteira; apenas os `k` selecionados são ordenados. Empates no
+    limiar são resolvidos pelo menor índice, como numa ordenação estável.
+
+    Parameters:
+    ----------
+    scores : np.ndarray
+        Matriz (linhas × N) de similaridades. Não é modificada.
+    k : int
+        Quantidade de itens por linha (limitada ao número de colunas
+        disponíveis).
+    exclude : np.ndarray, optional
+        Para cada linha, o índice de coluna a ser ignorado (ex.: o próprio
+        livro). A exclusão é feita pelo índice, e não descartando a
+        primeira posição do resultado.
+    Returns:
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Índices (int32) e valores (float32), linhas × k, em ordem
+        decrescente de valor.
+    """  # noqa: E501
+    scores = np.asarray(scores, dtype=np.float32)
+    total_rows, total = scores.shape
+    if exclude is not None:
+        scores = scores.copy()
+        scores[np.arange(total_rows), exclude] = -np.inf
+    k = max(0, min(k, total - (exclude is not None)))
+    if k == 0:
+        return (
+            np.zeros((total_rows, 0), dtype=np.int32),
+            np.zeros((total_rows, 0), dtype=np.float32)
+        )
+    # k-ésimo maior valor de cada linha
+    threshold = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+    # Tudo acima do limiar entra; entre os empatados no limiar (em geral
+    # similaridade 0), entram os de menor índice
+    above = scores > threshold
+    ties = scores == threshold
+    missing = k - above.sum(axis=1, keepdims=True)
+    selected = above | (ties & (np.cumsum(ties, axis=1, dtype=np.int32) <= missing))  # noqa: E501
+    top = np.nonzero(selected)[1].reshape(total_rows, k)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.lexsort((top, -top_scores), axis=1)
+    return (
+        np.take_along_axis(top, order, axis=1).astype(np.int32),
+        np.take_along_axis(top_scores, order, axis=1)
+    )
+
+
+def top_k(scores: np.ndarray, k: int, exclude: int | None = None):
+    """Versão de `top_k_rows` para um único vetor de similaridades."""
+    indices, values = top_k_rows(
+        np.asarray(scores).reshape(1, -1),
+        k,
+        None if exclude is None else np.array([exclude])
+    )
+    return indices[0], values[0]
@@ -1,12 +1,36 @@
+import argparse
+import functools
+import hashlib
+import time
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import joblib
-
-# --- Carregamento de Dados ---
-from app.api.root import dados_csv
-df_bruto = dados_csv
+from sklearn.preprocessing import normalize
+from app.config import Config
+from app.models.ml_recomender.ann_index import IVFIndex
+from app.models.ml_recomender.model_store import (
+    ModelSnapshot,
+    open_model,
+    publish_if_missing,
+    save_model_version
+)
+from app.models.ml_recomender.parallel import (
+    StageTimer,
+    map_blocks,
+    resolve_workers,
+    rows_per_block
+)
+from app.models.ml_recomender.similarity import top_k_rows
+from app.services.catalog import get_catalog
+
+FEATURES_CATALOGO = ['book_id',
+                     'title',
+                     'description',
+                     'review_rating',
+                     'category',
+                     'price_including_tax',
+                     'number_available']
 
 
 # --- Funções de Pré-processamento e Auxiliares ---
@@ -14,15 +38,7 @@ def tratar_dados_livros(df_bruto: pd.DataFrame) -> pd.DataFrame:
     """
     Realiza o pré-processamento do DataFrame
     """
-    features = ['book_id',
-                'title',
-                'description',
-                'review_rating',
-                'category',
-                'price_including_tax',
-                'number_available']
-
-    df_tratativa = df_bruto[features].copy()
+    df_tratativa = df_bruto[FEATURES_CATALOGO].copy()
 
     df_tratativa = df_tratativa.rename(
         columns={'price_including_tax': 'price'})
@@ -38,103 +54,612 @@ def tratar_dados_livros(df_bruto: pd.DataFrame) -> pd.DataFrame:
         df_tratativa['price'],
         errors='coerce')
 
-    df_tratativa['price'] = (
-        df_tratativa['price']
-        .apply(lambda x: abs(x) if pd.notna(x) else x))
+    df_tratativa['price'] = df_tratativa['price'].abs()
 
-    return df_tratativa.copy()
+    return df_tratativa
 
 
-def sanitize_single_value(x):
+def normalizar_texto(serie: pd.Series) -> pd.Series:
     """
-    Limpa um único valor (string), removendo todos os espaços e convertendo para minúsculas.  # noqa: E501
-    Retorna uma string vazia se o valor não for uma string.
+    Normaliza uma coluna de texto inteira (vetorizado): remove os espaços e
+    converte para minúsculas; valores que não são strings viram string
+    vazia.
     """
-    if isinstance(x, str):
-        return str.lower(x.replace(" ", ""))
-    else:
-        return ''
+    texto = serie.astype(object)
+    texto = texto.where(texto.apply(isinstance, args=(str,)), '')
+    return texto.str.replace(' ', '', regex=False).str.lower()
 
 
-def preparar_modelo_recomendacao(df_tratado: pd.DataFrame):
+def montar_df_model(df_tratado: pd.DataFrame) -> pd.DataFrame:
     """
-    Prepara os componentes necessários para o sistema de recomendação de conteúdo.  # noqa: E501
+    Seleciona as colunas do modelo e monta o texto de features de cada livro
+    (`combined_features`), com o hash usado para detectar livros alterados.
     """
-    df_model = df_tratado[[
-        'book_id',
-        'title',
-        'description',
-        'category'
-    ]].copy()
-
-    df_model = df_model.reset_index(drop=True)
-
-    for feature in ['description', 'category']:
-        df_model[feature] = df_model[feature].apply(sanitize_single_value)
+    # Monta o DataFrame direto das colunas (sem cópia intermediária de
+    # `df_tratado`)
+    df_model = pd.DataFrame({
+        'book_id': df_tratado['book_id'].to_numpy(),
+        'title': df_tratado['title'].to_numpy(),
+        'description': normalizar_texto(df_tratado['description']).to_numpy(),  # noqa: E501
+        'category': normalizar_texto(df_tratado['category']).to_numpy()
+    })
 
     df_model['combined_features'] = (
         df_model['description']
         + ' ' +
-        df_model['category'])
+        df_model['category']).str.strip()
+
+    return df_model
 
-    df_model['combined_features'] = df_model['combined_features'].str.strip()
 
-    count_vectorizer = CountVectorizer(stop_words='english')
-    count_matrix = (
-        count_vectorizer
-        .fit_transform(df_model['combined_features'])
+def hash_features(textos) -> np.ndarray:
+    """SHA-1 do texto de features de cada livro."""
+    return np.array(
+        [hashlib.sha1(texto.encode("utf-8")).hexdigest() for texto in textos],
+        dtype="S40"
     )
 
-    cosine_sim_matrix = cosine_similarity(count_matrix, count_matrix)
 
-    indices = pd.Series(df_model
-                        .index,
-                        index=df_model['title']).drop_duplicates()
+def vetorizar(textos, vocabulario: dict | None = None):
+    """
+    Conta os termos de `textos` (CountVectorizer, stop words em inglês) e
+    normaliza as linhas (L2).
+
+    Sem `vocabulario`, ele é ajustado aos textos. Com um vocabulário
+    existente, os termos novos são acrescentados ao final (novas colunas),
+    de modo que as linhas já vetorizadas continuam válidas e o produto
+    escalar entre linhas é o mesmo de um ajuste completo.
+
+    Retorna o vocabulário (termo -> coluna) e a matriz esparsa (float32).
+    """  # noqa: E501
+    if vocabulario is None:
+        count_vectorizer = CountVectorizer(stop_words='english')
+        count_matrix = count_vectorizer.fit_transform(textos)
+        vocabulario = {
+            termo: int(coluna)
+            for termo, coluna in count_vectorizer.vocabulary_.items()
+        }
+    else:
+        vocabulario = dict(vocabulario)
+        analyzer = CountVectorizer(stop_words='english').build_analyzer()
+        for texto in textos:
+            for termo in analyzer(texto):
+                vocabulario.setdefault(termo, len(vocabulario))
+        count_matrix = (
+            CountVectorizer(stop_words='english', vocabulary=vocabulario)
+            .transform(textos)
+        )
+    # Linhas com norma L2 unitária: o produto escalar entre linhas é a
+    # similaridade de cosseno (sem textos, ex.: atualização só com livros
+    # removidos, não há linhas a normalizar)
+    count_matrix = count_matrix.astype(np.float32)
+    if count_matrix.shape[0] == 0:
+        return vocabulario, count_matrix
+    return vocabulario, normalize(count_matrix, norm='l2')
+
+
+def preparar_modelo_recomendacao(df_tratado: pd.DataFrame,
+                                 workers: int = 1,
+                                 memory_mb: float = Config.MODEL_MEMORY_MB,
+                                 etapas: StageTimer | None = None) -> dict:
+    """
+    Prepara os componentes necessários para o sistema de recomendação de conteúdo.  # noqa: E501
 
-    return df_model, cosine_sim_matrix, indices
+    Parameters:
+    ----------
+    df_tratado : pd.DataFrame
+        Dados tratados do catálogo (`tratar_dados_livros`).
+    workers : int
+        Processos usados no cálculo dos vizinhos.
+    memory_mb : float
+        Orçamento de memória dos blocos de similaridade (ver `calcular_vizinhos`).  # noqa: E501
+    etapas : StageTimer, optional
+        Registro do tempo de cada etapa.
+    Returns:
+    -------
+    dict
+        Componentes gravados por `save_model_version`.
+    """  # noqa: E501
+    etapas = etapas or StageTimer()
+    with etapas.stage("normalizacao"):
+        df_model = montar_df_model(df_tratado)
+
+    with etapas.stage("vetorizacao"):
+        vocabulario, feature_matrix = vetorizar(df_model['combined_features'])  # noqa: E501
+
+    with etapas.stage("indice_ann"):
+        ann = IVFIndex.build(feature_matrix)
+
+    # A tabela guarda `Config.MODEL_NEIGHBORS_SLACK` vizinhos além dos
+    # servidos: folga para a atualização incremental repor os vizinhos que
+    # deixarem de existir sem recalcular a linha.
+    # Acima de ANN_EXACT_MAX_BOOKS livros, o cálculo exato (O(N²)) dá lugar
+    # ao índice aproximado
+    largura = Config.MODEL_NEIGHBORS + Config.MODEL_NEIGHBORS_SLACK
+    with etapas.stage("vizinhos"):
+        if len(df_model) > Config.ANN_EXACT_MAX_BOOKS:
+            neighbors, scores = calcular_vizinhos_aproximados(
+                feature_matrix,
+                ann,
+                largura,
+                Config.MODEL_BLOCK_SIZE,
+                workers,
+                memory_mb
+            )
+        else:
+            neighbors, scores = calcular_vizinhos(
+                feature_matrix,
+                largura,
+                Config.MODEL_BLOCK_SIZE,
+                workers=workers,
+                memory_mb=memory_mb
+            )
+
+    return montar_componentes(
+        df_model, vocabulario, feature_matrix, neighbors, scores, ann,
+        min(Config.MODEL_NEIGHBORS, neighbors.shape[1])
+    )
 
 
-# --- Função de Recomendação Principal ---
-def content_recommender(title: str,
-                        cosine_sim_matrix_ref: np.ndarray,
-                        df_data_ref: pd.DataFrame,
-                        indices_map_ref: pd.Series) -> pd.DataFrame:
+def montar_componentes(df_model, vocabulario, feature_matrix, neighbors, scores, ann, k: int) -> dict:  # noqa: E501
+    """Reúne os componentes gravados por `save_model_version`."""
+    return {
+        'book_ids': df_model['book_id'].to_numpy(),
+        'titles': df_model['title'].tolist(),
+        'feature_matrix': feature_matrix,
+        'neighbors': neighbors,
+        'neighbors_k': k,
+        'scores': scores,
+        'vocabulary': vocabulario,
+        'feature_hashes': hash_features(df_model['combined_features']),
+        'ann': ann.state()
+    }
+
+
+def calcular_vizinhos(feature_matrix, k: int, block_size: int, rows=None,
+                      workers: int = 1, memory_mb: float | None = None):
     """
-    Gera recomendações de livros baseadas na similaridade de conteúdo.
+    Calcula, para cada livro, os `k` livros mais similares (cosseno).
+
+    A similaridade é calculada em blocos de linhas
+    (`bloco @ feature_matrix.T`), de modo que a matriz N×N completa nunca
+    existe em memória: o pico é de `linhas × N` floats (e os temporários
+    da seleção) por bloco. O próprio livro é excluído pelo índice, e os
+    vizinhos de cada linha ficam em ordem decrescente de similaridade
+    (empates pelo menor índice).
+
+    Com `rows`, apenas as linhas informadas (posições) são calculadas.
+    Com `workers` > 1, os blocos são distribuídos entre processos
+    (`map_blocks`); o resultado é o mesmo do cálculo serial.
+
+    Parameters:
+    ----------
+    feature_matrix : sp.csr_matrix
+        Matriz de features normalizada (L2).
+    k : int
+        Quantidade de vizinhos por livro.
+    block_size : int
+        Máximo de linhas por bloco.
+    rows : np.ndarray, optional
+        Posições a calcular (todas, se omitido).
+    workers : int
+        Processos usados no cálculo.
+    memory_mb : float, optional
+        Orçamento de memória dos blocos simultâneos; reduz as linhas por
+        bloco para que `workers` blocos caibam nele (`rows_per_block`).
+    Returns:
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Ids dos vizinhos (int32, linhas × k) e similaridades (float32, linhas × k).  # noqa: E501
+    """  # noqa: E501
+    total = feature_matrix.shape[0]
+    positions = np.arange(total) if rows is None else np.asarray(rows)
+    k = max(0, min(k, total - 1))
+    neighbors = np.zeros((len(positions), k), dtype=np.int32)
+    scores = np.zeros((len(positions), k), dtype=np.float32)
+    if k == 0 or not len(positions):
+        return neighbors, scores
+    if memory_mb is not None:
+        block_size = rows_per_block(total, memory_mb, workers, block_size)
+    task = functools.partial(
+        _vizinhos_do_bloco, feature_matrix, feature_matrix.T.tocsr(), k
+    )
+    for start, end, result in map_blocks(task, positions, block_size, workers):  # noqa: E501
+        neighbors[start:end], scores[start:end] = result
+    return neighbors, scores
+
+
+def _vizinhos_do_bloco(feature_matrix, matrix_t, k: int, batch: np.ndarray):
+    """Vizinhos exatos de um bloco de posições (ver `calcular_vizinhos`)."""
+    block = (feature_matrix[batch] @ matrix_t).toarray()
+    # Exclusão do próprio livro pelo índice (no bloco, sem cópia)
+    block[np.arange(len(batch)), batch] = -np.inf
+    return top_k_rows(block, k)
+
+
+def calcular_vizinhos_aproximados(feature_matrix, index: IVFIndex, k: int,
+                                  block_size: int, workers: int = 1,
+                                  memory_mb: float | None = None):
+    """
+    Versão aproximada de `calcular_vizinhos`, com consultas ao índice IVF
+    (custo por livro limitado por `Config.ANN_CANDIDATES`, e não por N).
+    Os livros com menos de `k` candidatos são calculados de forma exata.
+    As consultas são distribuídas em blocos de `block_size` livros entre
+    `workers` processos.
+    """
+    total = feature_matrix.shape[0]
+    k = max(0, min(k, total - 1))
+    neighbors = np.zeros((total, k), dtype=np.int32)
+    scores = np.zeros((total, k), dtype=np.float32)
+    complete = np.zeros(total, dtype=bool)
+    task = functools.partial(index.query_many, k=k)
+    for start, end, result in map_blocks(task, np.arange(total), block_size, workers):  # noqa: E501
+        neighbors[start:end], scores[start:end], complete[start:end] = result
+    missing = np.flatnonzero(~complete)
+    if len(missing):
+        neighbors[missing], scores[missing] = calcular_vizinhos(
+            feature_matrix, k, block_size, missing, workers, memory_mb
+        )
+    return neighbors, scores
+
+
+def atualizar_modelo_incremental(anterior: ModelSnapshot,
+                                 df_tratado: pd.DataFrame,
+                                 k: int = Config.MODEL_NEIGHBORS,
+                                 slack: int = Config.MODEL_NEIGHBORS_SLACK,
+                                 block_size: int = Config.MODEL_BLOCK_SIZE,
+                                 max_ratio: float = Config.MODEL_INCREMENTAL_MAX_RATIO,  # noqa: E501
+                                 workers: int = 1,
+                                 memory_mb: float = Config.MODEL_MEMORY_MB):  # noqa: E501
     """
-    if title not in indices_map_ref:
-        print(f"Erro: O livro '{title}' não foi encontrado no catálogo.")
-        return pd.DataFrame(columns=['book_id', 'title'])
+    Atualiza o modelo `anterior` com os livros novos, alterados e removidos
+    de `df_tratado`, sem reprocessar os livros que não mudaram.
+
+    1. Os livros são comparados pelo `book_id` e pelo hash do texto de
+       features; apenas os novos ou alterados são vetorizados (com o
+       vocabulário do modelo anterior, estendido com os termos novos).
+    2. Os livros que não mudaram mantêm a lista anterior (remapeada para
+       as novas posições e sem os livros alterados ou removidos), mesclada
+       com a similaridade contra os livros novos ou alterados
+       (`top_k_rows` sobre a lista anterior + essas colunas).
+    3. Cada lista tem `k + slack` posições, e nenhum livro fora dela vem
+       antes da última posição preenchida (o limite da lista). Nas listas
+       que perderam vizinhos, só o prefixo anterior ao limite continua
+       exato: o restante fica vago (vizinho -1) e consome a folga. São
+       recalculadas por completo apenas as linhas dos livros
+       novos/alterados e as listas com menos de `k` vizinhos exatos.
+
+    O custo é proporcional ao número de livros alterados (× N), e não a N².
+
+    Parameters:
+    ----------
+    anterior : ModelSnapshot
+        Versão publicada do modelo.
+    df_tratado : pd.DataFrame
+        Dados tratados do catálogo atual (`tratar_dados_livros`).
+    k : int
+        Quantidade de vizinhos exatos garantidos por livro.
+    slack : int
+        Vizinhos guardados além de `k`, consumidos antes de a linha
+        precisar ser recalculada.
+    block_size : int
+        Linhas por bloco no cálculo das similaridades.
+    max_ratio : float
+        Fração máxima de linhas a recalcular; acima dela a atualização
+        incremental não compensa e o modelo é refeito por completo.
+    workers : int
+        Processos usados no recálculo das linhas (`calcular_vizinhos`).
+    memory_mb : float
+        Orçamento de memória dos blocos do recálculo.
+    Returns:
+    -------
+    tuple[dict | None, dict]
+        Componentes atualizados (None se a atualização incremental não se
+        aplica ou não há alterações) e as estatísticas da atualização
+        (`reason` explica quando não se aplica).
+    """  # noqa: E501
+    df_model = montar_df_model(df_tratado)
+    total = len(df_model)
+    k = max(0, min(k, total - 1))
+    width = max(0, min(k + slack, total - 1))
+    if k == 0:
+        return None, {"reason": "catálogo com menos de dois livros"}
+    if anterior.neighbors.shape[1] != width or anterior.neighbors_k != k:
+        return None, {"reason": "quantidade de vizinhos diferente"}
+
+    old_total = len(anterior)
+    old_titles = anterior.titles.to_list()
+    old_positions = {
+        book_id: position
+        for position, book_id in enumerate(anterior.book_ids.tolist())
+    }
+    hashes = hash_features(df_model['combined_features'])
+    old_pos = np.fromiter(
+        (old_positions.get(book_id, -1) for book_id in df_model['book_id']),
+        dtype=np.int64,
+        count=total
+    )
+    existing = old_pos >= 0
+    same = existing.copy()
+    same[existing] = (
+        anterior.feature_hashes[old_pos[existing]]
+        == hashes[existing]
+    )
+    kept = np.flatnonzero(same)
+    dirty = np.flatnonzero(~same)
+    stats = {
+        "added": int((~existing).sum()),
+        "changed": int((existing & ~same).sum()),
+        "removed": old_total - int(existing.sum())
+    }
+
+    if (not len(dirty) and total == old_total
+            and np.array_equal(old_pos, np.arange(total))
+            and old_titles == df_model['title'].tolist()):
+        return None, {**stats, "reason": "sem alterações"}
+
+    if len(dirty) > max_ratio * total:
+        return None, {**stats, "reason": "muitas alterações"}
+
+    # Matriz de features: linhas mantidas + linhas vetorizadas agora
+    vocabulario, dirty_matrix = vetorizar(
+        df_model['combined_features'].iloc[dirty],
+        anterior.vocabulary
+    )
+    old_matrix = anterior.feature_matrix[old_pos[kept]]
+    kept_matrix = sp.csr_matrix(
+        (old_matrix.data, old_matrix.indices, old_matrix.indptr),
+        shape=(len(kept), len(vocabulario))
+    )
+    order = np.empty(total, dtype=np.int64)
+    order[kept] = np.arange(len(kept))
+    order[dirty] = len(kept) + np.arange(len(dirty))
+    feature_matrix = sp.vstack([kept_matrix, dirty_matrix]).tocsr()[order]
+
+    # Posição antiga -> nova posição (-1: livro alterado ou removido; as
+    # posições vagas da lista anterior continuam vagas)
+    old_to_new = np.full(old_total, -1, dtype=np.int64)
+    old_to_new[old_pos[kept]] = kept
+    old_neighbors = anterior.neighbors[old_pos[kept]]
+    kept_scores = np.array(anterior.scores[old_pos[kept]])
+    # Limite de cada lista anterior (última posição preenchida): nenhum
+    # livro fora dela vinha antes dele na ordem do cálculo completo
+    # (similaridade decrescente, empates pela menor posição)
+    rows = np.arange(len(kept))
+    last = (old_neighbors >= 0).sum(axis=1) - 1
+    bound_scores = kept_scores[rows, last]
+    limits = _limites_de_empate(old_pos[kept], kept, old_neighbors[rows, last], total)  # noqa: E501
+    kept_neighbors = np.where(
+        old_neighbors >= 0, old_to_new[old_neighbors], -1
+    )
+    kept_scores[kept_neighbors < 0] = -np.inf
+
+    neighbors = np.zeros((total, width), dtype=np.int32)
+    scores = np.zeros((total, width), dtype=np.float32)
+    dirty_t = feature_matrix[dirty].T.tocsr()
+    for start in range(0, len(kept), block_size):
+        end = min(start + block_size, len(kept))
+        batch = kept[start:end]
+        candidates = np.hstack([
+            kept_neighbors[start:end],
+            np.broadcast_to(dirty, (end - start, len(dirty)))
+        ])
+        candidate_scores = np.hstack([
+            kept_scores[start:end],
+            (feature_matrix[batch] @ dirty_t).toarray()
+        ])
+        # Candidatos em ordem de posição: empates resolvidos pelo menor
+        # índice, como no cálculo completo
+        by_position = np.argsort(candidates, axis=1, kind='stable')
+        candidates = np.take_along_axis(candidates, by_position, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, by_position, axis=1)  # noqa: E501
+        top, scores[batch] = top_k_rows(candidate_scores, width)
+        neighbors[batch] = np.take_along_axis(candidates, top, axis=1)
+
+    # Só o prefixo que vem antes do limite é exato: depois dele pode haver
+    # livros que estavam fora da lista anterior. O restante da lista fica
+    # vago, e a última posição preenchida passa a ser o novo limite
+    merged_scores = scores[kept]
+    exact = (
+        (merged_scores > bound_scores[:, None])
+        | ((merged_scores == bound_scores[:, None])
+           & (neighbors[kept] < limits[:, None]))
+    ).sum(axis=1)
+    vacant = np.arange(width) >= exact[:, None]
+    neighbors[kept] = np.where(vacant, -1, neighbors[kept])
+    scores[kept] = np.where(vacant, 0, merged_scores)
+
+    # Recalculadas: as linhas dos livros novos ou alterados e as listas com
+    # menos de `k` vizinhos exatos
+    incomplete = kept[exact < k]
+    recompute = np.union1d(dirty, incomplete)
+    stats["recomputed"] = int(len(recompute))
+    stats["patched"] = int(len(kept) - len(incomplete))
+    stats["truncated"] = int(((exact < width) & (exact >= k)).sum())
+    if len(recompute) > max_ratio * total:
+        return None, {**stats, "reason": "muitas alterações"}
+    neighbors[recompute], scores[recompute] = calcular_vizinhos(
+        feature_matrix, width, block_size, recompute, workers, memory_mb
+    )
+
+    # Índice aproximado: os grupos dos livros que não mudaram são mantidos
+    previous = np.full(total, -1, dtype=np.int64)
+    previous[kept] = old_pos[kept]
+    ann = (
+        IVFIndex.update(anterior.ann_state, feature_matrix, previous, block_size)  # noqa: E501
+        if anterior.ann_state is not None else IVFIndex.build(feature_matrix)
+    )
+
+    components = montar_componentes(
+        df_model, vocabulario, feature_matrix, neighbors, scores, ann, k
+    )
+    return components, stats
+
 
-    idx = indices_map_ref[title]
+def _limites_de_empate(kept_old, kept, bound_old, total: int) -> np.ndarray:
+    """
+    Nova posição a partir da qual ficam os livros empatados com o limite
+    de cada lista (`bound_old`, posição antiga do último vizinho).
 
-    sim_scores = list(enumerate(cosine_sim_matrix_ref[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+    Se os livros mantidos conservam a ordem relativa, um livro fora da lista
+    com a mesma similaridade do limite tinha posição antiga maior, e portanto
+    tem nova posição >= a do primeiro livro mantido depois do limite. Caso
+    contrário, o desempate não é preservado e nenhum empate é exato (0).
+    """
+    if not np.all(np.diff(kept_old) > 0):
+        return np.zeros(len(kept), dtype=np.int64)
+    after = np.searchsorted(kept_old, bound_old, side='right')
+    return np.append(kept, total)[after]
 
-    sim_scores = sim_scores[1:11]
 
-    book_indices = [i[0] for i in sim_scores]
+def atualizar_modelo(incremental: bool = True, workers: int = 1,
+                     memory_mb: float = Config.MODEL_MEMORY_MB) -> tuple[str | None, dict]:  # noqa: E501
+    """
+    Gera o modelo a partir do catálogo atual e o publica como nova versão.
+
+    Com `incremental`, parte do modelo publicado e reprocessa apenas os
+    livros novos ou alterados; se não houver modelo publicado ou a
+    atualização incremental não se aplicar, o modelo é refeito por completo.
+
+    As estatísticas incluem o tempo de cada etapa (`stages`) e o pico de
+    memória residente do processo e do maior processo filho
+    (`peak_rss_mb`), também registrados no manifesto da versão.
+
+    Parameters:
+    ----------
+    incremental : bool
+        Parte do modelo publicado, quando possível.
+    workers : int
+        Processos usados no cálculo dos vizinhos (None: todos os núcleos).
+    memory_mb : float
+        Orçamento de memória dos blocos de similaridade simultâneos.
+    Returns:
+    -------
+    tuple[str | None, dict]
+        Versão publicada (None se não houve alterações) e as estatísticas
+        da atualização.
+    """  # noqa: E501
+    workers = resolve_workers(workers)
+    etapas = StageTimer()
+    df_tratado = ler_catalogo(etapas)
+
+    stats = {"reason": "atualização completa solicitada"}
+    if incremental:
+        try:
+            anterior = open_model()
+            stats = {"reason": "nenhum modelo publicado"}
+        except ValueError as error:
+            # Versão em formato antigo: o modelo é refeito por completo
+            anterior = None
+            stats = {"reason": str(error)}
+        if anterior is not None:
+            version = anterior.version
+            with etapas.stage("incremental"):
+                components, stats = atualizar_modelo_incremental(
+                    anterior,
+                    df_tratado,
+                    workers=workers,
+                    memory_mb=memory_mb
+                )
+            if components is not None:
+                stats = {"mode": "incremental", "base": version,
+                         "workers": workers, **stats}
+                return publicar_modelo(components, stats, etapas)
+            if stats["reason"] == "sem alterações":
+                return None, {
+                    "mode": "incremental",
+                    "base": version,
+                    **stats,
+                    **etapas.report()
+                }
+
+    components = preparar_modelo_recomendacao(
+        df_tratado, workers, memory_mb, etapas
+    )
+    stats = {"mode": "full", "workers": workers, **stats}
+    return publicar_modelo(components, stats, etapas)
 
-    return df_data_ref[['book_id', 'title']].iloc[book_indices].copy()
 
+def ler_catalogo(etapas: StageTimer) -> pd.DataFrame:
+    """Lê do catálogo apenas as colunas usadas pelo modelo e as trata."""
+    with etapas.stage("leitura"):
+        df_bruto = get_catalog().frame(FEATURES_CATALOGO)
+    with etapas.stage("tratamento"):
+        return tratar_dados_livros(df_bruto)
 
-# --- Fluxo Principal de Execução para Geração de PKL Único ---
+
+def garantir_modelo() -> str:
+    """
+    Gera e publica o modelo completo se nenhuma versão foi publicada
+    (ex.: primeira execução da API a partir de um checkout limpo), sob o
+    lock das versões do modelo (`publish_if_missing`).
+
+    Returns:
+    -------
+    str
+        Versão publicada.
+    """  # noqa: E501
+    def gerar():
+        etapas = StageTimer()
+        components = preparar_modelo_recomendacao(
+            ler_catalogo(etapas), etapas=etapas
+        )
+        stats = {
+            "mode": "full",
+            "workers": 1,
+            "reason": "nenhum modelo publicado",
+            **etapas.report()
+        }
+        return components, stats
+    return publish_if_missing(gerar)
+
+
+def publicar_modelo(components: dict, stats: dict,
+                    etapas: StageTimer) -> tuple[str, dict]:
+    """Publica os componentes, registrando os tempos e a memória no manifesto."""  # noqa: E501
+    with etapas.stage("publicacao"):
+        version = save_model_version(components, {**stats, **etapas.report()})
+    return version, {**stats, **etapas.report()}
+
+
+# --- Fluxo Principal de Execução ---
 if __name__ == "__main__":
-    # 1. Trata os dados brutos
-    df_tratado = tratar_dados_livros(df_bruto)
-
-    # 2. Prepara o modelo de recomendação
-    (df_model_final,
-        cosine_sim_matrix_final,
-        indices_final) = preparar_modelo_recomendacao(df_tratado)
-
-    # 3. Cria um dicionário com todos os componentes
-    model_components = {
-        'df_model': df_model_final,
-        'cosine_sim_matrix': cosine_sim_matrix_final,
-        'indices': indices_final
-    }
+    # Uso: python -m app.models.ml_recomender.title_model [--incremental]
+    #        [--workers N] [--memory-mb MB]
+    parser = argparse.ArgumentParser(
+        description="Gera e publica o modelo de recomendação."
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reprocessa apenas os livros novos ou alterados desde o modelo publicado"  # noqa: E501
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.MODEL_WORKERS,
+        help="processos no cálculo dos vizinhos (padrão: todos os núcleos)"
+    )
+    parser.add_argument(
+        "--memory-mb",
+        type=float,
+        default=Config.MODEL_MEMORY_MB,
+        help="orçamento de memória dos blocos de similaridade, em MB"
+    )
+    args = parser.parse_args()
 
-    # 4. Salva o dicionário inteiro em um único arquivo .pkl com joblib
-    joblib.dump(model_components, "modelo_recomendacao.pkl")
-    print("Todos os componentes do modelo foram salvos em 'modelo_recomendacao.pkl.pkl'.")  # noqa: E501
+    start = time.perf_counter()
+    version, stats = atualizar_modelo(
+        args.incremental, args.workers, args.memory_mb
+    )
+    elapsed = time.perf_counter() - start
+    if version is None:
+        print(f"Nenhuma alteração no catálogo; modelo mantido ({elapsed:.2f}s).")  # noqa: E501
+    else:
+        print(f"Modelo publicado: versão {version} ({elapsed:.2f}s).")
+    for etapa, seconds in stats.pop("stages").items():
+        print(f"  {etapa:<14} {seconds:8.3f}s")
+    rss = stats.pop("peak_rss_mb")
+    print(f"Pico de memória: {rss['main']} MB (processo), "
+          f"{rss['children']} MB (maior processo filho)")
+    print(stats)
@@ -1,5 +1,11 @@
-from typing import List
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, Field
+from app.config import Config
+from app.models.schemas.pagination import Pagination
+
+# `book_id` limitado ao int64 dos índices do catálogo: ids fora da faixa
+# são rejeitados na validação (422) em vez de estourar no índice
+BookId = Annotated[int, Field(ge=-2**63, le=2**63 - 1)]
 
 
 class BooksListData(BaseModel):
@@ -13,6 +19,7 @@ class BooksListResponse(BaseModel):
     success: bool = Field(..., example=True)
     message: str = Field(..., example="Livros retornadas com sucesso.")
     data: BooksListData
+    pagination: Pagination
 
 
 class BookItem(BaseModel):
@@ -32,17 +39,68 @@ class BookItem(BaseModel):
     url: str
 
 
+class BookProjection(BaseModel):
+    """Livro com apenas as colunas pedidas em `fields` (as demais são omitidas)."""  # noqa: E501
+    book_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    review_rating: Optional[int] = None
+    category: Optional[str] = None
+    product_upc: Optional[str] = None
+    currency: Optional[str] = None
+    price_including_tax: Optional[float] = None
+    price_excluding_tax: Optional[float] = None
+    tax: Optional[float] = None
+    number_available: Optional[int] = None
+    created_at: Optional[str] = None
+    image_url: Optional[str] = None
+    url: Optional[str] = None
+
+
 class BooksSearchResponse(BaseModel):
     success: bool = Field(..., example=True)
     message: str = Field(..., example="Resultado encontrado com sucesso.")
-    data: List[BookItem]
+    data: List[BookProjection]
+    pagination: Pagination
+    did_you_mean: Optional[str] = Field(default=None, example=None)
 
 
 class BookDetailData(BaseModel):
-    book: BookItem
+    book: BookProjection
 
 
 class BookDetailResponse(BaseModel):
     success: bool = Field(..., example=True)
     message: str = Field(..., example="Livro encontrado com sucesso.")
     data: BookDetailData
+
+
+class BooksBatchRequest(BaseModel):
+    book_ids: List[BookId] = Field(
+        ...,
+        min_length=1,
+        max_length=Config.BOOKS_BATCH_LIMIT,
+        example=[1000, 999, 1]
+    )
+
+
+class BooksBatchData(BaseModel):
+    books: List[BookProjection]
+    not_found: List[int] = Field(default_factory=list, example=[])
+
+
+class BooksBatchResponse(BaseModel):
+    success: bool = Field(..., example=True)
+    message: str = Field(..., example="Livros encontrados com sucesso.")
+    data: BooksBatchData
+
+
+class FullTextHit(BaseModel):
+    score: float = Field(..., example=7.41)
+    book: BookProjection
+
+
+class FullTextResponse(BaseModel):
+    success: bool = Field(..., example=True)
+    message: str = Field(..., example="Resultado encontrado com sucesso.")
+    data: List[FullTextHit]
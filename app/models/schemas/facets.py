@@ -0,0 +1,21 @@
+from typing import Dict, List
+from pydantic import BaseModel, Field
+from app.models.schemas.books import BookProjection
+from app.models.schemas.pagination import Pagination
+
+
+class FacetSearchData(BaseModel):
+    books: List[BookProjection]
+    facets: Dict[str, Dict[str, int]] = Field(..., example={
+        "category": {"Poetry": 19, "Fiction": 65},
+        "rating": {"1": 226, "5": 196},
+        "availability": {"1+": 1000, "5+": 820},
+        "price": {"10-20": 195, "20-30": 201}
+    })
+
+
+class FacetSearchResponse(BaseModel):
+    success: bool = Field(..., example=True)
+    message: str = Field(..., example="Resultado encontrado com sucesso.")
+    data: FacetSearchData
+    pagination: Pagination
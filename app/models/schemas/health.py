@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from app.models.schemas.books import (
     BookItem
@@ -14,3 +14,27 @@ class HealthResponse(BaseModel):
     success: bool = Field(..., example=True)
     message: str = Field(..., example="Health check realizado com sucesso.")
     data: HealthData
+
+
+class StartupImport(BaseModel):
+    module: str = Field(..., example="app.api.v1.books")
+    seconds: float = Field(..., example=0.0123)
+
+
+class StartupResource(BaseModel):
+    resource: str = Field(..., example="catalog")
+    seconds: float = Field(..., example=0.0456)
+    error: Optional[str] = None
+
+
+class StartupProfileData(BaseModel):
+    imports: List[StartupImport] = Field(default_factory=list)
+    resources: List[StartupResource] = Field(default_factory=list)
+    totalImportSeconds: float = Field(..., example=0.5)
+    totalResourceSeconds: float = Field(..., example=0.1)
+
+
+class StartupProfileResponse(BaseModel):
+    success: bool = Field(..., example=True)
+    message: str = Field(..., example="Perfil de inicialização retornado com sucesso.")  # noqa: E501
+    data: StartupProfileData
@@ -0,0 +1,8 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class Pagination(BaseModel):
+    limit: int = Field(..., example=50)
+    total: int = Field(..., example=1000)
+    next_cursor: Optional[str] = Field(default=None, example=None)
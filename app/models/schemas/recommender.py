@@ -1,11 +1,64 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from app.config import Config
+from app.models.schemas.books import BookProjection
 
 
 class RecomendarRequest(BaseModel):
     titulo_livro: str
+    k: int = Field(
+        default=Config.RECOMMENDATION_K,
+        ge=1,
+        le=Config.RECOMMENDATION_K_MAX,
+        example=Config.RECOMMENDATION_K
+    )
 
 
 class RecomendacoesResponse(BaseModel):
     livro_base: str
     recomendacoes: List[str]
+
+
+class RecomendarLoteRequest(BaseModel):
+    titulos: List[str] = Field(
+        default_factory=list,
+        max_length=Config.RECOMMENDATION_BATCH_LIMIT,
+        example=["Night Sky with Exit Wounds", "Sapiens"]
+    )
+    book_ids: List[int] = Field(
+        default_factory=list,
+        max_length=Config.RECOMMENDATION_BATCH_LIMIT,
+        example=[1, 2]
+    )
+    k: int = Field(
+        default=Config.RECOMMENDATION_K,
+        ge=1,
+        le=Config.RECOMMENDATION_K_MAX,
+        example=Config.RECOMMENDATION_K
+    )
+
+
+class RecomendacaoLoteItem(BaseModel):
+    livro_base: Optional[str] = None
+    recomendacoes: Optional[List[str]] = None
+    erro: Optional[str] = None
+
+
+class RecomendacoesLoteResponse(BaseModel):
+    resultados: Dict[str, RecomendacaoLoteItem]
+
+
+class LivroBase(BaseModel):
+    book_id: int = Field(..., example=1)
+    title: str = Field(..., example="Night Sky with Exit Wounds")
+
+
+class RecomendacaoDetalhada(BaseModel):
+    book_id: int = Field(..., example=42)
+    score: float = Field(..., example=0.3127)
+    book: BookProjection
+
+
+class RecomendacoesDetalhadasResponse(BaseModel):
+    livro_base: LivroBase
+    recomendacoes: List[RecomendacaoDetalhada]
@@ -0,0 +1,422 @@
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING
+import numpy as np
+from app.config import Config
+from app.utils import columnar
+from app.utils.response_cache import ResponseCache
+from app.services.fulltext import BM25Index
+from app.services.indexes import (
+    CategoryIndex,
+    FacetIndex,
+    FuzzyTitleIndex,
+    NGramIndex,
+    PrimaryKeyIndex,
+    SortedIndex
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+CSV_PATH = os.path.abspath(os.path.join(DATA_DIR, "books.csv"))
+CATALOG_DIR = os.path.abspath(os.path.join(DATA_DIR, "catalog"))
+KEEP_VERSIONS = 2
+
+_catalog = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+
+
+class CatalogSnapshot:
+    """Versão imutável do catálogo de livros, lida de um diretório colunar.
+
+    Cada coluna é mapeada em memória (`mmap_mode='r'`) apenas no primeiro
+    acesso; colunas grandes como `description` só são lidas do disco para
+    as linhas que de fato são serializadas.
+
+    Attributes:
+    -----------
+        directory (str): Diretório da versão do catálogo.
+        manifest (dict): Manifesto com versão, número de linhas e schema.
+        version (str): Identificador da versão do catálogo.
+    """  # noqa: E501
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest = columnar.read_manifest(directory)
+        self.version = self.manifest["version"]
+        self._columns = {}
+        self._series = {}
+        self._sorted_indexes = {}
+
+    def __len__(self) -> int:
+        return self.manifest["rows"]
+
+    @property
+    def columns(self) -> list:
+        return list(self.manifest["columns"])
+
+    def column(self, name: str):
+        """Retorna a coluna mapeada em memória, abrindo-a no primeiro acesso."""  # noqa: E501
+        if name not in self._columns:
+            if name not in self.manifest["columns"]:
+                raise ValueError(
+                    f"A coluna '{name}' não existe na base de dados"
+                )
+            self._columns[name] = columnar.open_column(
+                self.directory, name, self.manifest["columns"][name]
+            )
+        return self._columns[name]
+
+    @functools.cached_property
+    def pk_index(self) -> PrimaryKeyIndex:
+        """Índice `book_id` -> posição, construído uma vez por versão."""
+        return PrimaryKeyIndex(self.column("book_id"))
+
+    @functools.cached_property
+    def response_cache(self) -> ResponseCache:
+        """Respostas já serializadas desta versão do catálogo."""
+        return ResponseCache(Config.RESPONSE_CACHE_SIZE)
+
+    @functools.cached_property
+    def sorted_titles(self) -> list:
+        """Títulos únicos em ordem alfabética, calculados uma vez por versão."""  # noqa: E501
+        return sorted(
+            dict.fromkeys(self.column("title").to_list()),
+            key=lambda x: x.lower()
+        )
+
+    @functools.cached_property
+    def title_index(self) -> NGramIndex:
+        """Índice de trigramas sobre os títulos, construído uma vez por versão."""  # noqa: E501
+        return NGramIndex(self.column("title").to_list())
+
+    @functools.cached_property
+    def title_resolver(self) -> FuzzyTitleIndex:
+        """Resolução aproximada de títulos, construída uma vez por versão."""
+        return FuzzyTitleIndex(
+            self.sorted_titles,
+            Config.FUZZY_CANDIDATES,
+            Config.FUZZY_MAX_DISTANCE_RATIO,
+            Config.FUZZY_MIN_SIMILARITY
+        )
+
+    @functools.cached_property
+    def categories(self) -> CategoryIndex:
+        """Dicionário de categorias e suas posições, construído uma vez por versão."""  # noqa: E501
+        column = self.column("category")
+        if isinstance(column, columnar.CategoricalColumn):
+            return CategoryIndex(column.codes, column.categories)
+        names, codes = np.unique(column.to_list(), return_inverse=True)
+        return CategoryIndex(codes, names.tolist())
+
+    @functools.cached_property
+    def facets(self) -> FacetIndex:
+        """Bitmaps de categoria, nota, disponibilidade e faixa de preço.
+
+        As faixas de preço (`price_including_tax`) são intervalos
+        `[início, fim)` definidos por `Config.FACET_PRICE_EDGES`; a
+        disponibilidade é cumulativa (`"5+"` = `number_available >= 5`),
+        com limites em `Config.FACET_AVAILABILITY_THRESHOLDS`.
+        """  # noqa: E501
+        categories = self.categories
+        ratings = np.asarray(self.column("review_rating"))
+        available = np.asarray(self.column("number_available"))
+        prices = np.asarray(self.column("price_including_tax"))
+        edges = Config.FACET_PRICE_EDGES
+        buckets = np.digitize(prices, edges)
+        buckets[np.isnan(prices)] = -1
+        bounds = [0] + list(edges)
+        price_labels = [
+            f"{bounds[i]}-{bounds[i + 1]}" for i in range(len(edges))
+        ] + [f"{edges[-1]}+"]
+        return FacetIndex({
+            "category": {
+                name: categories.codes == code
+                for code, name in enumerate(categories.names)
+                if categories.counts[code]
+            },
+            "rating": {
+                str(rating): ratings == rating
+                for rating in np.unique(ratings).tolist()
+            },
+            "availability": {
+                f"{threshold}+": available >= threshold
+                for threshold in Config.FACET_AVAILABILITY_THRESHOLDS
+            },
+            "price": {
+                label: buckets == bucket
+                for bucket, label in enumerate(price_labels)
+            }
+        }, len(self))
+
+    @functools.cached_property
+    def fulltext(self) -> BM25Index:
+        """Índice BM25 sobre título e descrição, gravado junto com a versão.
+
+        Versões criadas antes do índice existir não têm os arquivos: nesse
+        caso o índice é montado em memória a partir das colunas.
+        """  # noqa: E501
+        entry = self.manifest.get("fulltext")
+        if entry is not None:
+            return BM25Index.load(self.directory, entry)
+        return BM25Index.build(
+            _fulltext_documents(
+                self.column("title").to_list(),
+                self.column("description").to_list()
+            ),
+            Config.FULLTEXT_K1,
+            Config.FULLTEXT_B
+        )
+
+    def sorted_index(self, name: str) -> SortedIndex:
+        """Índice ordenado de uma coluna numérica, construído uma vez por versão."""  # noqa: E501
+        if name not in self._sorted_indexes:
+            self._sorted_indexes[name] = SortedIndex(self.column(name))
+        return self._sorted_indexes[name]
+
+    def rows(self, positions, fields: list | None = None) -> list:
+        """Materializa as linhas informadas como uma lista de dicionários.
+
+        Parameters:
+        ----------
+        positions : Iterable[int]
+            Posições (não `book_id`) das linhas no catálogo.
+        fields : list, optional
+            Colunas a materializar; por padrão, todas.
+        Returns:
+        -------
+        list
+            Lista de dicionários, um por linha, na ordem de `positions`.
+        """  # noqa: E501
+        positions = np.asarray(positions, dtype=np.int64)
+        fields = fields or self.columns
+        values = []
+        for name in fields:
+            column = self.column(name)
+            if isinstance(column, np.ndarray):
+                values.append(column[positions].tolist())
+            else:
+                values.append(column.take(positions))
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+    def series(self, name: str) -> "pd.Series":
+        """Retorna a coluna como `pd.Series`, mantida em cache na versão."""
+        # pandas só é importado pelas rotas que montam DataFrames
+        import pandas as pd
+        if name not in self._series:
+            column = self.column(name)
+            if isinstance(column, np.ndarray):
+                series = pd.Series(column, name=name, copy=False)
+            elif isinstance(column, columnar.CategoricalColumn):
+                series = pd.Series(
+                    pd.Categorical.from_codes(
+                        np.asarray(column.codes), column.categories
+                    ),
+                    name=name
+                )
+            else:
+                series = pd.Series(column.to_list(), name=name, dtype=object)
+            self._series[name] = series
+        return self._series[name]
+
+    def frame(self, columns: list) -> "pd.DataFrame":
+        """Monta um DataFrame apenas com as colunas pedidas.
+
+        O índice do DataFrame é a posição da linha no catálogo, de modo que
+        `frame(...).index` pode ser passado diretamente para `rows`.
+        """  # noqa: E501
+        import pandas as pd
+        return pd.concat([self.series(name) for name in columns], axis=1)
+
+
+def _fulltext_documents(titles: list, descriptions: list) -> list:
+    return [
+        f"{title} {description}"
+        for title, description in zip(titles, descriptions)
+    ]
+
+
+def _source_fingerprint(csv_path: str) -> dict | None:
+    try:
+        stat = os.stat(csv_path)
+    except FileNotFoundError:
+        return None
+    return {
+        "path": os.path.abspath(csv_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def build_catalog(csv_path: str = CSV_PATH, root: str = CATALOG_DIR) -> str:
+    """Converte o CSV de livros em uma nova versão do catálogo colunar.
+
+    A versão é gravada em um diretório temporário e renomeada ao final, de
+    modo que um diretório de versão visível está sempre completo. A versão
+    não é publicada (CURRENT) por esta função.
+
+    Parameters:
+    ----------
+    csv_path : str
+        Caminho do arquivo CSV de origem.
+    root : str
+        Diretório raiz das versões do catálogo.
+    Returns:
+    -------
+    str
+        Identificador da versão criada.
+    """  # noqa: E501
+    # pandas só é necessário para converter o CSV, não para servir o catálogo
+    from app.utils.helpers import ingest_csv
+    os.makedirs(root, exist_ok=True)
+    fingerprint = _source_fingerprint(csv_path)
+    with open(csv_path, "rb") as file:
+        digest = hashlib.sha1(file.read()).hexdigest()
+    df, report = ingest_csv(csv_path)
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{digest[:10]}"
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    schema = {
+        name: columnar.write_column(tmp_dir, name, df[name])
+        for name in df.columns
+    }
+    fulltext = BM25Index.build(
+        _fulltext_documents(
+            df["title"].astype(str).tolist(),
+            df["description"].astype(str).tolist()
+        ),
+        Config.FULLTEXT_K1,
+        Config.FULLTEXT_B
+    ).save(tmp_dir)
+    columnar.write_manifest(tmp_dir, {
+        "version": version,
+        "rows": len(df),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": fingerprint,
+        "ingest": report,
+        "columns": schema,
+        "fulltext": fulltext
+    })
+    target_dir = os.path.join(root, version)
+    if os.path.isdir(target_dir):
+        # Mesma origem convertida no mesmo segundo: a versão já existe
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    else:
+        os.replace(tmp_dir, target_dir)
+    return version
+
+
+def open_catalog(
+        csv_path: str = CSV_PATH,
+        root: str = CATALOG_DIR
+        ) -> CatalogSnapshot:
+    """Abre a versão publicada do catálogo, reconstruindo-a se o CSV mudou.
+
+    Quando o CSV de origem não mudou desde a última conversão, nenhuma
+    leitura do CSV é feita: apenas o manifesto é lido e as colunas são
+    mapeadas sob demanda. Com vários workers, a reconstrução é feita sob um
+    lock de arquivo: o primeiro worker converte o CSV e os demais abrem a
+    versão que ele publicou.
+    """  # noqa: E501
+    snapshot = _open_current(csv_path, root)
+    if snapshot is not None:
+        return snapshot
+    with columnar.version_lock(root):
+        snapshot = _open_current(csv_path, root)
+        if snapshot is not None:
+            return snapshot
+        version = build_catalog(csv_path, root)
+        columnar.publish_version(root, version)
+        columnar.prune_versions(
+            root, KEEP_VERSIONS, Config.VERSION_GRACE_SECONDS
+        )
+    return CatalogSnapshot(os.path.join(root, version))
+
+
+def _open_current(csv_path: str, root: str) -> CatalogSnapshot | None:
+    version = columnar.read_current_version(root)
+    if version is None:
+        return None
+    snapshot = CatalogSnapshot(os.path.join(root, version))
+    fingerprint = _source_fingerprint(csv_path)
+    if fingerprint is None or snapshot.manifest["source"] == fingerprint:
+        return snapshot
+    return None
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Retorna a versão corrente do catálogo, abrindo-a no primeiro uso.
+
+    A leitura não usa lock: a troca de versão é uma única atribuição de
+    referência, e quem já obteve um snapshot continua usando-o até o fim
+    da requisição, mesmo que uma nova versão seja publicada nesse meio tempo.
+
+    A cada `Config.CATALOG_POLL_SECONDS` o arquivo CURRENT é relido, de modo
+    que uma versão publicada por outro worker (ex.: após um scraping) passa
+    a ser servida por todos os processos.
+    """  # noqa: E501
+    global _catalog, _checked_at
+    if _catalog is None:
+        with _reload_lock:
+            if _catalog is None:
+                _catalog = open_catalog()
+                _checked_at = time.monotonic()
+    elif time.monotonic() - _checked_at >= Config.CATALOG_POLL_SECONDS:
+        _refresh_catalog()
+    return _catalog
+
+
+def _refresh_catalog(root: str = CATALOG_DIR) -> None:
+    """Troca o snapshot se outro processo publicou uma nova versão."""
+    global _catalog, _checked_at
+    # Sem bloquear: se outra thread já está verificando, usa o snapshot atual
+    if not _reload_lock.acquire(blocking=False):
+        return
+    try:
+        _checked_at = time.monotonic()
+        version = columnar.read_current_version(root)
+        if version is not None and version != _catalog.version:
+            _catalog = CatalogSnapshot(os.path.join(root, version))
+    finally:
+        _reload_lock.release()
+
+
+def reload_catalog(
+        csv_path: str = CSV_PATH,
+        root: str = CATALOG_DIR
+        ) -> CatalogSnapshot:
+    """Reconstrói o catálogo a partir do CSV e publica a nova versão.
+
+    A nova versão é montada por completo em disco antes de ser publicada;
+    só então a referência global é trocada (copy-on-write). Recargas
+    concorrentes são serializadas (também entre processos, por um lock de
+    arquivo), mas leitores nunca aguardam o lock.
+
+    Parameters:
+    ----------
+    csv_path : str
+        Caminho do arquivo CSV de origem.
+    root : str
+        Diretório raiz das versões do catálogo.
+    Returns:
+    -------
+    CatalogSnapshot
+        Snapshot da versão recém-publicada.
+    """  # noqa: E501
+    global _catalog, _checked_at
+    with _reload_lock, columnar.version_lock(root):
+        version = build_catalog(csv_path, root)
+        columnar.publish_version(root, version)
+        snapshot = CatalogSnapshot(os.path.join(root, version))
+        _catalog = snapshot
+        _checked_at = time.monotonic()
+        columnar.prune_versions(
+            root, KEEP_VERSIONS, Config.VERSION_GRACE_SECONDS
+        )
+    return snapshot
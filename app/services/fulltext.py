@@ -0,0 +1,176 @@
+import bisect
+import heapq
+import os
+import re
+import numpy as np
+from app.utils import columnar
+from app.utils.columnar import load_array
+
+TOKEN_PATTERN = re.compile(r"\w+")
+FILE_PREFIX = "fulltext"
+
+
+def tokenize(text: str) -> list:
+    """Quebra o texto em termos: palavras em minúsculas, sem pontuação."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Índice invertido com ranqueamento BM25 sobre textos do catálogo.
+
+    As listas de postings ficam em arrays contíguos (formato CSR): os
+    documentos do termo `t` são `doc_ids[offsets[t]:offsets[t + 1]]`, com
+    as frequências correspondentes em `freqs`. Os arrays são gravados no
+    diretório da versão do catálogo e abertos com `mmap_mode='r'`; os termos,
+    em ordem crescente, ficam em uma coluna de texto (blob + offsets) e o id
+    de um termo é a sua posição, encontrada por busca binária.
+
+    Attributes:
+    -----------
+        terms (list | StringColumn): Termos do vocabulário, ordenados.
+        offsets (np.ndarray): Início das postings de cada termo.
+        doc_ids (np.ndarray): Posições dos documentos, agrupadas por termo.
+        freqs (np.ndarray): Frequência do termo em cada documento.
+        doc_lengths (np.ndarray): Número de termos de cada documento.
+        k1 (float): Saturação da frequência do termo.
+        b (float): Peso da normalização pelo tamanho do documento.
+    """  # noqa: E501
+
+    def __init__(self, terms, offsets, doc_ids, freqs, doc_lengths, k1=1.2, b=0.75):  # noqa: E501
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.freqs = freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.avgdl = float(np.mean(doc_lengths)) if len(doc_lengths) else 0.0
+        # Normalização por tamanho de documento, calculada uma única vez
+        self._norm = (
+            k1 * (1 - b + b * doc_lengths / self.avgdl)
+            if self.avgdl else np.full(len(doc_lengths), k1)
+        ).astype(np.float32)
+
+    @classmethod
+    def build(cls, texts: list, k1: float = 1.2, b: float = 0.75):
+        """Tokeniza os textos e monta as postings em memória."""
+        postings = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[position] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((position, count))
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[term]) for term in terms], out=offsets[1:])
+        pairs = [pair for term in terms for pair in postings[term]]
+        doc_ids = np.fromiter((p for p, _ in pairs), dtype=np.int32, count=len(pairs))  # noqa: E501
+        freqs = np.fromiter((c for _, c in pairs), dtype=np.int32, count=len(pairs))  # noqa: E501
+        return cls(terms, offsets, doc_ids, freqs, doc_lengths, k1, b)
+
+    def save(self, directory: str) -> dict:
+        """Grava o índice no diretório da versão e retorna a entrada do manifesto."""  # noqa: E501
+        terms_column = columnar.write_column(
+            directory, f"{FILE_PREFIX}.terms",
+            np.asarray(list(self.terms), dtype=object)
+        )
+        arrays = {
+            "offsets": self.offsets,
+            "doc_ids": self.doc_ids,
+            "freqs": self.freqs,
+            "doc_lengths": self.doc_lengths
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{FILE_PREFIX}.{name}.npy"), array)  # noqa: E501
+        return {
+            "terms": len(self.terms),
+            "terms_column": terms_column,
+            "k1": self.k1,
+            "b": self.b
+        }
+
+    @classmethod
+    def load(cls, directory: str, entry: dict):
+        """Abre um índice gravado por `save`, mapeando os termos e as postings em memória.
+
+        Versões gravadas antes da coluna de termos guardam o vocabulário em
+        um único `.npy` de largura fixa, lido por completo.
+        """  # noqa: E501
+        def path(name):
+            return os.path.join(directory, f"{FILE_PREFIX}.{name}.npy")
+        if "terms_column" in entry:
+            terms = columnar.open_column(
+                directory, f"{FILE_PREFIX}.terms", entry["terms_column"]
+            )
+        else:
+            terms = load_array(path("terms")).tolist()
+        return cls(
+            terms,
+            load_array(path("offsets")),
+            load_array(path("doc_ids")),
+            load_array(path("freqs")),
+            np.asarray(load_array(path("doc_lengths"))),
+            entry["k1"],
+            entry["b"]
+        )
+
+    def term_id(self, term: str) -> int | None:
+        """Id (posição em `terms`) do termo, ou None se ele não está no vocabulário."""  # noqa: E501
+        position = bisect.bisect_left(self.terms, term)
+        if position < len(self.terms) and self.terms[position] == term:
+            return position
+        return None
+
+    def search(self, query: str, k: int) -> list:
+        """Retorna os `k` documentos de maior score BM25 para a consulta.
+
+        Parameters:
+        ----------
+        query : str
+            Texto livre da consulta.
+        k : int
+            Quantidade máxima de resultados.
+        Returns:
+        -------
+        list
+            Pares `(posição, score)` em ordem decrescente de score.
+        """  # noqa: E501
+        total = len(self.doc_lengths)
+        postings = []
+        for term in sorted(set(tokenize(query))):
+            term_id = self.term_id(term)
+            if term_id is None:
+                continue
+            start = int(self.offsets[term_id])
+            end = int(self.offsets[term_id + 1])
+            docs = self.doc_ids[start:end]
+            tf = self.freqs[start:end].astype(np.float32)
+            idf = np.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            postings.append(
+                (docs, idf * tf * (self.k1 + 1) / (tf + self._norm[docs]))
+            )
+        if not postings:
+            return []
+        # Scores acumulados apenas sobre a união das postings dos termos da
+        # consulta (não sobre o catálogo inteiro): `inverse` leva cada
+        # posting à posição do seu documento em `candidates`
+        candidates, inverse = np.unique(
+            np.concatenate([docs for docs, _ in postings]), return_inverse=True
+        )
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        start = 0
+        for docs, contribution in postings:
+            scores[inverse[start:start + len(docs)]] += contribution
+            start += len(docs)
+        # Seleção dos k maiores por heap: O(C log k) sobre os C candidatos;
+        # em empates, a menor posição vem primeiro
+        best = heapq.nlargest(
+            k, np.flatnonzero(scores).tolist(), key=scores.__getitem__
+        )
+        return [
+            (int(candidates[index]), float(scores[index])) for index in best
+        ]
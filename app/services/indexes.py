@@ -0,0 +1,440 @@
+import re
+import unicodedata
+import numpy as np
+
+# Acima desta razão entre a amplitude dos ids e o número de livros, a tabela
+# de endereçamento direto desperdiça memória e o índice usa um dicionário
+DENSE_SPAN_FACTOR = 4
+
+
+class PrimaryKeyIndex:
+    """Índice de chave primária `book_id` -> posição da linha no catálogo.
+
+    Quando os ids são razoavelmente densos, usa uma tabela de endereçamento
+    direto (`table[book_id - offset]`), que responde em O(1) inclusive em
+    lote, de forma vetorizada. Para ids esparsos, usa um dicionário.
+    Posições inexistentes são representadas por -1.
+
+    Attributes:
+    -----------
+        offset (int): Menor `book_id` do catálogo.
+        table (np.ndarray | None): Tabela densa de posições, ou None.
+        mapping (dict | None): Dicionário `book_id` -> posição, ou None.
+    """  # noqa: E501
+
+    def __init__(self, book_ids: np.ndarray):
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        self.table = None
+        self.mapping = None
+        self.offset = int(book_ids.min()) if len(book_ids) else 0
+        span = int(book_ids.max()) - self.offset + 1 if len(book_ids) else 0
+        positions = np.arange(len(book_ids), dtype=np.int64)
+        if span <= max(DENSE_SPAN_FACTOR * len(book_ids), 1024):
+            self.table = np.full(span, -1, dtype=np.int64)
+            # Atribuição invertida: em ids duplicados vale a primeira linha
+            self.table[book_ids[::-1] - self.offset] = positions[::-1]
+        else:
+            self.mapping = dict(
+                zip(book_ids[::-1].tolist(), positions[::-1].tolist())
+            )
+
+    def get(self, book_id: int) -> int | None:
+        """Retorna a posição do livro, ou None se o id não existir."""
+        if self.table is not None:
+            slot = book_id - self.offset
+            if 0 <= slot < len(self.table):
+                position = int(self.table[slot])
+                return position if position >= 0 else None
+            return None
+        return self.mapping.get(book_id)
+
+    def get_many(self, book_ids) -> np.ndarray:
+        """Retorna as posições de vários livros de uma vez (-1 para ausentes)."""  # noqa: E501
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        if self.table is None:
+            return np.fromiter(
+                (self.mapping.get(i, -1) for i in book_ids.tolist()),
+                dtype=np.int64,
+                count=len(book_ids)
+            )
+        slots = book_ids - self.offset
+        valid = (slots >= 0) & (slots < len(self.table))
+        positions = np.full(len(book_ids), -1, dtype=np.int64)
+        positions[valid] = self.table[slots[valid]]
+        return positions
+
+
+class SortedIndex:
+    """Índice ordenado sobre uma coluna numérica, para consultas por faixa.
+
+    Guarda a permutação que ordena a coluna (`argsort`) e os valores já
+    ordenados; uma faixa `[minimo, maximo]` é resolvida com duas buscas
+    binárias (`searchsorted`), em O(log N + k). Valores nulos (NaN) ficam
+    fora de qualquer faixa.
+
+    Attributes:
+    -----------
+        order (np.ndarray): Posições das linhas, em ordem crescente de valor.
+        values (np.ndarray): Valores da coluna na mesma ordem de `order`.
+    """  # noqa: E501
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        if sorted_values.dtype.kind == "f":
+            valid = len(sorted_values) - int(np.isnan(sorted_values).sum())
+            order, sorted_values = order[:valid], sorted_values[:valid]
+        self.order = order
+        self.values = sorted_values
+
+    def range(self, minimum=None, maximum=None) -> np.ndarray:
+        """Retorna as posições com `minimum <= valor <= maximum`, ordenadas por valor.
+
+        Qualquer um dos limites pode ser omitido (faixa aberta).
+        """  # noqa: E501
+        start = 0
+        end = len(self.values)
+        if minimum is not None:
+            start = int(np.searchsorted(self.values, minimum, side="left"))
+        if maximum is not None:
+            end = int(np.searchsorted(self.values, maximum, side="right"))
+        return self.order[start:max(start, end)]
+
+
+class NGramIndex:
+    """Índice invertido de n-gramas (trigramas, por padrão) sobre textos normalizados.
+
+    Cada texto é convertido para minúsculas e decomposto em n-gramas; cada
+    n-grama aponta para as posições (ordenadas) dos textos que o contêm.
+    Uma busca por substring intersecta as listas de posições dos n-gramas
+    da consulta, começando pela menor, e depois confirma cada candidato
+    com uma comparação de substring, preservando a semântica
+    "contém, sem diferenciar maiúsculas de minúsculas".
+
+    Attributes:
+    -----------
+        n (int): Tamanho dos n-gramas.
+        texts (list): Textos normalizados, na ordem das posições.
+        postings (dict): N-grama -> np.ndarray de posições.
+    """  # noqa: E501
+
+    def __init__(self, texts: list, n: int = 3):
+        self.n = n
+        self.texts = [self.normalize(text) for text in texts]
+        postings = {}
+        for position, text in enumerate(self.texts):
+            for gram in self.grams(text):
+                postings.setdefault(gram, []).append(position)
+        self.postings = {
+            gram: np.asarray(positions, dtype=np.int64)
+            for gram, positions in postings.items()
+        }
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return text.lower()
+
+    def grams(self, text: str) -> set:
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def candidates(self, query: str) -> np.ndarray | None:
+        """Posições que contêm todos os n-gramas da consulta normalizada.
+
+        Retorna None quando a consulta é curta demais para gerar n-gramas.
+        """  # noqa: E501
+        grams = self.grams(query)
+        if not grams:
+            return None
+        lists = []
+        for gram in grams:
+            positions = self.postings.get(gram)
+            if positions is None:
+                return np.empty(0, dtype=np.int64)
+            lists.append(positions)
+        lists.sort(key=len)
+        result = lists[0]
+        for positions in lists[1:]:
+            result = np.intersect1d(result, positions, assume_unique=True)
+            if len(result) == 0:
+                break
+        return result
+
+    def search(self, query: str) -> np.ndarray:
+        """Retorna, em ordem crescente, as posições cujo texto contém `query`."""  # noqa: E501
+        query = self.normalize(query)
+        candidates = self.candidates(query)
+        if candidates is None:
+            candidates = range(len(self.texts))
+        return np.asarray(
+            [p for p in candidates if query in self.texts[p]],
+            dtype=np.int64
+        )
+
+
+class CategoryIndex:
+    """Dicionário de categorias com a lista de posições de cada uma.
+
+    Construído uma única vez a partir dos códigos da coluna categórica:
+    guarda os nomes ordenados alfabeticamente, um mapa com os nomes
+    normalizados (minúsculas) para validação em O(1) e, para cada código,
+    as posições das linhas em ordem crescente.
+
+    Attributes:
+    -----------
+        names (list): Nomes das categorias, na ordem dos códigos.
+        counts (np.ndarray): Número de livros de cada código.
+        sorted_names (list): Categorias com livros, em ordem alfabética.
+        lookup (dict): Nome em minúsculas -> lista de códigos.
+    """  # noqa: E501
+
+    def __init__(self, codes: np.ndarray, names: list):
+        codes = np.asarray(codes, dtype=np.int64)
+        self.codes = codes
+        self.names = list(names)
+        valid = codes >= 0
+        self.counts = np.bincount(codes[valid], minlength=len(self.names))
+        order = np.flatnonzero(valid)[
+            np.argsort(codes[valid], kind="stable")
+        ]
+        bounds = np.concatenate(([0], np.cumsum(self.counts)))
+        self._postings = [
+            order[bounds[code]:bounds[code + 1]]
+            for code in range(len(self.names))
+        ]
+        self.sorted_names = sorted(
+            (name for name, count in zip(self.names, self.counts) if count),
+            key=lambda name: name.lower()
+        )
+        self.lookup = {}
+        for code, name in enumerate(self.names):
+            self.lookup.setdefault(name.lower(), []).append(code)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self.lookup
+
+    def codes_for(self, name: str) -> list:
+        return self.lookup.get(name.lower(), [])
+
+    def positions(self, name: str) -> np.ndarray:
+        """Posições (ordenadas) dos livros da categoria, sem diferenciar maiúsculas."""  # noqa: E501
+        postings = [self._postings[code] for code in self.codes_for(name)]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        if len(postings) == 1:
+            return postings[0]
+        return np.sort(np.concatenate(postings))
+
+    def filter(self, positions: np.ndarray, name: str) -> np.ndarray:
+        """Mantém, dentre `positions`, apenas as linhas da categoria informada."""  # noqa: E501
+        return positions[np.isin(self.codes[positions], self.codes_for(name))]
+
+
+# Número de bits 1 de cada byte, para contar bitmaps empacotados
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)  # noqa: E501
+
+
+class FacetIndex:
+    """Bitmaps pré-calculados para busca facetada.
+
+    Cada valor de cada faceta (ex.: categoria "Poetry", nota "5") é um
+    bitmap de N bits empacotado em bytes (`np.packbits`), com o bit i ligado
+    quando a linha i possui o valor. Dentro de uma faceta os valores
+    selecionados são combinados com OU e, entre facetas, com E. Toda
+    consulta custa um número fixo de operações sobre N/8 bytes, qualquer
+    que seja a combinação de filtros.
+
+    As contagens seguem a semântica usual de facetas: a contagem de um
+    valor considera os filtros de todas as outras facetas, mas não o da
+    própria faceta, para que o usuário veja quantos resultados teria ao
+    trocar ou adicionar um valor.
+
+    Attributes:
+    -----------
+        size (int): Número de linhas do catálogo.
+        bitmaps (dict): Faceta -> {valor: bitmap empacotado}.
+    """  # noqa: E501
+
+    def __init__(self, facets: dict, size: int):
+        self.size = size
+        self.all = np.packbits(np.ones(size, dtype=bool))
+        self.bitmaps = {
+            facet: {
+                label: np.packbits(np.asarray(mask, dtype=bool))
+                for label, mask in values.items()
+            }
+            for facet, values in facets.items()
+        }
+
+    def labels(self, facet: str) -> list:
+        return list(self.bitmaps[facet])
+
+    @staticmethod
+    def count(bitmap: np.ndarray) -> int:
+        return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def select(self, facet: str, labels: list) -> np.ndarray:
+        """Bitmap das linhas com qualquer um dos valores informados da faceta."""  # noqa: E501
+        bitmap = np.zeros_like(self.all)
+        for label in labels:
+            np.bitwise_or(bitmap, self.bitmaps[facet][label], out=bitmap)
+        return bitmap
+
+    def search(self, filters: dict) -> tuple[np.ndarray, dict]:
+        """Aplica os filtros e calcula as contagens de cada faceta.
+
+        Parameters:
+        ----------
+        filters : dict
+            Faceta -> lista de valores selecionados. Facetas ausentes ou
+            com lista vazia não filtram.
+        Returns:
+        -------
+        tuple[np.ndarray, dict]
+            Posições (em ordem crescente) das linhas que atendem a todos os
+            filtros e, para cada faceta, o dicionário valor -> contagem.
+        """  # noqa: E501
+        masks = {
+            facet: self.select(facet, labels)
+            for facet, labels in filters.items() if labels
+        }
+        hits = self.all.copy()
+        for mask in masks.values():
+            np.bitwise_and(hits, mask, out=hits)
+        counts = {}
+        for facet, values in self.bitmaps.items():
+            base = self.all.copy()
+            for other, mask in masks.items():
+                if other != facet:
+                    np.bitwise_and(base, mask, out=base)
+            counts[facet] = {
+                label: self.count(np.bitwise_and(base, bitmap))
+                for label, bitmap in values.items()
+            }
+        positions = np.flatnonzero(np.unpackbits(hits, count=self.size))
+        return positions, counts
+
+
+def normalize_title(title: str) -> str:
+    """Chave normalizada de um título: sem acentos, pontuação ou caixa."""
+    decomposed = unicodedata.normalize("NFKD", title)
+    text = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w]+", " ", text.casefold()).split())
+
+
+def bounded_edit_distance(a: str, b: str, bound: int) -> int:
+    """Distância de Levenshtein entre `a` e `b`, limitada a `bound`.
+
+    O cálculo é interrompido assim que todas as células da linha corrente
+    passam de `bound`; nesse caso retorna `bound + 1`. O custo fica em
+    O(len(a) * len(b)) no pior caso, mas pares muito diferentes são
+    descartados nas primeiras linhas.
+    """  # noqa: E501
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+class FuzzyTitleIndex:
+    """Resolve títulos digitados com pequenos erros para títulos do catálogo.
+
+    A busca tem três etapas, da mais barata para a mais cara:
+
+    1. Mapa de chaves normalizadas (sem acentos, pontuação e caixa): resolve
+       em O(1) diferenças de formatação.
+    2. Índice de trigramas das chaves: os candidatos são os títulos que
+       compartilham mais trigramas com a consulta (coeficiente de Dice),
+       contados de forma vetorizada com `np.bincount`.
+    3. Distância de edição limitada apenas entre a consulta e os
+       `candidates` melhores candidatos.
+
+    Attributes:
+    -----------
+        titles (list): Títulos distintos, na ordem dos ids.
+        keys (dict): Chave normalizada -> id do título.
+        postings (dict): Trigrama -> np.ndarray de ids de títulos.
+    """  # noqa: E501
+
+    def __init__(self, titles: list, candidates: int = 20, max_distance_ratio: float = 0.2, min_similarity: float = 0.3):  # noqa: E501
+        self.titles = list(dict.fromkeys(titles))
+        self.candidates = candidates
+        self.max_distance_ratio = max_distance_ratio
+        self.min_similarity = min_similarity
+        self.keys = {}
+        normalized = [normalize_title(title) for title in self.titles]
+        for title_id, key in enumerate(normalized):
+            self.keys.setdefault(key, title_id)
+        self._normalized = normalized
+        postings = {}
+        self._gram_counts = np.zeros(len(self.titles), dtype=np.int64)
+        for title_id, key in enumerate(normalized):
+            grams = self.grams(key)
+            self._gram_counts[title_id] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(title_id)
+        self.postings = {
+            gram: np.asarray(ids, dtype=np.int64)
+            for gram, ids in postings.items()
+        }
+
+    @staticmethod
+    def grams(key: str) -> set:
+        padded = f"  {key} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def resolve(self, title: str, limit: int = 5) -> tuple[str | None, list]:
+        """Resolve um título aproximado.
+
+        Parameters:
+        ----------
+        title : str
+            Título informado pelo usuário.
+        limit : int
+            Quantidade máxima de sugestões.
+        Returns:
+        -------
+        tuple[str | None, list]
+            O título do catálogo correspondente (ou None, se nenhum estiver
+            próximo o bastante) e as sugestões mais próximas, da mais
+            parecida para a menos parecida (apenas as com distância dentro do
+            limite ou similaridade de trigramas acima de `min_similarity`).
+        """  # noqa: E501
+        key = normalize_title(title)
+        if key in self.keys:
+            match = self.titles[self.keys[key]]
+            return match, [match]
+        grams = self.grams(key)
+        lists = [self.postings[g] for g in grams if g in self.postings]
+        if not lists:
+            return None, []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.titles))  # noqa: E501
+        dice = 2 * shared / (len(grams) + self._gram_counts)
+        top = min(self.candidates, int(np.count_nonzero(shared)))
+        candidate_ids = np.argpartition(-dice, top - 1)[:top]
+        bound = max(1, int(len(key) * self.max_distance_ratio))
+        ranked = sorted(
+            (
+                bounded_edit_distance(key, self._normalized[i], bound),
+                -float(dice[i]),
+                int(i)
+            )
+            for i in candidate_ids.tolist()
+        )
+        suggestions = [
+            self.titles[i] for distance, similarity, i in ranked
+            if distance <= bound or -similarity >= self.min_similarity
+        ][:limit]
+        distance, _, best = ranked[0]
+        return (self.titles[best] if distance <= bound else None), suggestions
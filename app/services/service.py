@@ -1,46 +1,310 @@
-import joblib
+import threading
+import time
+import numpy as np
 from typing import List
-from pathlib import Path
+from app.config import Config
+from app.models.ml_recomender.model_store import (
+    MODEL_DIR,
+    ModelSnapshot,
+    current_version,
+    open_model
+)
+from app.models.ml_recomender.similarity import top_k_rows
 
-model_components = None
+INT64 = np.iinfo(np.int64)
 
-current_dir = Path(__file__).parent
-project_root = current_dir.parent.parent
-model_path = project_root / "modelo_recomendacao.pkl"
+model = None
+_checked_at = 0.0
+_model_lock = threading.Lock()
 
-try:
-    if model_path.exists():
-        model_components = joblib.load(model_path)
-        print("Todos os componentes do modelo foram carregados com sucesso no serviço!")  # noqa: E501
-    else:
-        raise FileNotFoundError(f"Arquivo do modelo não encontrado: {model_path}")  # noqa: E501
-except FileNotFoundError as e:
-    print(f"ERRO: {e}. O serviço de recomendação não estará disponível.")
-except Exception as e:
-    print(f"ERRO: Não foi possível carregar os componentes do modelo: {e}")
-    model_components = None
+
+def load_model() -> ModelSnapshot | None:
+    """Abre o modelo de recomendação no primeiro uso.
+
+    Apenas o manifesto da versão publicada em `MODEL_DIR` é lido; cada
+    array do modelo é mapeado em memória (`mmap_mode='r'`) no primeiro
+    acesso, e os workers compartilham as mesmas páginas. Em caso de erro,
+    retorna None e o serviço de recomendação fica indisponível.
+
+    A cada `Config.MODEL_POLL_SECONDS` o arquivo CURRENT é relido, de modo
+    que uma versão publicada por uma atualização (ex.: após um scraping)
+    passa a ser servida sem reiniciar a API.
+    """  # noqa: E501
+    global model
+    if model is not None:
+        if time.monotonic() - _checked_at >= Config.MODEL_POLL_SECONDS:
+            _refresh_model()
+        return model
+    with _model_lock:
+        if model is not None:
+            return model
+        try:
+            snapshot = open_model()
+            if snapshot is None:
+                raise FileNotFoundError(
+                    f"Nenhuma versão do modelo publicada em {MODEL_DIR}"
+                )
+            _swap_model(snapshot)
+            print("Todos os componentes do modelo foram carregados com sucesso no serviço!")  # noqa: E501
+        except FileNotFoundError as e:
+            print(f"ERRO: {e}. O serviço de recomendação não estará disponível.")  # noqa: E501
+        except Exception as e:
+            print(f"ERRO: Não foi possível carregar os componentes do modelo: {e}")  # noqa: E501
+            model = None
+    return model
 
 
-def get_recommendations_from_title(title: str) -> List[str]:
+def _swap_model(snapshot: ModelSnapshot) -> None:
+    """Troca o modelo servido (os índices derivados pertencem ao snapshot)."""
+    global model, _checked_at
+    model = snapshot
+    _checked_at = time.monotonic()
+
+
+def get_model() -> ModelSnapshot:
     """
-    Gera recomendações de livros com base em um título.
-    Esta função encapsula a lógica de negócio do modelo.
+    Snapshot do modelo para uma requisição. Cada requisição deve obtê-lo
+    uma única vez e usá-lo em todas as etapas, para que posições, vizinhos
+    e títulos venham sempre da mesma versão.
+    Lança RuntimeError se o modelo não estiver disponível.
     """
-    if model_components is None:
+    snapshot = load_model()
+    if snapshot is None:
         raise RuntimeError("O serviço de recomendação não está disponível.")
+    return snapshot
+
+
+def _refresh_model() -> None:
+    """Troca o modelo se uma nova versão foi publicada."""
+    global _checked_at
+    # Sem bloquear: se outra thread já está verificando, usa o modelo atual
+    if not _model_lock.acquire(blocking=False):
+        return
+    try:
+        _checked_at = time.monotonic()
+        version = current_version()
+        if version is not None and version != model.version:
+            _swap_model(open_model())
+    except Exception as e:
+        print(f"ERRO: Não foi possível carregar a nova versão do modelo: {e}")  # noqa: E501
+    finally:
+        _model_lock.release()
+
 
-    cosine_sim_matrix = model_components['cosine_sim_matrix']
-    df_data = model_components['df_model']
-    indices = model_components['indices']
+class TitleNotFoundError(ValueError):
+    """Título sem correspondência no modelo, com as sugestões mais próximas."""
 
-    if title not in indices:
-        raise ValueError("O título do livro não foi encontrado no catálogo.")
+    def __init__(self, suggestions: List[str]):
+        message = "O título do livro não foi encontrado no catálogo."
+        if suggestions:
+            message += " Você quis dizer: {}?".format(
+                ", ".join(f'"{title}"' for title in suggestions)
+            )
+        super().__init__(message)
+        self.suggestions = suggestions
 
-    idx = indices[title]
-    sim_scores = list(enumerate(cosine_sim_matrix[idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-    sim_scores = sim_scores[1:11]
-    book_indices = [i[0] for i in sim_scores]
-    recommended_books = df_data[['title']].iloc[book_indices]['title'].tolist()
+
+def resolve_title(title: str, model: ModelSnapshot | None = None) -> str:
+    """
+    Retorna o título do modelo correspondente a `title`, tolerando pequenos
+    erros de digitação, acentos, pontuação e maiúsculas/minúsculas.
+    Lança TitleNotFoundError (com sugestões) se nenhum título for próximo.
+    """
+    if model is None:
+        model = get_model()
+    match, suggestions = model.title_resolver.resolve(
+        title, Config.FUZZY_SUGGESTIONS
+    )
+    if match is None:
+        raise TitleNotFoundError(suggestions)
+    return match
+
+
+def title_position(model: ModelSnapshot, title: str) -> int:
+    """
+    Posição no modelo do livro com o título informado, resolvendo títulos
+    aproximados com `resolve_title` (lança TitleNotFoundError).
+    """
+    position = model.title_table.get(title)
+    if position is None:
+        position = model.title_table.get(resolve_title(title, model))
+    return position
+
+
+def nearest_neighbors(model: ModelSnapshot, idx: int,
+                      k: int = Config.RECOMMENDATION_K):
+    """
+    Retorna os `k` livros mais similares ao livro `idx` (posição no modelo)
+    e as respectivas similaridades, em ordem decrescente.
+    """
+    ids, scores = nearest_neighbors_many(model, np.array([idx]), k)
+    return ids[0], scores[0]
+
+
+def nearest_neighbors_many(model: ModelSnapshot, positions: np.ndarray,
+                           k: int = Config.RECOMMENDATION_K):
+    """
+    Versão vetorizada de `nearest_neighbors` para vários livros de uma vez.
+
+    Usa a tabela de vizinhos pré-calculada quando ela garante ao menos `k`
+    vizinhos exatos por livro (uma única indexação `neighbors[positions, :k]`);
+    para `k` maiores, calcula as linhas exatas de similaridade a partir da
+    matriz de features normalizada (um único produto esparso) e seleciona os
+    `k` maiores com seleção parcial (`top_k_rows`), excluindo cada livro pelo
+    próprio índice. Em catálogos com mais de `Config.ANN_EXACT_MAX_BOOKS`
+    livros, essas linhas vêm do índice aproximado (IVF) do modelo.
+    """
+    if k <= model.neighbors_k:
+        return model.neighbors[positions, :k], model.scores[positions, :k]
+    feature_matrix = model.feature_matrix
+    index = model.ann_index
+    if index is not None:
+        ids, scores, complete = index.query_many(positions, k)
+        if complete.all():
+            return ids, scores
+        positions = np.asarray(positions)
+        missing = np.flatnonzero(~complete)
+        rows = (feature_matrix[positions[missing]] @ feature_matrix.T).toarray()  # noqa: E501
+        ids[missing], scores[missing] = top_k_rows(
+            rows, k, exclude=positions[missing]
+        )
+        return ids, scores
+    rows = (feature_matrix[positions] @ feature_matrix.T).toarray()
+    return top_k_rows(rows, k, exclude=positions)
+
+
+def get_recommendations_batch(
+        titles: List[str],
+        book_ids: List[int],
+        k: int = Config.RECOMMENDATION_K,
+        model: ModelSnapshot | None = None
+        ) -> dict:
+    """
+    Gera recomendações para vários livros em uma única passada.
+
+    Todos os títulos e ids são resolvidos primeiro; em seguida os vizinhos
+    de todos os livros encontrados são obtidos de uma só vez
+    (`nearest_neighbors_many`). Erros são reportados por item, sem
+    interromper o lote.
+
+    Returns:
+    -------
+    dict
+        Título (ou book_id, como texto) informado -> `{"livro_base",
+        "recomendacoes"}` em caso de sucesso, ou `{"erro"}`.
+    """
+    if model is None:
+        model = get_model()
+
+    resultados = {}
+    keys = []
+    positions = []
+    for title in titles:
+        try:
+            position = title_position(model, title)
+        except TitleNotFoundError as e:
+            resultados[title] = {"erro": str(e)}
+            continue
+        keys.append(title)
+        positions.append(position)
+    # Ids fora do intervalo de int64 não existem no modelo e não cabem no
+    # vetor da busca em lote: são reportados como não encontrados
+    lookup = [
+        book_id for book_id in book_ids if INT64.min <= book_id <= INT64.max
+    ]
+    found = dict(zip(lookup, model.book_index.get_many(lookup).tolist()))
+    for book_id in book_ids:
+        position = found.get(book_id, -1)
+        if position < 0:
+            resultados[str(book_id)] = {
+                "erro": f"Livro não encontrado no modelo. ID: {book_id}"
+            }
+            continue
+        keys.append(str(book_id))
+        positions.append(position)
+
+    if positions:
+        ids, _ = nearest_neighbors_many(model, np.asarray(positions), k)
+        for key, position, row in zip(keys, positions, ids):
+            resultados[key] = {
+                "livro_base": model.titles[position],
+                "recomendacoes": model.titles.take(row)
+            }
+    # Mesma ordem da requisição
+    ordem = list(titles) + [str(book_id) for book_id in book_ids]
+    return {key: resultados[key] for key in dict.fromkeys(ordem)}
+
+
+def get_recommendations_from_title(
+        title: str,
+        k: int = Config.RECOMMENDATION_K,
+        model: ModelSnapshot | None = None
+        ) -> List[str]:
+    """
+    Gera recomendações de livros com base em um título.
+    Esta função encapsula a lógica de negócio do modelo.
+    """
+    if model is None:
+        model = get_model()
+
+    book_indices, _ = nearest_neighbors(model, title_position(model, title), k)  # noqa: E501
+    recommended_books = model.titles.take(book_indices)
 
     return recommended_books
+
+
+def get_recommendations_detailed(
+        book_id: int | None = None,
+        title: str | None = None,
+        k: int = Config.RECOMMENDATION_K,
+        fields: List[str] | None = None,
+        model: ModelSnapshot | None = None
+        ) -> dict:
+    """
+    Gera recomendações a partir de um `book_id` ou de um título, com a
+    similaridade de cada livro e as colunas pedidas do catálogo.
+
+    As colunas são obtidas do catálogo em memória pela posição de cada
+    livro (`pk_index`), sem nenhuma busca por título. Livros do modelo que
+    não existem mais na versão corrente do catálogo são omitidos.
+
+    Returns:
+    -------
+    dict
+        `{"livro_base": {"book_id", "title"}, "recomendacoes": [{"book_id",
+        "score", "book"}]}`.
+    """
+    from app.services.catalog import get_catalog
+
+    if model is None:
+        model = get_model()
+
+    if book_id is not None:
+        position = model.book_index.get(book_id)
+        if position is None:
+            raise ValueError(f"Livro não encontrado no modelo. ID: {book_id}")
+    else:
+        position = title_position(model, title)
+
+    model_book_ids = np.asarray(model.book_ids)
+    ids, scores = nearest_neighbors(model, position, k)
+    neighbor_book_ids = model_book_ids[ids]
+
+    catalog = get_catalog()
+    catalog_positions = catalog.pk_index.get_many(neighbor_book_ids)
+    found = catalog_positions >= 0
+    books = catalog.rows(catalog_positions[found], fields)
+    return {
+        "livro_base": {
+            "book_id": int(model_book_ids[position]),
+            "title": model.titles[position]
+        },
+        "recomendacoes": [
+            {"book_id": neighbor, "score": round(score, 4), "book": book}
+            for neighbor, score, book in zip(
+                neighbor_book_ids[found].tolist(),
+                scores[found].tolist(),
+                books
+            )
+        ]
+    }
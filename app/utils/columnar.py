@@ -0,0 +1,240 @@
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import time
+import numpy as np
+
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+
+
+class StringColumn:
+    """Coluna de texto armazenada como um blob UTF-8 contíguo e um vetor de offsets.
+
+    Os dois arrays são abertos com `mmap_mode='r'`, portanto o texto só é
+    lido do disco (e decodificado) para as posições efetivamente acessadas.
+
+    Attributes:
+    -----------
+        data (np.ndarray): Bytes UTF-8 de todos os valores concatenados.
+        offsets (np.ndarray): Posição inicial de cada valor em `data`, com
+            um elemento extra no final (tamanho total do blob).
+    """  # noqa: E501
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start = int(self.offsets[position])
+        end = int(self.offsets[position + 1])
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def take(self, positions) -> list:
+        return [self[int(position)] for position in positions]
+
+    def to_list(self) -> list:
+        raw = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [
+            raw[offsets[i]:offsets[i + 1]].decode("utf-8")
+            for i in range(len(self))
+        ]
+
+
+class CategoricalColumn:
+    """Coluna categórica armazenada como códigos inteiros e um dicionário de categorias.
+
+    Attributes:
+    -----------
+        codes (np.ndarray): Código da categoria de cada linha (-1 para nulo).
+        categories (list): Valores distintos da coluna, na ordem dos códigos.
+    """  # noqa: E501
+
+    def __init__(self, codes: np.ndarray, categories: list):
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, position: int):
+        code = int(self.codes[position])
+        return self.categories[code] if code >= 0 else None
+
+    def take(self, positions) -> list:
+        codes = self.codes[np.asarray(positions, dtype=np.int64)].tolist()
+        return [self.categories[c] if c >= 0 else None for c in codes]
+
+    def to_list(self) -> list:
+        return self.take(np.arange(len(self)))
+
+
+def write_column(directory: str, name: str, values) -> dict:
+    """Grava uma coluna (pandas.Series ou np.ndarray) em formato binário colunar.
+
+    Colunas numéricas viram um único `.npy`; colunas categóricas viram um
+    `.npy` de códigos; as demais são tratadas como texto (blob + offsets).
+
+    Parameters:
+    ----------
+    directory : str
+        Diretório da versão onde os arquivos serão gravados.
+    name : str
+        Nome da coluna.
+    values : pd.Series | np.ndarray
+        Valores da coluna.
+    Returns:
+    -------
+    dict
+        Entrada de schema da coluna, a ser registrada no manifesto.
+    """  # noqa: E501
+    categorical = getattr(values, "cat", None)
+    if categorical is not None:
+        codes = categorical.codes.to_numpy()
+        np.save(os.path.join(directory, f"{name}.codes.npy"), codes)
+        return {
+            "kind": "category",
+            "dtype": str(codes.dtype),
+            "categories": [str(c) for c in categorical.categories]
+        }
+    if values.dtype.kind in "biuf":
+        array = np.asarray(values)
+        np.save(os.path.join(directory, f"{name}.npy"), array)
+        return {"kind": "numeric", "dtype": str(array.dtype)}
+    encoded = [str(value).encode("utf-8") for value in values.tolist()]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    np.save(os.path.join(directory, f"{name}.data.npy"), data)
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+    return {"kind": "string", "dtype": "utf-8"}
+
+
+def open_column(directory: str, name: str, entry: dict):
+    """Abre uma coluna gravada por `write_column` sem ler seu conteúdo.
+
+    Parameters:
+    ----------
+    directory : str
+        Diretório da versão.
+    name : str
+        Nome da coluna.
+    entry : dict
+        Entrada de schema da coluna no manifesto.
+    Returns:
+    -------
+    np.ndarray | StringColumn | CategoricalColumn
+        Coluna mapeada em memória.
+    """  # noqa: E501
+    kind = entry["kind"]
+    if kind == "numeric":
+        return load_array(os.path.join(directory, f"{name}.npy"))
+    if kind == "category":
+        return CategoricalColumn(
+            load_array(os.path.join(directory, f"{name}.codes.npy")),
+            entry["categories"]
+        )
+    return StringColumn(
+        load_array(os.path.join(directory, f"{name}.data.npy")),
+        load_array(os.path.join(directory, f"{name}.offsets.npy"))
+    )
+
+
+def load_array(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Grava um arquivo de texto de forma atômica (arquivo temporário + rename)."""  # noqa: E501
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_manifest(directory: str, manifest: dict) -> None:
+    atomic_write_text(
+        os.path.join(directory, MANIFEST_FILE),
+        json.dumps(manifest, ensure_ascii=False, indent=2)
+    )
+
+
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as file:  # noqa: E501
+        return json.load(file)
+
+
+def publish_version(root: str, version: str) -> None:
+    """Aponta o arquivo CURRENT do diretório raiz para a versão informada."""
+    atomic_write_text(os.path.join(root, CURRENT_FILE), version)
+
+
+def read_current_version(root: str) -> str | None:
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as file:  # noqa: E501
+            version = file.read().strip()
+    except FileNotFoundError:
+        return None
+    if not version or not os.path.isdir(os.path.join(root, version)):
+        return None
+    return version
+
+
+@contextlib.contextmanager
+def version_lock(root: str):
+    """Lock exclusivo entre processos sobre o diretório raiz das versões.
+
+    Usado para que apenas um worker construa e publique uma versão por vez;
+    os demais aguardam e reaproveitam a versão publicada.
+    """  # noqa: E501
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), "a") as file:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def prune_versions(root: str, keep: int, grace_seconds: float = 0) -> None:
+    """Remove as versões mais antigas, mantendo a atual e as `keep` mais recentes.
+
+    Os arquivos que um processo já mapeou continuam legíveis após a
+    remoção (o sistema operacional só libera as páginas quando o último
+    mapeamento é fechado), mas os que ainda não foram abertos (colunas e
+    arrays mapeados sob demanda) deixam de existir. Por isso uma versão só
+    é removida `grace_seconds` depois de deixar de ser a atual (publicação
+    da versão seguinte), prazo em que os processos que ainda a servem já
+    trocaram de snapshot.
+    """  # noqa: E501
+    current = read_current_version(root)
+    versions = sorted(
+        (
+            entry for entry in os.listdir(root)
+            if not entry.startswith(".")
+            and os.path.isdir(os.path.join(root, entry))
+        ),
+        key=lambda entry: os.path.getmtime(os.path.join(root, entry))
+    )
+    now = time.time()
+    for position, version in enumerate(
+        versions[:-keep] if keep > 0 else versions
+    ):
+        if version == current:
+            continue
+        if position + 1 < len(versions):
+            replaced_at = os.path.getmtime(
+                os.path.join(root, versions[position + 1])
+            )
+        else:
+            replaced_at = now
+        if now - replaced_at >= grace_seconds:
+            shutil.rmtree(os.path.join(root, version), ignore_errors=True)
@@ -1,71 +1,135 @@
 import pandas as pd
+import time
+from app.utils.app_logger import AppLogger
 
 
-def get_csv_data(
-        path_file: str
-        ) -> pd.DataFrame:
-    """Função para obter o conteúdo de um arquivo CSV e retornar um DataFrame do Pandas.
-    O arquivo CSV deve estar no formato correto, com colunas separadas por ponto e vírgula.
+# Schema explícito do CSV de livros: coluna -> tipo de destino
+BOOKS_SCHEMA = {
+    "book_id": "int64",
+    "title": "string",
+    "description": "string",
+    "review_rating": "int8",
+    "category": "category",
+    "product_upc": "string",
+    "currency": "category",
+    "price_including_tax": "float64",
+    "price_excluding_tax": "float64",
+    "tax": "float64",
+    "number_available": "int32",
+    "created_at": "datetime",
+    "image_url": "string",
+    "url": "string",
+}
+PRICE_COLUMNS = ["price_including_tax", "price_excluding_tax", "tax"]
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+MISSING_VALUE = "--"
 
-    Parameters:
-    ----------
-    path_file : str
-        Caminho para o arquivo CSV a ser lido.
-    Returns:
-    -------
-    pd.DataFrame
-        DataFrame contendo os dados do arquivo CSV.
-    Raises:
-    ------
-    Exception
-        Se ocorrer um erro ao ler o arquivo CSV, a função retornará uma exceção.
-    """  # noqa: E501
-    try:
-        print(f"Lendo arquivo CSV de: {path_file}")
-        df = pd.read_csv(path_file, sep=';')
-        # A coluna de data não vinha com o formato de data, vinha como object
-        df['created_at'] = pd.to_datetime(
-            df['created_at'], errors='coerce'
+
+def _read_dtypes(schema: dict) -> dict:
+    """Tipos usados na leitura: inteiros são lidos como float para tolerar nulos."""  # noqa: E501
+    read_types = {}
+    for column, kind in schema.items():
+        if kind in ("string", "datetime"):
+            read_types[column] = object
+        elif kind == "category":
+            read_types[column] = "category"
+        else:
+            read_types[column] = "float64"
+    return read_types
+
+
+def _cast_column(series: pd.Series, kind: str) -> pd.Series:
+    if kind == "string":
+        return series.fillna(MISSING_VALUE)
+    if kind == "category":
+        if series.isna().any():
+            series = series.cat.add_categories([MISSING_VALUE])
+            series = series.fillna(MISSING_VALUE)
+        return series
+    if kind == "datetime":
+        parsed = pd.to_datetime(
+            series, format=DATETIME_FORMAT, errors="coerce"
         )
         # Converte para string para evitar erro de validação no Pydantic
-        df['created_at'] = df['created_at'].dt.strftime('%Y-%m-%dT%H:%M:%S')
-        # Evitando valores negativos nas colunas float
-        df['price_including_tax'] = df['price_including_tax'].apply(
-            lambda x: abs(x)
-        )
-        df['price_excluding_tax'] = df['price_excluding_tax'].apply(
-            lambda x: abs(x)
+        return parsed.dt.strftime("%Y-%m-%dT%H:%M:%S").fillna(MISSING_VALUE)
+    return series.astype(kind)
+
+
+def _reject_missing_integers(df: pd.DataFrame, schema: dict) -> tuple[pd.DataFrame, int]:  # noqa: E501
+    """Descarta as linhas sem valor em colunas inteiras (ex.: `review_rating`).
+
+    Um inteiro desconhecido não tem representação no catálogo colunar; em
+    vez de virar um 0 que entraria em estatísticas, facetas e filtros, a
+    linha é rejeitada e registrada no log.
+    """  # noqa: E501
+    columns = [
+        column for column, kind in schema.items()
+        if kind.startswith("int") and column in df.columns
+    ]
+    missing = df[columns].isna()
+    rejected = missing.any(axis=1)
+    total = int(rejected.sum())
+    if total:
+        counts = missing.sum()
+        AppLogger().create_logger("ingest").warning(
+            f"{total} linha(s) rejeitada(s) por valores ausentes em colunas "
+            f"inteiras: {counts[counts > 0].to_dict()}"
         )
-        df['tax'] = df['tax'].apply(lambda x: abs(x))
-        # Preenchendo valores vazios na coluna de categoria
-        df = df.fillna("--")
-    except Exception as error:
-        return error
-    return df
+        df = df.loc[~rejected].reset_index(drop=True)
+    return df, total
 
 
-def get_unique_items(
-        df: pd.DataFrame,
-        column_name: str
-        ):
-    """Função para obter uma lista de itens únicos de uma coluna específica de um DataFrame.
+def ingest_csv(
+        path_file: str,
+        schema: dict = BOOKS_SCHEMA
+        ) -> tuple[pd.DataFrame, dict]:
+    """Lê o CSV de livros aplicando um schema explícito, de forma vetorizada.
+
+    Cada coluna é convertida para o tipo declarado em `schema`: textos têm
+    nulos preenchidos com "--", colunas categóricas usam `category`,
+    inteiros e floats mantêm tipos numéricos e os preços são normalizados
+    com `abs` vetorizado. Linhas sem valor em colunas inteiras são
+    rejeitadas e registradas no log (`_reject_missing_integers`).
 
     Parameters:
     ----------
-    df : pd.DataFrame
-        DataFrame do qual os itens únicos serão extraídos.
-    column_name : str
-        Nome da coluna do DataFrame da qual os itens únicos serão extraídos.
+    path_file : str
+        Caminho para o arquivo CSV a ser lido (separado por ponto e vírgula).
+    schema : dict, optional
+        Mapeamento coluna -> tipo de destino, por padrão `BOOKS_SCHEMA`.
+    Returns:
+    -------
+    tuple[pd.DataFrame, dict]
+        DataFrame tipado e um relatório com o número de linhas (e de linhas
+        rejeitadas), o tempo de leitura e, por coluna, o tipo final, os
+        nulos encontrados e o tempo de conversão.
     """  # noqa: E501
-    try:
-        if column_name not in df.columns:
-            raise ValueError(
-                f"A coluna '{column_name}' não existe na base de dados"
-            )
-        unique_items = df[column_name].drop_duplicates().tolist()
-        return unique_items
-    except Exception as error:
-        return error
+    start_time = time.perf_counter()
+    df = pd.read_csv(path_file, sep=';', dtype=_read_dtypes(schema))
+    read_seconds = round(time.perf_counter() - start_time, 6)
+    nulls = df.isna().sum()
+    df, rejected = _reject_missing_integers(df, schema)
+    report = {
+        "rows": len(df),
+        "rejected_rows": rejected,
+        "read_seconds": read_seconds,
+        "columns": {}
+    }
+    for column, kind in schema.items():
+        if column not in df.columns:
+            continue
+        column_start = time.perf_counter()
+        df[column] = _cast_column(df[column], kind)
+        if column in PRICE_COLUMNS:
+            # Evitando valores negativos nas colunas de preço
+            df[column] = df[column].abs()
+        report["columns"][column] = {
+            "dtype": str(df[column].dtype),
+            "nulls": int(nulls[column]),
+            "seconds": round(time.perf_counter() - column_start, 6)
+        }
+    report["total_seconds"] = round(time.perf_counter() - start_time, 6)
+    return df, report
 
 
 def get_rating(
@@ -95,10 +159,3 @@ def get_rating(
         df[name_column].value_counts().get(required_number, default_response)
     )
     return rating
-
-
-def get_price_range(df, name_column, min_price, max_price):
-    result = df.query(
-        f'{name_column} >= {min_price} and {name_column} <= {max_price}'
-        )
-    return result
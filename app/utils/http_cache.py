@@ -0,0 +1,101 @@
+import hashlib
+import time
+from fastapi import HTTPException, Request
+from app.config import Config
+from app.services.catalog import get_catalog
+from app.utils.app_logger import AppLogger
+from app.models.logger import LoggerModel
+
+# As rotas exigem token: `private` impede que caches compartilhados fora do
+# nginx (que separa o cache por Authorization) guardem as respostas
+CACHE_CONTROL = f"private, max-age={Config.HTTP_CACHE_MAX_AGE}"
+# Rotas que nunca podem ser servidas de cache (ex.: health check)
+NO_STORE_PATHS = ("/api/v1/health", "/api/v1/health/startup")
+
+
+def compute_etag(version: str, request: Request) -> str:
+    """ETag forte derivado da versão do catálogo, do caminho e da query normalizada."""  # noqa: E501
+    query = sorted(request.query_params.multi_items())
+    raw = f"{version}|{request.url.path}|{query}"
+    return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Compara o header If-None-Match com o ETag atual (comparação fraca, RFC 9110)."""  # noqa: E501
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def catalog_etag(request: Request) -> str:
+    """Dependência de rotas de leitura do catálogo: responde 304 quando o cliente já tem a versão atual.
+
+    Deve ser declarada depois de `get_current_user` na assinatura da rota,
+    para que a autenticação seja validada antes. A verificação acontece
+    antes de qualquer filtragem ou serialização; quando o ETag não confere,
+    ele fica em `request.state.etag` e o `CacheHeadersMiddleware` o
+    adiciona à resposta.
+    """  # noqa: E501
+    start_time = time.time()
+    etag = compute_etag(get_catalog().version, request)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("http-cache"),
+            LoggerModel(
+                status_code=304,
+                endpoint=request.url.path,
+                message="Conteúdo não modificado (If-None-Match).",
+                type="info",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(status_code=304, headers=headers)
+    request.state.etag = etag
+    return etag
+
+
+class CacheHeadersMiddleware:
+    """Middleware ASGI que adiciona ETag e Cache-Control às respostas 200 das rotas do catálogo.
+
+    As rotas de `NO_STORE_PATHS` ficam de fora e recebem sempre
+    `Cache-Control: no-store`.
+    """  # noqa: E501
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Garante que o estado da requisição seja compartilhado com a rota
+        state = scope.setdefault("state", {})
+        no_store = scope.get("path") in NO_STORE_PATHS
+
+        async def send_with_headers(message):
+            etag = state.get("etag")
+            if message["type"] == "http.response.start" and no_store:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"cache-control", b"no-store")
+                ]
+            elif (
+                message["type"] == "http.response.start"
+                and message["status"] == 200
+                and etag
+            ):
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"etag", etag.encode("latin-1")),
+                    (b"cache-control", CACHE_CONTROL.encode("latin-1"))
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
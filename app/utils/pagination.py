@@ -0,0 +1,133 @@
+import base64
+import binascii
+import hashlib
+import json
+import time
+from fastapi import HTTPException, Request
+from app.utils.app_logger import AppLogger
+from app.models.logger import LoggerModel
+
+
+def query_fingerprint(params: dict) -> str:
+    """Resumo dos parâmetros de consulta que definem o conjunto paginado.
+
+    Parameters:
+    ----------
+    params : dict
+        Parâmetros da consulta (sem `cursor` e `limit`); valores None são ignorados.
+    Returns:
+    -------
+    str
+        Hash curto e estável dos parâmetros normalizados.
+    """  # noqa: E501
+    normalized = sorted(
+        (key, str(value)) for key, value in params.items()
+        if value is not None
+    )
+    return hashlib.sha1(json.dumps(normalized).encode()).hexdigest()[:12]
+
+
+def encode_cursor(version: str, query: str, offset: int) -> str:
+    payload = json.dumps({"v": version, "q": query, "o": offset})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, version: str, query: str) -> int:
+    """Decodifica um cursor e retorna a posição inicial da página.
+
+    Raises:
+    ------
+    ValueError
+        Se o cursor for inválido, pertencer a outra consulta ou a outra
+        versão do catálogo.
+    """  # noqa: E501
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(payload["o"])
+        cursor_version = payload["v"]
+        cursor_query = payload["q"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Cursor inválido.")
+    if cursor_query != query or offset < 0:
+        raise ValueError("Cursor inválido para esta consulta.")
+    if cursor_version != version:
+        raise ValueError(
+            "Cursor expirado: o catálogo foi atualizado. "
+            "Refaça a consulta sem o parâmetro cursor."
+        )
+    return offset
+
+
+def paginate(
+        total: int,
+        cursor: str | None,
+        limit: int,
+        version: str,
+        params: dict
+        ) -> tuple[int, int, dict]:
+    """Calcula a janela da página atual e o cursor da próxima.
+
+    O cursor é opaco para o cliente e carrega a versão do catálogo, o
+    resumo da consulta e a posição inicial da página, de modo que as
+    páginas são estáveis enquanto a versão do catálogo não mudar.
+
+    Parameters:
+    ----------
+    total : int
+        Número total de itens do resultado.
+    cursor : str | None
+        Cursor recebido do cliente (None na primeira página).
+    limit : int
+        Tamanho máximo da página.
+    version : str
+        Versão do catálogo usada na consulta.
+    params : dict
+        Parâmetros que definem o resultado (ver `query_fingerprint`).
+    Returns:
+    -------
+    tuple[int, int, dict]
+        Início e fim (exclusivo) da página e o objeto de paginação da resposta.
+    Raises:
+    ------
+    ValueError
+        Se o cursor for inválido ou estiver expirado.
+    """  # noqa: E501
+    query = query_fingerprint(params)
+    start = decode_cursor(cursor, version, query) if cursor else 0
+    end = min(start + limit, total)
+    next_cursor = encode_cursor(version, query, end) if end < total else None
+    return start, end, {
+        "limit": limit,
+        "total": total,
+        "next_cursor": next_cursor
+    }
+
+
+def paginate_request(
+        request: Request,
+        logger_name: str,
+        start_time: float,
+        total: int,
+        cursor: str | None,
+        limit: int,
+        version: str,
+        params: dict
+        ) -> tuple[int, int, dict]:
+    """Versão de `paginate` para endpoints: cursor inválido vira HTTP 400 registrado em log."""  # noqa: E501
+    try:
+        return paginate(total, cursor, limit, version, params)
+    except ValueError as error:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger(logger_name),
+            LoggerModel(
+                status_code=400,
+                endpoint=request.url.path,
+                message=str(error),
+                type="warning",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(status_code=400, detail=str(error))
@@ -0,0 +1,67 @@
+import time
+from fastapi import HTTPException, Query, Request
+from app.models.schemas.books import BookItem
+from app.utils.app_logger import AppLogger
+from app.models.logger import LoggerModel
+
+BOOK_FIELDS = list(BookItem.model_fields)
+
+
+def parse_fields(raw: str | None, allowed: list = BOOK_FIELDS) -> list | None:
+    """Converte o parâmetro `fields` ("book_id,title,...") em uma lista de colunas.
+
+    Parameters:
+    ----------
+    raw : str | None
+        Valor do parâmetro, com as colunas separadas por vírgula.
+    allowed : list, optional
+        Colunas que podem ser projetadas, por padrão as de `BookItem`.
+    Returns:
+    -------
+    list | None
+        Colunas pedidas, sem repetição e na ordem informada, ou None quando
+        o parâmetro não foi enviado (todas as colunas).
+    Raises:
+    ------
+    ValueError
+        Se alguma coluna não existir.
+    """  # noqa: E501
+    if raw is None:
+        return None
+    fields = list(dict.fromkeys(
+        field.strip() for field in raw.split(",") if field.strip()
+    ))
+    invalid = [field for field in fields if field not in allowed]
+    if not fields or invalid:
+        raise ValueError(
+            f"Campos inválidos em 'fields': {invalid or raw!r}. "
+            f"Campos permitidos: {', '.join(allowed)}."
+        )
+    return fields
+
+
+def book_fields(
+    request: Request,
+    fields: str | None = Query(
+        default=None,
+        description="Colunas a retornar, separadas por vírgula (ex.: book_id,title,price_including_tax)"  # noqa: E501
+    )
+) -> list | None:
+    """Dependência das rotas que retornam livros: valida o parâmetro `fields`."""  # noqa: E501
+    start_time = time.time()
+    try:
+        return parse_fields(fields)
+    except ValueError as error:
+        latency = time.time() - start_time
+        AppLogger().set_log_message(
+            AppLogger().create_logger("books"),
+            LoggerModel(
+                status_code=400,
+                endpoint=request.url.path,
+                message=str(error),
+                type="warning",
+                method=request.method,
+                latency=latency
+            )
+        )
+        raise HTTPException(status_code=400, detail=str(error))
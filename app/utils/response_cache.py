@@ -0,0 +1,94 @@
+import json
+import math
+import threading
+from collections import OrderedDict
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Serializa o conteúdo em JSON compacto (orjson quando disponível).
+
+    Floats não finitos (ex.: NaN de colunas sem valor) viram `null`, como
+    no orjson, em vez do `NaN` inválido em JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        _finite(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _finite(content):
+    if isinstance(content, float):
+        return content if math.isfinite(content) else None
+    if isinstance(content, dict):
+        return {key: _finite(value) for key, value in content.items()}
+    if isinstance(content, (list, tuple)):
+        return [_finite(value) for value in content]
+    return content
+
+
+def encode_response(content: dict, model=None) -> bytes:
+    """Valida o conteúdo com o schema de resposta (se houver) e o serializa.
+
+    Parameters:
+    ----------
+    content : dict
+        Corpo da resposta.
+    model : type[BaseModel], optional
+        Schema Pydantic da resposta; quando informado, o corpo passa pela
+        mesma validação/filtragem que o FastAPI aplicaria.
+    Returns:
+    -------
+    bytes
+        JSON pronto para ser enviado.
+    """  # noqa: E501
+    if model is not None:
+        content = model.model_validate(content).model_dump(mode="json")
+    return dumps(content)
+
+
+class JSONBytesResponse(Response):
+    """Resposta JSON cujo corpo já foi serializado."""
+    media_type = "application/json"
+
+
+class ResponseCache:
+    """Cache LRU de respostas já serializadas, associado a uma versão do catálogo.
+
+    Cada `CatalogSnapshot` tem o seu próprio cache; quando uma nova versão
+    é publicada, as respostas antigas deixam de ser alcançáveis junto com
+    o snapshot anterior, sem necessidade de invalidação explícita.
+
+    Attributes:
+    -----------
+        max_entries (int): Número máximo de respostas mantidas.
+    """  # noqa: E501
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> bytes | None:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body: bytes) -> bytes:
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
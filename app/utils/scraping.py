@@ -268,9 +268,11 @@ class BooksToScrape:
                 )
 
         df = pd.DataFrame(books)
-        df.to_csv(
-            os.path.abspath(filename), index=False, sep=";", encoding="utf-8"
-        )  # noqa: E501
+        # Grava em um arquivo temporário e troca de uma vez, para que o
+        # catálogo nunca leia um CSV pela metade
+        tmp_filename = f"{os.path.abspath(filename)}.tmp"
+        df.to_csv(tmp_filename, index=False, sep=";", encoding="utf-8")
+        os.replace(tmp_filename, os.path.abspath(filename))
         logging.info(f"Books saved to {os.path.abspath(filename)}")
 
     def save_books_to_json(
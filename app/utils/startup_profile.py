@@ -0,0 +1,125 @@
+import contextlib
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+
+class StartupProfile:
+    """Registro dos tempos de inicialização da API.
+
+    Guarda o tempo de import de cada módulo importado por `import_module`
+    e o tempo de carga de cada recurso (catálogo, modelo, ...) medido com
+    `resource`, para que regressões no cold start fiquem visíveis.
+
+    Attributes:
+    -----------
+        imports (dict): Nome do módulo -> segundos gastos no import.
+        resources (dict): Nome do recurso -> segundos gastos na carga.
+        errors (dict): Nome do recurso -> mensagem de erro da carga.
+    """  # noqa: E501
+
+    def __init__(self):
+        self.imports = {}
+        self.resources = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def import_module(self, name: str):
+        """Importa um módulo registrando o tempo gasto."""
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        with self._lock:
+            self.imports[name] = time.perf_counter() - start
+        return module
+
+    @contextlib.contextmanager
+    def resource(self, name: str):
+        """Mede o tempo de carga de um recurso; erros são registrados e propagados."""  # noqa: E501
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as error:
+            with self._lock:
+                self.errors[name] = str(error)
+            raise
+        finally:
+            with self._lock:
+                self.resources[name] = time.perf_counter() - start
+
+    def report(self) -> dict:
+        """Retorna os tempos registrados, do mais lento para o mais rápido."""
+        with self._lock:
+            imports = sorted(self.imports.items(), key=lambda x: -x[1])
+            resources = sorted(self.resources.items(), key=lambda x: -x[1])
+            errors = dict(self.errors)
+        return {
+            "imports": [
+                {"module": name, "seconds": round(seconds, 4)}
+                for name, seconds in imports
+            ],
+            "resources": [
+                {
+                    "resource": name,
+                    "seconds": round(seconds, 4),
+                    "error": errors.get(name)
+                }
+                for name, seconds in resources
+            ],
+            "totalImportSeconds": round(sum(x[1] for x in imports), 4),
+            "totalResourceSeconds": round(sum(x[1] for x in resources), 4)
+        }
+
+
+profile = StartupProfile()
+
+
+def import_time_report(target: str = "app.main", top: int = 25) -> list:
+    """Mede o import de `target` em um processo novo (`python -X importtime`).
+
+    Parameters:
+    ----------
+    target : str
+        Módulo a ser importado.
+    top : int
+        Quantidade de módulos retornados.
+    Returns:
+    -------
+    list
+        Módulos com maior tempo cumulativo de import, com os tempos
+        próprio (`selfSeconds`) e cumulativo (`cumulativeSeconds`).
+    """  # noqa: E501
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "selfSeconds": int(self_us) / 1e6,
+            "cumulativeSeconds": int(cumulative_us) / 1e6
+        })
+    modules.sort(key=lambda x: -x["cumulativeSeconds"])
+    return modules[:top]
+
+
+if __name__ == "__main__":
+    # Uso: python -m app.utils.startup_profile
+    print("Import (processo novo, tempo cumulativo):")
+    for item in import_time_report():
+        print(
+            f"  {item['cumulativeSeconds']:8.3f}s "
+            f"{item['selfSeconds']:8.3f}s  {item['module']}"
+        )
+    from app.main import warm_up
+    warm_up()
+    print("Recursos:")
+    for item in profile.report()["resources"]:
+        status = f"  ERRO: {item['error']}" if item["error"] else ""
+        print(f"  {item['seconds']:8.3f}s  {item['resource']}{status}")
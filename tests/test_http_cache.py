@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from app.utils import http_cache
+from app.utils.app_logger import AppLogger
+from app.utils.http_cache import (
+    CACHE_CONTROL,
+    CacheHeadersMiddleware,
+    catalog_etag
+)
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    snapshot = SimpleNamespace(version="v1")
+    monkeypatch.setattr(http_cache, "get_catalog", lambda: snapshot)
+    # Sem gravar os logs das respostas 304 no banco
+    monkeypatch.setattr(AppLogger, "set_log_message", lambda *args: None)
+    return snapshot
+
+
+@pytest.fixture
+def client(catalog):
+    app = FastAPI()
+    app.add_middleware(CacheHeadersMiddleware)
+
+    @app.get("/api/v1/books")
+    async def books(etag=Depends(catalog_etag)):
+        return {"books": []}
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+def test_response_carries_etag_and_cache_control(client):
+    response = client.get("/api/v1/books", params={"limit": 10})
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"] == CACHE_CONTROL
+
+
+def test_matching_if_none_match_returns_304(client):
+    etag = client.get("/api/v1/books").headers["etag"]
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(
+            "/api/v1/books", headers={"If-None-Match": header}
+        )
+        assert response.status_code == 304, header
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+
+def test_etag_depends_on_query_and_catalog_version(client, catalog):
+    etag = client.get("/api/v1/books", params={"a": 1, "b": 2}).headers["etag"]  # noqa: E501
+
+    same = client.get("/api/v1/books", params={"b": 2, "a": 1})
+    other = client.get("/api/v1/books", params={"a": 2, "b": 2})
+    assert same.headers["etag"] == etag
+    assert other.headers["etag"] != etag
+
+    catalog.version = "v2"
+    response = client.get(
+        "/api/v1/books",
+        params={"a": 1, "b": 2},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_health_is_never_cached(client):
+    response = client.get("/api/v1/health")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert "etag" not in response.headers
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.config import Config
+from app.models.ml_recomender.model_store import open_model, save_model_version
+from app.models.ml_recomender.title_model import (
+    atualizar_modelo_incremental,
+    preparar_modelo_recomendacao
+)
+
+WORDS = [
+    "dragon", "castle", "love", "war", "ocean", "poetry", "history",
+    "science", "magic", "detective", "murder", "travel", "cooking",
+    "garden", "music", "space", "robot", "family", "secret", "island"
+]
+CATEGORIES = ["Fiction", "Poetry", "History", "Mystery", "Science"]
+
+
+def catalogo_sintetico(total: int, seed: int = 0) -> pd.DataFrame:
+    """Catálogo já tratado, com vocabulário pequeno (muitos empates e
+    similaridades 0, como no catálogo real)."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "book_id": np.arange(1, total + 1),
+        "title": [f"Book {i}" for i in range(1, total + 1)],
+        "description": [
+            " ".join(rng.choice(WORDS, size=rng.integers(0, 4)))
+            for _ in range(total)
+        ],
+        "review_rating": rng.integers(1, 6, size=total),
+        "category": rng.choice(CATEGORIES, size=total),
+        "price": rng.uniform(10, 60, size=total).round(2),
+        "number_available": rng.integers(0, 20, size=total)
+    })
+
+
+def alterar(df: pd.DataFrame, seed: int) -> pd.DataFrame:
+    """Altera 5 livros, remove 5 e acrescenta 5 ao final."""
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(len(df), 10, replace=False)
+    df = df.copy()
+    df.loc[positions[:5], "description"] += f" sequel{seed} dragon"
+    df = df.drop(index=positions[5:])
+    novos = df.iloc[:5].copy()
+    novos["book_id"] = df["book_id"].max() + np.arange(1, 6)
+    novos["title"] = [f"New {seed}-{i}" for i in range(5)]
+    novos["description"] = "brand new " + novos["description"]
+    return pd.concat([df, novos], ignore_index=True)
+
+
+def assert_mesmos_vizinhos(incremental: dict, completo: dict):
+    k = incremental["neighbors_k"]
+    assert k == completo["neighbors_k"] == Config.MODEL_NEIGHBORS
+    assert np.array_equal(
+        incremental["neighbors"][:, :k], completo["neighbors"][:, :k]
+    )
+    assert np.array_equal(
+        incremental["scores"][:, :k], completo["scores"][:, :k]
+    )
+    # Posições preenchidas além de k também são exatas
+    filled = incremental["neighbors"] >= 0
+    assert np.array_equal(
+        incremental["neighbors"][filled], completo["neighbors"][filled]
+    )
+
+
+@pytest.fixture
+def modelo(tmp_path):
+    df = catalogo_sintetico(300)
+    save_model_version(preparar_modelo_recomendacao(df), root=str(tmp_path))
+    return df, open_model(str(tmp_path))
+
+
+def test_incremental_update_matches_full_rebuild(tmp_path, modelo):
+    df, anterior = modelo
+    for seed in range(3):
+        df = alterar(df, seed)
+
+        components, stats = atualizar_modelo_incremental(anterior, df)
+
+        assert components is not None, stats
+        assert (stats["added"], stats["changed"], stats["removed"]) == (5, 5, 5)  # noqa: E501
+        # Custo proporcional às alterações: a folga repõe os vizinhos
+        # perdidos sem recalcular as listas
+        assert stats["recomputed"] == stats["added"] + stats["changed"]
+        assert_mesmos_vizinhos(components, preparar_modelo_recomendacao(df))
+        save_model_version(components, stats, root=str(tmp_path))
+        anterior = open_model(str(tmp_path))
+
+    assert atualizar_modelo_incremental(anterior, df)[1]["reason"] == "sem alterações"  # noqa: E501
+
+
+def test_incremental_update_without_relative_order(modelo):
+    df, anterior = modelo
+    df = alterar(df, 0)
+    # Livros mantidos em outra ordem: o desempate pela posição muda
+    df = pd.concat([df.iloc[150:], df.iloc[:150]], ignore_index=True)
+
+    components, stats = atualizar_modelo_incremental(
+        anterior, df, max_ratio=1.0
+    )
+
+    assert_mesmos_vizinhos(components, preparar_modelo_recomendacao(df))
+
+
+def test_incremental_update_respects_max_ratio(modelo):
+    df, anterior = modelo
+    df = pd.concat([df.iloc[150:], df.iloc[:150]], ignore_index=True)
+
+    components, stats = atualizar_modelo_incremental(
+        anterior, df, max_ratio=0.01
+    )
+
+    assert components is None
+    assert stats["reason"] == "muitas alterações"
+    assert stats["recomputed"] > 0.01 * len(df)
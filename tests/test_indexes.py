@@ -0,0 +1,52 @@
+import numpy as np
+from app.services.indexes import NGramIndex
+
+TEXTS = [
+    "A Light in the Attic",
+    "Tipping the Velvet",
+    "Soumission",
+    "Sharp Objects",
+    "Sapiens: A Brief History of Humankind",
+    "The Requiem Red",
+    "The Dirty Little Secrets of Getting Your Dream Job",
+    "Olio",
+    "Mesaerion: The Best Science Fiction Stories 1800-1849",
+    "Libertarianism for Beginners",
+    "It's Only the Himalayas",
+    "Ça, c'est ÉTÉ",
+    "",
+    "aaaa",
+]
+
+
+def scan(texts, query):
+    query = query.lower()
+    return [p for p, text in enumerate(texts) if query in text.lower()]
+
+
+def test_ngram_index_matches_substring_scan():
+    index = NGramIndex(TEXTS)
+    queries = [
+        "the", "THE", "a", "", "ap", "sapiens", "humankind", " of ",
+        "ç", "été", "aaa", "aaaa", "aaaaa", "xyz", "1800-1849", "'s o",
+        "the attic", "iens: a"
+    ]
+
+    for query in queries:
+        result = index.search(query)
+        assert result.dtype == np.int64
+        assert result.tolist() == scan(TEXTS, query), query
+
+
+def test_ngram_index_matches_substring_scan_on_random_texts():
+    rng = np.random.default_rng(0)
+    alphabet = list("abcde ")
+    texts = [
+        "".join(rng.choice(alphabet, size=rng.integers(0, 30)))
+        for _ in range(200)
+    ]
+    index = NGramIndex(texts)
+
+    for _ in range(200):
+        query = "".join(rng.choice(alphabet, size=rng.integers(1, 6)))
+        assert index.search(query).tolist() == scan(texts, query), query
@@ -0,0 +1,56 @@
+import pytest
+from app.utils.pagination import (
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    query_fingerprint
+)
+
+
+def test_cursor_round_trip():
+    query = query_fingerprint({"title": "sapiens", "category": None})
+
+    cursor = encode_cursor("v1", query, 150)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "v1", query) == 150
+
+
+def test_cursor_rejected_after_version_change():
+    query = query_fingerprint({"title": "sapiens"})
+    cursor = encode_cursor("v1", query, 50)
+
+    with pytest.raises(ValueError, match="expirado"):
+        decode_cursor(cursor, "v2", query)
+
+
+def test_cursor_rejected_for_another_query():
+    cursor = encode_cursor("v1", query_fingerprint({"title": "a"}), 50)
+
+    with pytest.raises(ValueError, match="consulta"):
+        decode_cursor(cursor, "v1", query_fingerprint({"title": "b"}))
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "e30", "bnVsbA"])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "v1", query_fingerprint({}))
+
+
+def test_paginate_walks_all_pages_of_a_version():
+    params = {"category": "Poetry", "sort": None}
+    seen = []
+    cursor = None
+    while True:
+        start, end, page = paginate(23, cursor, 10, "v1", params)
+        seen.extend(range(start, end))
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(range(23))
+    assert page == {"limit": 10, "total": 23, "next_cursor": None}
+
+    _, _, first = paginate(23, None, 10, "v1", params)
+    with pytest.raises(ValueError):
+        paginate(23, first["next_cursor"], 10, "v2", params)
@@ -0,0 +1,53 @@
+import numpy as np
+from app.models.ml_recomender.similarity import top_k_rows
+
+
+def test_top_k_rows_orders_by_value_and_breaks_ties_by_index():
+    scores = np.array([
+        [0.5, 0.9, 0.5, 0.1, 0.5],
+        [0.0, 0.0, 0.0, 0.0, 0.0]
+    ])
+
+    ids, values = top_k_rows(scores, 3)
+
+    assert ids.tolist() == [[1, 0, 2], [0, 1, 2]]
+    assert np.allclose(values, [[0.9, 0.5, 0.5], [0.0, 0.0, 0.0]])
+    assert ids.dtype == np.int32 and values.dtype == np.float32
+
+
+def test_top_k_rows_excludes_by_index_without_modifying_scores():
+    scores = np.array([
+        [1.0, 0.3, 0.3, 0.2],
+        [0.4, 1.0, 0.4, 0.4]
+    ])
+    original = scores.copy()
+
+    ids, values = top_k_rows(scores, 2, exclude=np.array([0, 1]))
+
+    # O próprio livro sai pelo índice, mesmo empatado com outros valores
+    assert ids.tolist() == [[1, 2], [0, 2]]
+    assert np.allclose(values, [[0.3, 0.3], [0.4, 0.4]])
+    assert np.array_equal(scores, original)
+
+
+def test_top_k_rows_matches_stable_sort():
+    rng = np.random.default_rng(0)
+    # Poucos valores distintos: muitos empates no limiar
+    scores = rng.integers(0, 4, size=(50, 40)).astype(np.float32)
+    exclude = rng.integers(0, 40, size=50)
+
+    ids, values = top_k_rows(scores, 7, exclude=exclude)
+
+    for row in range(len(scores)):
+        masked = scores[row].copy()
+        masked[exclude[row]] = -np.inf
+        expected = np.argsort(-masked, kind="stable")[:7]
+        assert ids[row].tolist() == expected.tolist()
+        assert values[row].tolist() == masked[expected].tolist()
+
+
+def test_top_k_rows_limits_k_to_available_columns():
+    ids, values = top_k_rows(np.ones((2, 3)), 10, exclude=np.array([0, 2]))
+
+    assert ids.tolist() == [[1, 2], [0, 1]]
+    assert values.shape == (2, 2)